@@ -13,24 +13,66 @@ from pprint import pformat
 
 import gradio as gr
 
+from artifact_store import get_artifact_store
 from routing_agent import RoutingAgent
+from session_pool import RoutingSessionPool
 
 APP_NAME = "azure_routing_app"
 USER_ID = "default_user"
 SESSION_ID = "default_session"
 
+# Number of chat events Gradio runs at once, and how many may queue behind them
+CONCURRENCY_LIMIT = int(os.getenv("HOST_CONCURRENCY_LIMIT", os.getenv("ROUTING_SESSION_POOL_SIZE", "8")))
+QUEUE_MAX_SIZE = int(os.getenv("HOST_QUEUE_MAX_SIZE", "64"))
+
 # Global routing agent instance
 ROUTING_AGENT: RoutingAgent = None
 
+# Pool of per-conversation routing sessions checked out by each chat event
+SESSION_POOL: RoutingSessionPool = None
+
+# Content-addressed, size-capped store for charts and full tool outputs
+ARTIFACT_STORE = get_artifact_store()
+
+# How often (seconds) Gradio purges files it cached for display, and their max age
+GRADIO_CACHE_CLEANUP = (
+    int(os.getenv("GRADIO_CACHE_CLEANUP_SECONDS", "3600")),
+    int(os.getenv("GRADIO_CACHE_MAX_AGE_SECONDS", "86400")),
+)
+
+
+def format_routing_event(event: dict) -> str | None:
+    """Render a routing progress event as a single line for the chat."""
+    agent_name = event.get("agent_name", "agent")
+    if event["type"] == "routing":
+        return f"🔀 Routing to **{agent_name}**"
+    if event["type"] == "agent_status":
+        status = f"⏳ **{agent_name}**: {event['state']}"
+        return f"{status} - {event['content']}" if event.get("content") else status
+    return None
+
+
+def render_progress(
+    progress_lines: list[str], partial_text: str, done: bool = False
+) -> list[gr.ChatMessage]:
+    """Build the chat messages showing routing progress and partial agent output."""
+    messages = [gr.ChatMessage(
+        role="assistant",
+        content="\n".join(progress_lines) or "🤔 Processing your request...",
+        metadata={"title": "🤖 Azure AI Routing Agent", "status": "done" if done else "pending"},
+    )]
+    if partial_text and not done:
+        messages.append(gr.ChatMessage(role="assistant", content=partial_text))
+    return messages
+
 
 async def get_response_from_agent(
     message: str,
     history: list[gr.ChatMessage],
+    request: gr.Request,
 ) -> AsyncIterator[gr.ChatMessage]:
     """Get response from Azure AI Foundry Agent routing by A2A and Semantic Kernel."""
-    global ROUTING_AGENT
-    
-    if not ROUTING_AGENT:
+    if not ROUTING_AGENT or not SESSION_POOL:
         yield gr.ChatMessage(
             role="assistant",
             content="**🤖 Azure AI Routing Agent**: ❌ Error - Routing agent not initialized. Please restart the application.",
@@ -57,13 +99,31 @@ async def get_response_from_agent(
             user_text = str(message)
         
         # Show that we're processing the request
-        yield gr.ChatMessage(
-            role="assistant",
-            content="**� Azure AI Routing Agent**: 🤔 Processing your request...",
-        )
+        progress_lines: list[str] = []
+        partial_text = ""
+        yield render_progress(progress_lines, partial_text)
         
-        # Process the message through Azure AI Agent
-        response = await ROUTING_AGENT.process_user_message(user_text)
+        # Process the message through Azure AI Agent in this conversation's own
+        # session, streaming progress into the chat as it arrives
+        response = None
+        session_key = request.session_hash if request and request.session_hash else SESSION_ID
+        async with SESSION_POOL.checkout(session_key) as session:
+            async for event in ROUTING_AGENT.stream_user_message(user_text, session):
+                if event["type"] == "final":
+                    response = event["content"]
+                    break
+
+                if event["type"] == "partial":
+                    partial_text = partial_text + event["content"] if event.get("append") else event["content"]
+                elif event["type"] == "agent_status" and event["state"] == "working" and event.get("content"):
+                    partial_text += event["content"]
+                else:
+                    line = format_routing_event(event)
+                    if line:
+                        progress_lines.append(line)
+                yield render_progress(progress_lines, partial_text)
+            tool_artifacts = list(session.last_tool_artifacts)
+        progress = render_progress(progress_lines, partial_text, done=True)
         
         # Yield the final response
         if response:
@@ -74,70 +134,67 @@ async def get_response_from_agent(
             # Check if response is a file (image) artifact
             if isinstance(response, dict) and response.get("type") == "file":
                 import base64
-                import tempfile
-                import os
-                from datetime import datetime
+                import mimetypes
                 
                 try:
-                    print("DEBUG: Processing file artifact...")
-                    # Decode the base64 image data
-                    image_bytes = base64.b64decode(response["file_data"])
+                    print("DEBUG: Processing file artifacts...")
                     agent_name = response.get("agent_name", "Analytics Agent")
+                    saved_paths = []
+                    for file in response["files"]:
+                        # Decode the base64 image data and store one content-addressed
+                        # copy, which is also what Gradio serves
+                        image_bytes = base64.b64decode(file["file_data"])
+                        suffix = mimetypes.guess_extension(file.get("mime_type") or "") or ".png"
+                        saved_paths.append(ARTIFACT_STORE.put(image_bytes, suffix))
+                        print(f"Chart saved to artifact store: {saved_paths[-1]}")
                     
-                    # Create charts directory for persistent storage
-                    charts_dir = os.path.join(os.getcwd(), "generated_charts")
-                    os.makedirs(charts_dir, exist_ok=True)
-                    
-                    # Generate filename with timestamp and description
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    chart_filename = f"chart_{timestamp}.png"
-                    persistent_path = os.path.join(charts_dir, chart_filename)
-                    
-                    # Save to persistent location
-                    with open(persistent_path, 'wb') as f:
-                        f.write(image_bytes)
-                    
-                    # Also save to temporary file for Gradio display
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as tmp:
-                        tmp.write(image_bytes)
-                        temp_path = tmp.name
-                    
-                    print(f"Chart saved to persistent location: {persistent_path}")
-                    print(f"Chart saved to temp location for display: {temp_path}")
-                    
-                    # Return text message with file location info
-                    yield gr.ChatMessage(
+                    # Return text message with file locations
+                    locations = "\n".join(f"📁 **Saved to**: `{path}`" for path in saved_paths)
+                    text = f"{response['text']}\n\n" if response.get("text") else ""
+                    chart_message = gr.ChatMessage(
                         role="assistant",
-                        content=f"**🎨 {agent_name}**: Chart generated successfully!\n\n📁 **Saved to**: `{persistent_path}`"
+                        content=f"**🎨 {agent_name}**: {text}{len(saved_paths)} chart(s) generated successfully!\n\n{locations}"
                     )
+                    yield progress + [chart_message]
 
                     await asyncio.sleep(0.5)  # Small delay to ensure message order
                     
-                    # Return the image using gr.Image component
-                    yield gr.ChatMessage(
-                        role="assistant",
-                        content=gr.Image(value=temp_path, show_label=False)
-                    )
+                    # Return each image using a gr.Image component
+                    yield progress + [chart_message] + [
+                        gr.ChatMessage(
+                            role="assistant",
+                            content=gr.Image(value=path, show_label=False)
+                        )
+                        for path in saved_paths
+                    ]
                     
                 except Exception as e:
                     print(f"Error processing image response: {e}")
                     import traceback
                     traceback.print_exc()
-                    yield gr.ChatMessage(
+                    yield progress + [gr.ChatMessage(
                         role="assistant",
                         content=f"**🎨 {response.get('agent_name', 'Analytics Agent')}**: Chart was generated but there was an error displaying it: {str(e)}"
-                    )
+                    )]
             else:
                 # Regular text response
-                yield gr.ChatMessage(
-                    role="assistant", 
+                messages = progress + [gr.ChatMessage(
+                    role="assistant",
                     content=response
-                )
+                )]
+
+                # Outputs compacted for the routing model stay available in full
+                for artifact_path in tool_artifacts:
+                    messages.append(gr.ChatMessage(
+                        role="assistant",
+                        content=gr.File(value=artifact_path, label="Full agent output")
+                    ))
+                yield messages
         else:
-            yield gr.ChatMessage(
+            yield progress + [gr.ChatMessage(
                 role="assistant",
                 content="**🤖 Azure AI Routing Agent**: ❌ Error - No response received from the agent.",
-            )
+            )]
             
     except Exception as e:
         print(f"Error in get_response_from_agent (Type: {type(e)}): {e}")
@@ -150,7 +207,7 @@ async def get_response_from_agent(
 
 async def initialize_routing_agent():
     """Initialize the Azure AI routing agent."""
-    global ROUTING_AGENT
+    global ROUTING_AGENT, SESSION_POOL
     
     try:
         print("Initializing Azure AI routing agent...")
@@ -168,6 +225,9 @@ async def initialize_routing_agent():
         # Create the Azure AI agent
         azure_agent = ROUTING_AGENT.create_agent()
         print(f"Azure AI routing agent initialized successfully with ID: {azure_agent.id}")
+
+        SESSION_POOL = RoutingSessionPool(ROUTING_AGENT)
+        print(f"Routing session pool ready with {SESSION_POOL.max_sessions} sessions")
         
     except Exception as e:
         print(f"Failed to initialize routing agent: {e}")
@@ -177,7 +237,15 @@ async def initialize_routing_agent():
 
 async def cleanup_routing_agent():
     """Clean up the routing agent resources."""
-    global ROUTING_AGENT
+    global ROUTING_AGENT, SESSION_POOL
+
+    if SESSION_POOL:
+        try:
+            await SESSION_POOL.close()
+        except Exception as e:
+            print(f"Error closing session pool: {e}")
+        finally:
+            SESSION_POOL = None
     
     if ROUTING_AGENT:
         try:
@@ -208,7 +276,11 @@ async def main():
     await initialize_routing_agent()
 
     try:
-        with gr.Blocks(theme=gr.themes.Ocean(), title="Azure AI Routing Agent") as demo:
+        with gr.Blocks(
+            theme=gr.themes.Ocean(),
+            title="Azure AI Routing Agent",
+            delete_cache=GRADIO_CACHE_CLEANUP,
+        ) as demo:
             # Header section
             gr.Markdown("""
             # 🤖 Azure AI Routing Agent
@@ -222,9 +294,18 @@ async def main():
                 gr.Markdown(f"""
                 ### 📊 Agent Status
                 - **Azure AI Agent ID**: `{ROUTING_AGENT.azure_agent.id}`
-                - **Thread ID**: `{ROUTING_AGENT.current_thread.id if ROUTING_AGENT.current_thread else 'Not created'}`
                 - **Available Remote Agents**: {len(ROUTING_AGENT.remote_agent_connections)}
+                - **Concurrent Sessions**: {SESSION_POOL.max_sessions}
                 """)
+
+                with gr.Accordion("📈 Session Pool Metrics", open=False):
+                    pool_stats = gr.JSON(value=SESSION_POOL.stats, label="Session pool")
+                    artifact_stats = gr.JSON(value=ARTIFACT_STORE.stats, label="Artifact store")
+                    gr.Button("Refresh").click(
+                        lambda: (SESSION_POOL.stats(), ARTIFACT_STORE.stats()),
+                        outputs=[pool_stats, artifact_stats],
+                        queue=False,
+                    )
             
             # Chat interface with file uploads enabled
             with gr.Row():
@@ -249,10 +330,14 @@ async def main():
             """)
 
         print("Launching Gradio interface...")
-        demo.queue().launch(
+        demo.queue(
+            default_concurrency_limit=CONCURRENCY_LIMIT,
+            max_size=QUEUE_MAX_SIZE,
+        ).launch(
             server_name="0.0.0.0",
             server_port=8083,
-            share=True
+            share=True,
+            allowed_paths=[ARTIFACT_STORE.root],
         )
         
     except Exception as e:
@@ -0,0 +1,142 @@
+"""
+Content-addressed artifact store for files served by the host.
+
+Charts returned by remote agents and full tool outputs are stored once, under
+the SHA-256 of their content, so identical artifacts share a single file. The
+store keeps its total size under a disk quota by evicting the least recently
+used files, and rebuilds its index from disk at startup so long-running hosts
+do not leak disk.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+
+from collections import OrderedDict
+from typing import Any
+
+
+class ArtifactStore:
+    """Content-addressed, size-capped file store with LRU eviction."""
+
+    def __init__(self, root: str | None = None, max_bytes: int | None = None):
+        # TOOL_OUTPUT_ARTIFACT_DIR is the older setting for compacted tool outputs
+        self.root = (
+            root
+            or os.getenv('HOST_ARTIFACT_DIR')
+            or os.getenv('TOOL_OUTPUT_ARTIFACT_DIR')
+            or os.path.join(os.getcwd(), 'generated_artifacts')
+        )
+        self.max_bytes = max_bytes or int(
+            float(os.getenv('HOST_ARTIFACT_QUOTA_MB', '512')) * 1024 * 1024
+        )
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+
+        # Metrics
+        self.hits = 0
+        self.writes = 0
+        self.evictions = 0
+
+        os.makedirs(self.root, exist_ok=True)
+        self._scan()
+
+    def _scan(self) -> None:
+        """Index existing files, oldest first, and enforce the quota.
+
+        Temporary files left by writes interrupted before their rename are
+        removed.
+        """
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.name.startswith('.tmp-'):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+            elif entry.is_file() and not entry.name.startswith('.'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+
+        with self._lock:
+            for _, name, size in sorted(entries):
+                self._index[name] = size
+                self._total_bytes += size
+            self._evict()
+        print(f"Artifact store indexed {len(self._index)} files ({self._total_bytes} bytes) in {self.root}")
+
+    def put(self, data: bytes, suffix: str = '') -> str:
+        """Store bytes and return the path of the (possibly existing) file."""
+        name = f'{hashlib.sha256(data).hexdigest()}{suffix}'
+        path = os.path.join(self.root, name)
+
+        with self._lock:
+            if name in self._index and os.path.exists(path):
+                # Already stored: refresh its recency on disk and in the index
+                self._index.move_to_end(name)
+                os.utime(path)
+                self.hits += 1
+                return path
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+            self._total_bytes += len(data) - self._index.pop(name, 0)
+            self._index[name] = len(data)
+            self.writes += 1
+            self._evict(keep=name)
+        return path
+
+    def put_text(self, text: str, suffix: str = '.txt') -> str:
+        """Store UTF-8 text and return the path of the file."""
+        return self.put(text.encode('utf-8'), suffix)
+
+    def _evict(self, keep: str | None = None) -> None:
+        """Remove least recently used files until the store fits its quota."""
+        while self._total_bytes > self.max_bytes and self._index:
+            name, size = next(iter(self._index.items()))
+            if name == keep:
+                break
+            del self._index[name]
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict[str, Any]:
+        """Return store metrics."""
+        with self._lock:
+            return {
+                'files': len(self._index),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'writes': self.writes,
+                'evictions': self.evictions,
+            }
+
+
+_default_store: ArtifactStore | None = None
+_default_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the host-wide artifact store, creating it on first use."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ArtifactStore()
+        return _default_store
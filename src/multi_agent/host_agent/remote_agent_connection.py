@@ -1,4 +1,4 @@
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
 
 import httpx
 
@@ -7,6 +7,8 @@ from a2a.types import (
     AgentCard,
     SendMessageRequest,
     SendMessageResponse,
+    SendStreamingMessageRequest,
+    SendStreamingMessageResponse,
     Task,
     TaskArtifactUpdateEvent,
     TaskStatusUpdateEvent,
@@ -35,7 +37,21 @@ class RemoteAgentConnections:
     def get_agent(self) -> AgentCard:
         return self.card
 
+    @property
+    def supports_streaming(self) -> bool:
+        """Whether the remote agent advertises streaming in its card."""
+        capabilities = self.card.capabilities
+        return bool(capabilities and capabilities.streaming)
+
     async def send_message(
         self, message_request: SendMessageRequest
     ) -> SendMessageResponse:
-        return await self.agent_client.send_message(message_request)
\ No newline at end of file
+        return await self.agent_client.send_message(message_request)
+
+    async def send_message_streaming(
+        self, message_request: SendStreamingMessageRequest
+    ) -> AsyncIterator[SendStreamingMessageResponse]:
+        async for response in self.agent_client.send_message_streaming(
+            message_request
+        ):
+            yield response
@@ -1,9 +1,10 @@
 import asyncio
 import json
 import os
-import time
+import re
 import uuid
 
+from collections.abc import AsyncIterator, Awaitable, Callable
 from typing import Any, Dict, List, Optional
 
 import httpx
@@ -11,18 +12,27 @@ import httpx
 from a2a.client import A2ACardResolver
 from a2a.types import (
     AgentCard,
+    FilePart,
+    FileWithBytes,
+    Message,
     MessageSendParams,
     Part,
     SendMessageRequest,
     SendMessageResponse,
     SendMessageSuccessResponse,
+    SendStreamingMessageRequest,
+    SendStreamingMessageSuccessResponse,
     Task,
+    TaskArtifactUpdateEvent,
     TaskState,
+    TaskStatusUpdateEvent,
 )
+from a2a.utils import append_artifact_to_task
 from remote_agent_connection import (
     RemoteAgentConnections,
     TaskUpdateCallback,
 )
+from tool_output_compaction import ToolOutputCompactor
 from azure.ai.agents import AgentsClient
 from azure.identity import DefaultAzureCredential
 from azure.ai.agents.models import ListSortOrder, ToolSet
@@ -31,6 +41,17 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Progress events emitted while a user message is processed, e.g.
+# {'type': 'routing', 'agent_name': ..., 'content': ...}
+RoutingEvent = dict[str, Any]
+RoutingEventCallback = Callable[[RoutingEvent], Awaitable[None]]
+
+# Approximate token budget for the agent roster embedded in the routing
+# instructions. Keeping the roster bounded keeps the instruction prefix short
+# and identical across runs so the model provider can cache it.
+ROSTER_TOKEN_BUDGET = int(os.getenv('ROUTING_AGENT_ROSTER_TOKEN_BUDGET', '400'))
+DESCRIPTION_MAX_CHARS = 160
+
 
 class AzureAgentContext:
     """Context class to replace Google ADK ReadonlyContext."""
@@ -38,6 +59,26 @@ class AzureAgentContext:
         self.state: Dict[str, Any] = {}
 
 
+class RoutingSession:
+    """Per-conversation routing state.
+
+    Holds the Azure AI thread, the A2A task/context state and the tracking used
+    for UI attribution, so concurrent conversations never share mutable state.
+    """
+
+    def __init__(self, thread, session_key: str | None = None):
+        self.session_key = session_key
+        self.thread = thread
+        self.context = AzureAgentContext()
+
+        # Track the last agent called and its response for better UI display
+        self.last_called_agent = None
+        self.last_agent_response = None
+
+        # Full payloads of tool outputs that were compacted for the model
+        self.last_tool_artifacts: list[str] = []
+
+
 def convert_part(part: Part) -> str:
     """Convert a part to text. Only text parts are supported."""
     if part.type == 'text':
@@ -54,6 +95,93 @@ def convert_parts(parts: list[Part]) -> List[str]:
     return rval
 
 
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of text (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def compact_description(
+    description: str | None, max_chars: int = DESCRIPTION_MAX_CHARS
+) -> str:
+    """Collapse whitespace and keep the first sentence of a description."""
+    text = re.sub(r'\s+', ' ', description or '').strip()
+    first_sentence = re.split(r'(?<=[.!?])\s', text, maxsplit=1)[0]
+    if len(first_sentence) > max_chars:
+        first_sentence = first_sentence[: max_chars - 3].rstrip() + '...'
+    return first_sentence
+
+
+def build_agent_roster(
+    cards: list[AgentCard], token_budget: int = ROSTER_TOKEN_BUDGET
+) -> str:
+    """Build a compact agent roster that fits within an approximate token budget.
+
+    Agents are ranked in the order they were registered (the configured
+    remote agent order). Each agent is listed with its compacted description
+    and skill names while the budget allows, then with its description only,
+    and finally by name only so every agent stays routable.
+    """
+    entries = []
+    for card in cards:
+        skills = ', '.join(skill.name for skill in card.skills or [])
+        description = compact_description(card.description)
+        entries.append(
+            [
+                f'- {card.name}: {description} (skills: {skills})' if skills
+                else f'- {card.name}: {description}',
+                f'- {card.name}: {description}',
+                f'- {card.name}',
+            ]
+        )
+
+    # Names are always included, so reserve their cost up front.
+    used = sum(estimate_tokens(variants[-1]) for variants in entries)
+    lines = []
+    for variants in entries:
+        chosen = variants[-1]
+        for variant in variants[:-1]:
+            extra = estimate_tokens(variant) - estimate_tokens(variants[-1])
+            if used + extra <= token_budget:
+                chosen = variant
+                used += extra
+                break
+        lines.append(chosen)
+    return '\n'.join(lines)
+
+
+def get_text_from_parts(parts: list[Part] | None) -> str:
+    """Join the text of all text parts, ignoring other part types."""
+    return ''.join(
+        part.root.text for part in parts or [] if hasattr(part.root, 'text')
+    )
+
+
+def join_file_chunks(parts: list[Part] | None) -> list[Part]:
+    """Merge file parts streamed in chunks back into one part per file.
+
+    A chunk carries ``chunk``/``chunks`` metadata and base64 that continues
+    the previous part's, so chunks after the first are appended to it.
+    """
+    joined: list[Part] = []
+    for part in parts or []:
+        root = part.root
+        chunk = (root.metadata or {}).get('chunk') if isinstance(root, FilePart) else None
+        if chunk and joined and isinstance(joined[-1].root, FilePart):
+            previous = joined[-1].root.file
+            joined[-1] = Part(
+                root=FilePart(
+                    file=FileWithBytes(
+                        bytes=previous.bytes + root.file.bytes,
+                        mime_type=previous.mime_type,
+                        name=previous.name,
+                    )
+                )
+            )
+        else:
+            joined.append(part)
+    return joined
+
+
 def create_send_message_payload(
     text: str, task_id: str | None = None, context_id: str | None = None
 ) -> dict[str, Any]:
@@ -89,7 +217,6 @@ class RoutingAgent:
         self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
         self.cards: dict[str, AgentCard] = {}
         self.agents: str = ''
-        self.context = AzureAgentContext()
         
         # Initialize Azure AI Agents client
         self.agents_client = AgentsClient(
@@ -97,11 +224,12 @@ class RoutingAgent:
             credential=DefaultAzureCredential(),
         )
         self.azure_agent = None
-        self.current_thread = None
-        
-        # Track the last agent called and its response for better UI display
-        self.last_called_agent = None
-        self.last_agent_response = None
+
+        # Default session used when callers do not supply their own
+        self.session: RoutingSession | None = None
+
+        # Compacts remote agent outputs before they are submitted to the model
+        self.output_compactor = ToolOutputCompactor()
 
     async def _async_init_components(
         self, remote_agent_addresses: list[str]
@@ -134,11 +262,8 @@ class RoutingAgent:
                         f'ERROR: Failed to initialize connection for {address}: {e}'
                     )
 
-        # Populate self.agents using the logic from original __init__ (via list_remote_agents)
-        agent_info = []
-        for agent_detail_dict in self.list_remote_agents():
-            agent_info.append(json.dumps(agent_detail_dict))
-        self.agents = '\n'.join(agent_info)
+        # Populate self.agents with a compact roster bounded by the token budget
+        self.agents = build_agent_roster(list(self.cards.values()))
 
     @classmethod
     async def create(
@@ -199,8 +324,7 @@ class RoutingAgent:
             print(f"Created Azure AI agent, agent ID: {self.azure_agent.id}")
             
             # Create a thread for conversation
-            self.current_thread = self.agents_client.threads.create()
-            print(f"Created thread, thread ID: {self.current_thread.id}")
+            self.session = self.create_session()
             
             return self.azure_agent
             
@@ -210,9 +334,32 @@ class RoutingAgent:
             print(f"Instructions: {instructions[:200]}...")
             raise
 
+    @property
+    def current_thread(self):
+        """The Azure AI thread of the default session."""
+        return self.session.thread if self.session else None
+
+    def create_session(self, session_key: str | None = None) -> RoutingSession:
+        """Create a routing session backed by a new Azure AI thread."""
+        thread = self.agents_client.threads.create()
+        print(f"Created thread, thread ID: {thread.id}")
+        return RoutingSession(thread, session_key)
+
+    def delete_session(self, session: RoutingSession) -> None:
+        """Delete the Azure AI thread backing a routing session."""
+        try:
+            self.agents_client.threads.delete(session.thread.id)
+            print(f"Deleted thread, thread ID: {session.thread.id}")
+        except Exception as e:
+            print(f"Error deleting thread {session.thread.id}: {e}")
+
     def get_root_instruction(self) -> str:
-        """Generate the root instruction for the RoutingAgent."""
-        current_agent = self.check_active_agent()
+        """Generate the root instruction for the RoutingAgent.
+
+        The instruction only depends on the discovered agent cards, so it stays
+        byte-identical across runs and can be served from the provider's prompt
+        cache. Per-run state is supplied by ``get_run_instructions``.
+        """
         return f"""You are an expert Routing Delegator that helps users with any browser-queries like visting webpages, generating charts, filling oneline forms etc, expense reimbursement related queries and also fetching document details from Azure Blob Storage.
 
 Your role:
@@ -222,14 +369,19 @@ Your role:
 - Connect users with Chart Generator CrewAI agent for chart generation queries
 - Connect users with Reimbursement Google ADK Agent for expense reimbursement queries
 
-Available Agents: {self.agents}
-Currently Active Agent: {current_agent['active_agent']}
+Available Agents:
+{self.agents}
 
 Always be helpful and route requests to the most appropriate agent."""
 
-    def check_active_agent(self):
+    def get_run_instructions(self, session: RoutingSession) -> str:
+        """Generate the volatile, per-run additional instructions."""
+        current_agent = self.check_active_agent(session)
+        return f"Currently Active Agent: {current_agent['active_agent']}"
+
+    def check_active_agent(self, session: RoutingSession):
         """Check the currently active agent."""
-        state = self.context.state
+        state = session.context.state
         if (
             'session_id' in state
             and 'session_active' in state
@@ -239,9 +391,9 @@ Always be helpful and route requests to the most appropriate agent."""
             return {'active_agent': f'{state["active_agent"]}'}
         return {'active_agent': 'None'}
 
-    def initialize_session(self):
+    def initialize_session(self, session: RoutingSession):
         """Initialize a new session."""
-        state = self.context.state
+        state = session.context.state
         if 'session_active' not in state or not state['session_active']:
             if 'session_id' not in state:
                 state['session_id'] = str(uuid.uuid4())
@@ -262,7 +414,11 @@ Always be helpful and route requests to the most appropriate agent."""
         return remote_agent_info
 
     async def send_message(
-        self, agent_name: str, task: str
+        self,
+        agent_name: str,
+        task: str,
+        session: RoutingSession | None = None,
+        on_event: RoutingEventCallback | None = None,
     ):
         """Sends a task to remote seller agent.
 
@@ -272,6 +428,10 @@ Always be helpful and route requests to the most appropriate agent."""
             agent_name: The name of the agent to send the task to.
             task: The comprehensive conversation context summary
                 and goal to be achieved regarding user inquiry and purchase request.
+            session: The routing session to track task state in (defaults to
+                the agent's own session).
+            on_event: Optional callback receiving progress events while a
+                streaming-capable remote agent works on the task.
 
         Returns:
             A Task object from the remote agent response.
@@ -279,7 +439,8 @@ Always be helpful and route requests to the most appropriate agent."""
         if agent_name not in self.remote_agent_connections:
             raise ValueError(f'Agent {agent_name} not found')
         
-        state = self.context.state
+        session = session or self.session
+        state = session.context.state
         state['active_agent'] = agent_name
         client = self.remote_agent_connections[agent_name]
 
@@ -323,28 +484,33 @@ Always be helpful and route requests to the most appropriate agent."""
         if context_id:
             payload['message']['contextId'] = context_id
 
-        message_request = SendMessageRequest(
-            id=message_id, params=MessageSendParams.model_validate(payload)
-        )
-        send_response: SendMessageResponse = await client.send_message(
-            message_request=message_request
-        )
-        print('send_response', send_response.model_dump_json(exclude_none=True, indent=2))
+        if client.supports_streaming:
+            task = await self._send_message_streaming(
+                client, agent_name, message_id, payload, on_event
+            )
+            if task is None:
+                return
+        else:
+            message_request = SendMessageRequest(
+                id=message_id, params=MessageSendParams.model_validate(payload)
+            )
+            send_response: SendMessageResponse = await client.send_message(
+                message_request=message_request
+            )
+            print('send_response', send_response.model_dump_json(exclude_none=True, indent=2))
 
-        if not isinstance(send_response.root, SendMessageSuccessResponse):
-            print('received non-success response. Aborting get task ')
-            return
+            if not isinstance(send_response.root, SendMessageSuccessResponse):
+                print('received non-success response. Aborting get task ')
+                return
 
-        if not isinstance(send_response.root.result, Task):
-            print('received non-task response. Aborting get task ')
-            return
+            if not isinstance(send_response.root.result, Task):
+                print('received non-task response. Aborting get task ')
+                return
 
-        # return send_response.root.result
+            task = send_response.root.result
 
         # Handling logic for task_id and context_id
 
-        task = send_response.root.result
-
         # Check if agent requires input from user
         if task.status.state == TaskState.input_required:
             # Store task info in state for follow-up messages
@@ -361,31 +527,42 @@ Always be helpful and route requests to the most appropriate agent."""
         elif task.status.state == TaskState.completed:
             # Handle different types of artifacts (text or files)
             if task.artifacts and len(task.artifacts) > 0:
-                artifact = task.artifacts[0]
-                if artifact.parts and len(artifact.parts) > 0:
-                    part = artifact.parts[0]
-                    
-                    print("DEBUG: Processing artifact part from agent")
-                    # Check if it's a text part
-                    if hasattr(part.root, 'text'):
-                        agent_response = part.root.text
-                        response_content = f"**🔧 {agent_name}**: {agent_response}"
-                    
-                    # Check if it's a file part (like an image)
-                    elif hasattr(part.root, 'kind') and part.root.kind == 'file':
-                        print("DEBUG: Received file part from agent")
-                        file_info = part.root.file
-                        # Return the file content for image display
-                        response_content = {
-                            "type": "file",
-                            "agent_name": agent_name,
-                            "file_data": file_info.bytes,
-                            "mime_type": file_info.mime_type,
-                            "file_name": file_info.name
-                        }
+                # Images may arrive as several base64 chunks of one file
+                parts = [
+                    part
+                    for artifact in task.artifacts
+                    for part in join_file_chunks(artifact.parts)
+                ]
+                files = [
+                    part.root.file for part in parts
+                    if hasattr(part.root, 'kind') and part.root.kind == 'file'
+                ]
+                agent_response = get_text_from_parts(parts)
+
+                print(f"DEBUG: Processing {len(parts)} artifact parts from agent")
+                # Return every file (like an image) for display, with any accompanying text
+                if files:
+                    print(f"DEBUG: Received {len(files)} file parts from agent")
+                    response_content = {
+                        "type": "file",
+                        "agent_name": agent_name,
+                        "text": agent_response,
+                        "files": [
+                            {
+                                "file_data": file_info.bytes,
+                                "mime_type": file_info.mime_type,
+                                "file_name": file_info.name,
+                            }
+                            for file_info in files
+                        ],
+                    }
+                    for file_info in files:
                         print(f"DEBUG: File info - Name: {file_info.name}, MIME Type: {file_info.mime_type}")
-                    else:
-                        response_content = f"**🔧 {agent_name}**: Received unknown artifact type"
+                elif agent_response:
+                    # Streamed text may span several parts
+                    response_content = f"**🔧 {agent_name}**: {agent_response}"
+                elif parts:
+                    response_content = f"**🔧 {agent_name}**: Received unknown artifact type"
                 else:
                     response_content = f"**🔧 {agent_name}**: No content in artifact"
             else:
@@ -398,35 +575,155 @@ Always be helpful and route requests to the most appropriate agent."""
 
             return response_content
 
+        # Rejected, failed and canceled tasks are terminal; a follow-up must start a new task
+        elif task.status.state in (TaskState.rejected, TaskState.failed, TaskState.canceled):
+            state['task_id'] = None
+            state['context_id'] = task.context_id
+            reason = get_text_from_parts(task.status.message.parts) if task.status.message else ''
+            print(f"DEBUG: Task {task.id} ended as {task.status.state.value}: {reason}")
+            if task.status.state == TaskState.rejected:
+                return f"**🔧 {agent_name}** is busy: {reason or 'the request was rejected'}"
+            return f"**🔧 {agent_name}** could not complete the task ({task.status.state.value}): {reason or 'no reason given'}"
+
         # For other states (working, etc.) - store task info for potential follow-up
         else:
             state['task_id'] = task.id
             state['context_id'] = task.context_id
             return f"Task sent to {agent_name}. Status: {task.status.state}"
 
-    async def process_user_message(self, user_message: str) -> str:
-        """Process a user message through Azure AI Agent and return the response."""
+    async def _send_message_streaming(
+        self,
+        client: RemoteAgentConnections,
+        agent_name: str,
+        message_id: str,
+        payload: dict[str, Any],
+        on_event: RoutingEventCallback | None,
+    ) -> Task | None:
+        """Send a message over the streaming endpoint and rebuild the final task.
+
+        Status updates and artifact chunks are forwarded to ``on_event`` as they
+        arrive.
+        """
+        message_request = SendStreamingMessageRequest(
+            id=message_id, params=MessageSendParams.model_validate(payload)
+        )
+        task: Task | None = None
+        async for response in client.send_message_streaming(message_request):
+            if not isinstance(response.root, SendStreamingMessageSuccessResponse):
+                print('received non-success streaming response. Aborting get task ')
+                return None
+
+            event = response.root.result
+            if isinstance(event, Task):
+                task = event
+            elif isinstance(event, TaskStatusUpdateEvent):
+                if task is None:
+                    task = Task(id=event.task_id, context_id=event.context_id, status=event.status)
+                task.status = event.status
+                text = get_text_from_parts(event.status.message.parts) if event.status.message else ''
+                if on_event:
+                    await on_event({
+                        'type': 'agent_status',
+                        'agent_name': agent_name,
+                        'state': event.status.state.value,
+                        'content': text,
+                    })
+            elif isinstance(event, TaskArtifactUpdateEvent):
+                if task is None:
+                    print('received artifact before task. Ignoring artifact chunk ')
+                    continue
+                append_artifact_to_task(task, event)
+                text = get_text_from_parts(event.artifact.parts)
+                if on_event and text:
+                    await on_event({
+                        'type': 'partial',
+                        'agent_name': agent_name,
+                        'content': text,
+                        'append': bool(event.append),
+                    })
+            elif isinstance(event, Message):
+                print('received non-task response. Aborting get task ')
+                return None
+
+        return task
+
+    async def stream_user_message(
+        self, user_message: str, session: RoutingSession | None = None
+    ) -> AsyncIterator[RoutingEvent]:
+        """Process a user message and yield progress events as they happen.
+
+        Yields ``routing``, ``agent_status`` and ``partial`` events while the
+        routing run is in progress, and a single ``final`` event whose
+        ``content`` is the value ``process_user_message`` would return.
+        """
+        events: asyncio.Queue[RoutingEvent] = asyncio.Queue()
+
+        async def run() -> None:
+            response = await self.process_user_message(
+                user_message, session, on_event=events.put
+            )
+            await events.put({'type': 'final', 'content': response})
+
+        run_task = asyncio.create_task(run())
+        try:
+            while True:
+                event_task = asyncio.ensure_future(events.get())
+                await asyncio.wait({event_task, run_task}, return_when=asyncio.FIRST_COMPLETED)
+                if not event_task.done():
+                    # The run ended without a final event (it raised), surface its error
+                    event_task.cancel()
+                    run_task.result()
+                    return
+                event = event_task.result()
+                yield event
+                if event['type'] == 'final':
+                    return
+        finally:
+            if not run_task.done():
+                run_task.cancel()
+
+    async def process_user_message(
+        self,
+        user_message: str,
+        session: RoutingSession | None = None,
+        on_event: RoutingEventCallback | None = None,
+    ) -> str:
+        """Process a user message through Azure AI Agent and return the response.
+
+        Args:
+            user_message: The message typed by the user.
+            session: The routing session to run in (defaults to the agent's own
+                session). Sessions isolate concurrent conversations.
+            on_event: Optional callback receiving progress events; see
+                ``stream_user_message``.
+        """
         if not hasattr(self, 'azure_agent') or not self.azure_agent:
             return "Azure AI Agent not initialized. Please ensure the agent is properly created."
         
-        if not hasattr(self, 'current_thread') or not self.current_thread:
+        session = session or self.session
+        if not session or not session.thread:
             return "Azure AI Thread not initialized. Please ensure the agent is properly created."
+        thread_id = session.thread.id
         
         try:
             # Clear previous agent tracking
-            self.last_called_agent = None
+            session.last_called_agent = None
+            session.last_tool_artifacts = []
             
             # Initialize session if needed
-            self.initialize_session()
+            self.initialize_session(session)
             
             # Ensure user_message is a string and safely truncate for logging
             message_str = str(user_message)
             truncated_message = message_str[:50] + "..." if len(message_str) > 50 else message_str
             print(f"Processing message: {truncated_message}")
             
-            # Create message in the thread
-            message = self.agents_client.messages.create(
-                thread_id=self.current_thread.id, 
+            # Create message in the thread. The Azure AI client is synchronous,
+            # so its calls run in a worker thread to keep the event loop free
+            # for concurrent sessions.
+            message = await asyncio.to_thread(
+                self.agents_client.messages.create,
+                thread_id=thread_id, 
                 role="user", 
                 content=message_str
             )
@@ -434,9 +731,11 @@ Always be helpful and route requests to the most appropriate agent."""
 
             # Create and run the agent
             print(f"Creating run with agent ID: {self.azure_agent.id}")
-            run = self.agents_client.runs.create(
-                thread_id=self.current_thread.id, 
-                agent_id=self.azure_agent.id
+            run = await asyncio.to_thread(
+                self.agents_client.runs.create,
+                thread_id=thread_id, 
+                agent_id=self.azure_agent.id,
+                additional_instructions=self.get_run_instructions(session),
             )
             print(f"Created run, run ID: {run.id}")
 
@@ -446,7 +745,7 @@ Always be helpful and route requests to the most appropriate agent."""
             while run.status in ["queued", "in_progress", "requires_action"] and iteration < max_iterations:
                 # Handle function calls if needed
                 if run.status == "requires_action":
-                    tool_output = await self._handle_required_actions(run)
+                    tool_output = await self._handle_required_actions(run, session, on_event)
 
                     tool_output = json.loads(tool_output) if tool_output else None
                     print(f"Tool output: {tool_output}")
@@ -454,10 +753,11 @@ Always be helpful and route requests to the most appropriate agent."""
                         print("Received file output from tool call, returning to user.")
                         return tool_output  # Return the file output directly
                 
-                time.sleep(1)
+                await asyncio.sleep(1)
                 iteration += 1
-                run = self.agents_client.runs.get(
-                    thread_id=self.current_thread.id, 
+                run = await asyncio.to_thread(
+                    self.agents_client.runs.get,
+                    thread_id=thread_id, 
                     run_id=run.id
                 )
                 print(f"Run status: {run.status} (iteration {iteration})")
@@ -479,9 +779,11 @@ Always be helpful and route requests to the most appropriate agent."""
                 return f"Error processing request: {error_info}"
 
             # Get the latest messages
-            messages = self.agents_client.messages.list(
-                thread_id=self.current_thread.id, 
-                order=ListSortOrder.DESCENDING
+            messages = await asyncio.to_thread(
+                lambda: list(self.agents_client.messages.list(
+                    thread_id=thread_id, 
+                    order=ListSortOrder.DESCENDING
+                ))
             )
             
             # Return the assistant's response
@@ -495,9 +797,9 @@ Always be helpful and route requests to the most appropriate agent."""
                     if "**🔧" in response_text or "**🤖" in response_text:
                         # Already has agent name formatting, return as-is
                         return response_text
-                    elif self.last_called_agent:
+                    elif session.last_called_agent:
                         # Sub-agent was involved, give proper attribution
-                        return f"**🔧 {self.last_called_agent}** (via **🤖 Azure AI Routing Agent**): {response_text}"
+                        return f"**🔧 {session.last_called_agent}** (via **🤖 Azure AI Routing Agent**): {response_text}"
                     else:
                         # Direct Azure AI response
                         return f"**🤖 Azure AI Routing Agent**: {response_text}"
@@ -511,12 +813,15 @@ Always be helpful and route requests to the most appropriate agent."""
             traceback.print_exc()
             return f"An error occurred while processing your message: {str(e)}"
 
-    async def _handle_required_actions(self, run):
+    async def _handle_required_actions(
+        self, run, session: RoutingSession, on_event: RoutingEventCallback | None = None
+    ):
         """Handle function calls required by the Azure AI Agent."""
         try:
             if hasattr(run, 'required_action') and run.required_action:
                 tool_calls = run.required_action.submit_tool_outputs.tool_calls
                 tool_outputs = []
+                raw_outputs = []
                 
                 for tool_call in tool_calls:
                     function_name = tool_call.function.name
@@ -528,34 +833,51 @@ Always be helpful and route requests to the most appropriate agent."""
                         try:
                             # Track which agent was called for final attribution
                             agent_name = function_args["agent_name"]
-                            self.last_called_agent = agent_name
+                            session.last_called_agent = agent_name
+                            if on_event:
+                                await on_event({
+                                    'type': 'routing',
+                                    'agent_name': agent_name,
+                                    'content': function_args["task"],
+                                })
                             
                             # Call our send_message method
                             result = await self.send_message(
                                 agent_name=agent_name,
-                                task=function_args["task"]
+                                task=function_args["task"],
+                                session=session,
+                                on_event=on_event,
                             )
                             # Convert result to JSON string
                             output = json.dumps(result if isinstance(result, dict) else str(result))
+                            # Submit a compacted version to the model; keep the full output
+                            model_output, artifact_path = self.output_compactor.compact(result)
+                            if artifact_path:
+                                print(f"Compacted output from {agent_name}: {len(output)} -> {len(model_output)} characters")
+                                session.last_tool_artifacts.append(artifact_path)
                         except Exception as e:
                             output = json.dumps({"error": str(e)})
+                            model_output = output
                     else:
                         output = json.dumps({"error": f"Unknown function: {function_name}"})
+                        model_output = output
                     
                     tool_outputs.append({
                         "tool_call_id": tool_call.id,
-                        "output": output
+                        "output": model_output
                     })
+                    raw_outputs.append(output)
                 
                 # Submit the tool outputs
-                self.agents_client.runs.submit_tool_outputs(
-                    thread_id=self.current_thread.id,
+                await asyncio.to_thread(
+                    self.agents_client.runs.submit_tool_outputs,
+                    thread_id=session.thread.id,
                     run_id=run.id,
                     tool_outputs=tool_outputs
                 )
                 print(f"Submitted {len(tool_outputs)} tool outputs")
 
-                return tool_outputs[-1]["output"]
+                return raw_outputs[-1]
                 
         except Exception as e:
             print(f"Error handling required actions: {e}")
@@ -581,8 +903,8 @@ Always be helpful and route requests to the most appropriate agent."""
             
             if hasattr(self, 'azure_agent'):
                 self.azure_agent = None
-            if hasattr(self, 'current_thread'):
-                self.current_thread = None
+            if hasattr(self, 'session'):
+                self.session = None
 
     def __del__(self):
         """Destructor to ensure cleanup."""
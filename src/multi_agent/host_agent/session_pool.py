@@ -0,0 +1,134 @@
+"""
+Bounded pool of routing sessions for the Gradio host.
+
+Every chat event checks out a RoutingSession for the duration of the event so
+concurrent users never share an Azure AI thread or A2A task state. Sessions
+are sticky per Gradio session hash so a conversation keeps its thread, and the
+least recently used idle session is recycled once the pool is full.
+"""
+
+import asyncio
+import os
+import time
+
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any
+
+from routing_agent import RoutingAgent, RoutingSession
+
+
+class RoutingSessionPool:
+    """Hands out isolated routing sessions to concurrent chat events."""
+
+    def __init__(self, routing_agent: RoutingAgent, max_sessions: int | None = None):
+        self.routing_agent = routing_agent
+        self.max_sessions = max_sessions or int(os.getenv('ROUTING_SESSION_POOL_SIZE', '8'))
+
+        self._semaphore = asyncio.Semaphore(self.max_sessions)
+        self._lock = asyncio.Lock()
+        self._key_locks: dict[str, asyncio.Lock] = {}
+        self._idle: OrderedDict[str, RoutingSession] = OrderedDict()
+        self._in_use: dict[str, RoutingSession] = {}
+
+        # Metrics
+        self.waiting = 0
+        self.total_checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.sessions_created = 0
+        self.sessions_recycled = 0
+
+    @asynccontextmanager
+    async def checkout(self, session_key: str):
+        """Check out the session for ``session_key`` for the duration of a chat event.
+
+        Events of the same conversation are serialized; events of different
+        conversations run concurrently up to ``max_sessions``.
+        """
+        key_lock = self._key_locks.setdefault(session_key, asyncio.Lock())
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await key_lock.acquire()
+            try:
+                await self._semaphore.acquire()
+            except BaseException:
+                key_lock.release()
+                raise
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.total_checkouts += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+        try:
+            session = await self._acquire(session_key)
+            try:
+                yield session
+            finally:
+                async with self._lock:
+                    self._in_use.pop(session_key, None)
+                    self._idle[session_key] = session
+        finally:
+            self._semaphore.release()
+            key_lock.release()
+
+    async def _acquire(self, session_key: str) -> RoutingSession:
+        """Return the idle session for a key, creating or recycling one if needed."""
+        evicted = None
+        async with self._lock:
+            session = self._idle.pop(session_key, None)
+            if session is None and len(self._idle) + len(self._in_use) >= self.max_sessions:
+                evicted_key, evicted = self._idle.popitem(last=False)
+                evicted_lock = self._key_locks.get(evicted_key)
+                if evicted_lock is not None and not evicted_lock.locked():
+                    del self._key_locks[evicted_key]
+                self.sessions_recycled += 1
+            # Reserve the slot before any thread is created outside the lock
+            self._in_use[session_key] = session
+
+        try:
+            if evicted is not None:
+                await asyncio.to_thread(self.routing_agent.delete_session, evicted)
+            if session is None:
+                session = await asyncio.to_thread(self.routing_agent.create_session, session_key)
+                self.sessions_created += 1
+        except BaseException:
+            async with self._lock:
+                self._in_use.pop(session_key, None)
+            raise
+
+        async with self._lock:
+            self._in_use[session_key] = session
+        return session
+
+    def stats(self) -> dict[str, Any]:
+        """Return pool metrics, including the depth of the checkout queue."""
+        return {
+            'max_sessions': self.max_sessions,
+            'in_use': len(self._in_use),
+            'idle': len(self._idle),
+            'queue_depth': self.waiting,
+            'total_checkouts': self.total_checkouts,
+            'avg_wait_ms': round(
+                1000 * self.total_wait_seconds / self.total_checkouts, 1
+            ) if self.total_checkouts else 0.0,
+            'max_wait_ms': round(1000 * self.max_wait_seconds, 1),
+            'sessions_created': self.sessions_created,
+            'sessions_recycled': self.sessions_recycled,
+        }
+
+    async def close(self) -> None:
+        """Delete the Azure AI threads of all pooled sessions."""
+        async with self._lock:
+            sessions = [
+                session for session in [*self._idle.values(), *self._in_use.values()]
+                if session is not None
+            ]
+            self._idle.clear()
+            self._in_use.clear()
+        for session in sessions:
+            await asyncio.to_thread(self.routing_agent.delete_session, session)
@@ -0,0 +1,172 @@
+"""
+Compaction of remote agent outputs before they are submitted to the routing model.
+
+Remote agents can return very long text (for example every line item of every
+receipt in an expense report). The routing model only needs enough of it to
+compose its answer, so outputs are deduplicated and structurally truncated
+before ``submit_tool_outputs``. The untouched payload is kept as an artifact
+so the full data stays available to the user.
+"""
+
+import json
+import os
+
+from typing import Any
+
+from artifact_store import ArtifactStore, get_artifact_store
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class ToolOutputCompactor:
+    """Shrinks tool outputs before they are handed back to the routing model."""
+
+    def __init__(
+        self,
+        enabled: bool | None = None,
+        max_chars: int | None = None,
+        max_lines: int | None = None,
+        max_list_items: int | None = None,
+        artifact_store: ArtifactStore | None = None,
+    ):
+        self.enabled = (
+            enabled if enabled is not None
+            else _env_flag('TOOL_OUTPUT_COMPACTION', 'true')
+        )
+        self.max_chars = max_chars or int(os.getenv('TOOL_OUTPUT_MAX_CHARS', '4000'))
+        self.max_lines = max_lines or int(os.getenv('TOOL_OUTPUT_MAX_LINES', '60'))
+        self.max_list_items = max_list_items or int(
+            os.getenv('TOOL_OUTPUT_MAX_LIST_ITEMS', '20')
+        )
+        self.artifact_store = artifact_store
+
+    def compact(self, result: Any) -> tuple[str, str | None]:
+        """Compact a tool result for the routing model.
+
+        Args:
+            result: The value returned by ``RoutingAgent.send_message``.
+
+        Returns:
+            A tuple of the JSON-encoded output to submit to the model and the
+            path of the artifact holding the full payload (None if the output
+            was submitted unchanged).
+        """
+        if isinstance(result, dict) and result.get('type') == 'file':
+            # The model cannot use raw file bytes; the file itself goes to the user.
+            summary = {
+                key: value for key, value in result.items() if key != 'files'
+            }
+            summary['files'] = [
+                {key: value for key, value in file.items() if key != 'file_data'}
+                for file in result.get('files', [])
+            ]
+            summary['note'] = 'File content was delivered to the user directly.'
+            return json.dumps(summary), None
+
+        full_output = json.dumps(result if isinstance(result, dict) else str(result))
+        if not self.enabled or len(full_output) <= self.max_chars:
+            return full_output, None
+
+        text = result if isinstance(result, str) else json.dumps(result, indent=2)
+        compacted = self._compact_text(text)
+        if len(compacted) >= len(text):
+            return full_output, None
+
+        artifact_path = (self.artifact_store or get_artifact_store()).put_text(text)
+        compacted += (
+            f'\n[Output compacted from {len(text)} to {len(compacted)} characters. '
+            f'The full output was saved for the user at {os.path.basename(artifact_path)}.]'
+        )
+        return json.dumps(compacted), artifact_path
+
+    def _compact_text(self, text: str) -> str:
+        """Apply deduplication and structural truncation to text."""
+        parsed = self._try_parse_json(text)
+        if parsed is not None:
+            compacted = json.dumps(self._truncate_structure(parsed))
+        else:
+            lines = self._dedupe_lines(text.splitlines())
+            if len(lines) > self.max_lines:
+                head = self.max_lines * 2 // 3
+                tail = self.max_lines - head
+                omitted = len(lines) - head - tail
+                lines = lines[:head] + [f'[... {omitted} lines omitted ...]'] + lines[-tail:]
+            compacted = '\n'.join(lines)
+
+        if len(compacted) > self.max_chars:
+            compacted = compacted[: self.max_chars].rstrip() + '\n[... truncated ...]'
+        return compacted
+
+    def _truncate_structure(self, value: Any) -> Any:
+        """Dedupe identical list items and truncate long lists in a JSON structure."""
+        if isinstance(value, dict):
+            return {key: self._truncate_structure(item) for key, item in value.items()}
+        if isinstance(value, list):
+            counts: dict[str, int] = {}
+            unique = []
+            for item in value:
+                key = json.dumps(item, sort_keys=True)
+                if key not in counts:
+                    unique.append((key, item))
+                counts[key] = counts.get(key, 0) + 1
+
+            items = []
+            for key, item in unique[: self.max_list_items]:
+                item = self._truncate_structure(item)
+                if counts[key] > 1:
+                    item = {'item': item, 'repeated': counts[key]}
+                items.append(item)
+            if len(unique) > self.max_list_items:
+                items.append(f'... {len(unique) - self.max_list_items} more items')
+            return items
+        return value
+
+    @staticmethod
+    def _dedupe_lines(lines: list[str], min_line_item_chars: int = 40) -> list[str]:
+        """Collapse repeated lines into their first occurrence with a count.
+
+        Consecutive repeats are always collapsed. Non-adjacent repeats are only
+        collapsed for lines long enough to be whole line items, so short
+        structural lines such as '},' or 'Amount : 0' are left in place.
+        """
+        counts: dict[str, int] = {}
+        for line in lines:
+            key = line.strip()
+            if len(key) >= min_line_item_chars:
+                counts[key] = counts.get(key, 0) + 1
+
+        seen: set[str] = set()
+        deduped: list[str] = []
+        run_counts: list[int] = []
+        for line in lines:
+            key = line.strip()
+            if deduped and key and key == deduped[-1].strip():
+                if key not in counts:
+                    run_counts[-1] += 1
+                continue
+            if key in counts:
+                if key in seen:
+                    continue
+                seen.add(key)
+                deduped.append(line)
+                run_counts.append(counts[key])
+                continue
+            deduped.append(line)
+            run_counts.append(1)
+
+        return [
+            f'{line} (x{count})' if count > 1 else line
+            for line, count in zip(deduped, run_counts)
+        ]
+
+    @staticmethod
+    def _try_parse_json(text: str) -> Any | None:
+        stripped = text.strip()
+        if not stripped or stripped[0] not in '[{':
+            return None
+        try:
+            return json.loads(stripped)
+        except ValueError:
+            return None
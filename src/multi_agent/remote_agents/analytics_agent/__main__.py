@@ -19,6 +19,7 @@ from a2a.types import (
 from agent import ChartGenerationAgent
 from agent_executor import ChartGenerationAgentExecutor
 from dotenv import load_dotenv
+from main import add_stats_route
 
 
 load_dotenv()
@@ -33,14 +34,15 @@ logger = logging.getLogger(__name__)
 def main(host, port):
     """Entry point for the A2A Chart Generation Agent."""
     try:
-        capabilities = AgentCapabilities(streaming=False)
+        capabilities = AgentCapabilities(streaming=True)
         skill = AgentSkill(
             id='chart_generator',
             name='Chart Generator',
-            description='Generate a chart based on CSV-like data passed in',
+            description='Generate a chart based on CSV-like data passed in, or on a CSV, Parquet or Arrow file attached or referenced by URL',
             tags=['generate image', 'edit image'],
             examples=[
-                'Generate a chart of revenue: Jan,$1000 Feb,$2000 Mar,$1500'
+                'Generate a chart of revenue: Jan,$1000 Feb,$2000 Mar,$1500',
+                'Chart revenue by region from https://<account>.blob.core.windows.net/data/sales.parquet',
             ],
         )
 
@@ -49,14 +51,15 @@ def main(host, port):
             description='Generate charts from structured CSV-like data input.',
             url=f'http://{host}:{port}/',
             version='1.0.0',
-            default_input_modes=ChartGenerationAgent.SUPPORTED_CONTENT_TYPES,
+            default_input_modes=ChartGenerationAgent.SUPPORTED_INPUT_TYPES,
             default_output_modes=ChartGenerationAgent.SUPPORTED_CONTENT_TYPES,
             capabilities=capabilities,
             skills=[skill],
         )
 
+        agent_executor = ChartGenerationAgentExecutor()
         request_handler = DefaultRequestHandler(
-            agent_executor=ChartGenerationAgentExecutor(),
+            agent_executor=agent_executor,
             task_store=InMemoryTaskStore(),
         )
 
@@ -66,7 +69,9 @@ def main(host, port):
 
         import uvicorn
 
-        uvicorn.run(server.build(), host=host, port=port)
+        app = server.build()
+        add_stats_route(app, agent_executor)
+        uvicorn.run(app, host=host, port=port)
 
     except Exception as e:
         logger.error(f'An error occurred during server startup: {e}')
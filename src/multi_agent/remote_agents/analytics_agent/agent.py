@@ -1,18 +1,24 @@
-import base64
+import asyncio
 import logging
 
 from collections.abc import AsyncIterable
-from io import BytesIO
+from dataclasses import dataclass
 from typing import Any
 from uuid import uuid4
-import matplotlib.pyplot as plt
 import pandas as pd
 
+from aggregation import as_line_x, limit_categories, limit_points, read_category_values
+from a2a.types import Message
+from batch import BatchRequest, build_spec, find_batch_request
+from chart_parser import ChartData, parse_chart_data
 from crewai import LLM, Agent, Crew, Task
 from crewai.process import Process
 from crewai.tools import tool
+from data_sources import DATA_MIME_TYPES, find_data_source, load_chart_data
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from executors import CrewPool, crew_pool, render_pool
+from render_cache import chart_key, render_cache, render_cached, render_cached_async
+from rendering import compose_grid, render_bar_chart, render_chart_spec, render_line_chart
 from utils import cache
 import uuid
 
@@ -24,15 +30,47 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# One crew per crew worker thread unless configured otherwise
+CREW_POOL_SIZE = int(os.getenv('ANALYTICS_CREW_POOL_SIZE', str(crew_pool.max_workers)))
+
+
+@dataclass(slots=True)
+class Imagedata:
+    """A cached chart. ``content`` holds the raw PNG; it is base64 encoded only when sent."""
 
-class Imagedata(BaseModel):
     id: str | None = None
     name: str | None = None
     mime_type: str | None = None
-    bytes: str | None = None
+    content: bytes | None = None
     error: str | None = None
 
 
+def image_cache_key(session_id: str, image_id: str) -> str:
+    return f'{session_id}/{image_id}'
+
+
+def cache_chart_image(
+    session_id: str,
+    image_bytes: bytes,
+    image_id: str | None = None,
+    name: str = 'generated_chart.png',
+) -> Imagedata:
+    """Cache a rendered chart for the session under ``image_id`` or a new ID."""
+    data = Imagedata(
+        content=image_bytes,
+        mime_type='image/png',
+        name=name,
+        id=image_id or uuid4().hex,
+    )
+
+    logger.info(
+        f'Caching image with ID: {data.id} for session: {session_id}'
+    )
+
+    cache.set(image_cache_key(session_id, data.id), data, session=session_id)
+    return data
+
+
 @tool('ChartGenerationTool')
 def generate_chart_tool(prompt: str, session_id: str) -> str:
     """Generates a bar chart image from CSV-like input using matplotlib."""
@@ -42,51 +80,17 @@ def generate_chart_tool(prompt: str, session_id: str) -> str:
         raise ValueError('Prompt cannot be empty')
 
     try:
-        # Parse CSV-like input
-        from io import StringIO
-
-        df = pd.read_csv(StringIO(prompt))
-        if df.shape[1] != 2:
-            raise ValueError(
-                'Input must have exactly two columns: Category and Value'
-            )
-        df.columns = ['Category', 'Value']
-        df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-        if df['Value'].isnull().any():
-            raise ValueError('All values must be numeric')
-
-        # Generate bar chart
-        fig, ax = plt.subplots()
-        ax.bar(df['Category'], df['Value'])
-        ax.set_xlabel('Category')
-        ax.set_ylabel('Value')
-        ax.set_title('Bar Chart')
-
-        # Save to buffer
-        buf = BytesIO()
-        plt.savefig(buf, format='png')
-        plt.close(fig)
-        buf.seek(0)
-        image_bytes = buf.read()
-
-        # Encode image
-        data = Imagedata(
-            bytes=base64.b64encode(image_bytes).decode('utf-8'),
-            mime_type='image/png',
-            name='generated_chart.png',
-            id=uuid4().hex,
-        )
-
-        logger.info(
-            f'Caching image with ID: {data.id} for session: {session_id}'
+        # Parse CSV-like input in chunks and cap the number of bars
+        series = limit_categories(read_category_values(prompt))
+
+        # Generate bar chart in the render process pool, unless it was rendered before
+        image_id, image_bytes = render_cached(
+            render_bar_chart,
+            series.index.astype(str).tolist(),
+            series.astype(float).tolist(),
         )
 
-        # Cache image
-        session_data = cache.get(session_id) or {}
-        session_data[data.id] = data
-        cache.set(session_id, session_data)
-
-        return data.id
+        return cache_chart_image(session_id, image_bytes, image_id).id
 
     except Exception as e:
         logger.error(f'Error generating chart: {e}')
@@ -95,11 +99,17 @@ def generate_chart_tool(prompt: str, session_id: str) -> str:
 
 class ChartGenerationAgent:
     SUPPORTED_CONTENT_TYPES = ['text', 'text/plain', 'image/png']
+    SUPPORTED_INPUT_TYPES = SUPPORTED_CONTENT_TYPES + list(DATA_MIME_TYPES)
 
 
     def __init__(self):
-        
-        self.chart_creator_agent = Agent(
+        # Crew.kickoff mutates the crew, its agent and task, so concurrent
+        # requests each check out a crew of their own
+        self.crews = CrewPool(self._build_crew, CREW_POOL_SIZE)
+        self.crews.warm_up()
+
+    def _build_crew(self) -> Crew:
+        chart_creator_agent = Agent(
             role='CrewAI Chart Creation Expert',
             goal='Generate a bar chart image based on structured CSV input.',
             backstory='You are a data visualization expert who transforms structured data into visual charts.',
@@ -109,7 +119,7 @@ class ChartGenerationAgent:
             llm=LLM(model=f"azure/{os.getenv('AZURE_OPENAI_DEPLOYMENT')}")
         )
 
-        self.chart_creation_task = Task(
+        chart_creation_task = Task(
             description=(
                 "You are given a prompt: '{user_prompt}'.\n"
                 "If the prompt includes comma-separated key:value pairs (e.g. 'a:100, b:200'), "
@@ -118,12 +128,12 @@ class ChartGenerationAgent:
                 "Use session ID: '{session_id}' when calling the tool."
             ),
             expected_output='The id of the generated chart image',
-            agent=self.chart_creator_agent,
+            agent=chart_creator_agent,
         )
 
-        self.chart_crew = Crew(
-            agents=[self.chart_creator_agent],
-            tasks=[self.chart_creation_task],
+        return Crew(
+            agents=[chart_creator_agent],
+            tasks=[chart_creation_task],
             process=Process.sequential,
             verbose=False,
         )
@@ -137,38 +147,117 @@ class ChartGenerationAgent:
             f'[invoke] Using session_id: {session_id} for query: {query}'
         )
 
-        inputs = {
-            'user_prompt': query,
-            'session_id': session_id,
-        }
+        with self.crews.checkout() as crew:
+            return self._kickoff(crew, query, session_id)
 
-        response = self.chart_crew.kickoff(inputs)
+    def _kickoff(self, crew: Crew, query: str, session_id: str) -> str:
+        response = crew.kickoff({'user_prompt': query, 'session_id': session_id})
         logger.info(f'[invoke] Chart tool returned image ID: {response}')
         return response
 
-    async def stream(self, query: str) -> AsyncIterable[dict[str, Any]]:
-        raise NotImplementedError('Streaming is not supported.')
+    async def render_chart(self, chart: ChartData, session_id: str) -> str:
+        """Render already parsed chart data without the crew and return the image ID."""
+        if chart.kind == 'line':
+            renderer = render_line_chart
+            x, y = limit_points(as_line_x(chart.categories), chart.values)
+        else:
+            renderer = render_bar_chart
+            series = limit_categories(pd.Series(chart.values, index=chart.categories))
+            x, y = series.index.astype(str).tolist(), series.astype(float).tolist()
+
+        image_id, image_bytes = await render_cached_async(
+            renderer,
+            x,
+            y,
+            title=chart.title,
+            xlabel=chart.xlabel,
+            ylabel=chart.ylabel,
+        )
+        return cache_chart_image(session_id, image_bytes, image_id).id
 
-    def get_image_data(self, session_id: str, image_key: str) -> Imagedata:
-        session_data = cache.get(session_id)
+    async def render_batch(self, batch: BatchRequest, session_id: str) -> list[str]:
+        """Render every chart of a batch in parallel and return the image IDs.
 
-        if not session_data:
-            logger.error(
-                f'[get_image_data] No session data for session_id: {session_id}'
-            )
-            return Imagedata(
-                error=f'No session data found for session_id: {session_id}'
-            )
+        A grid layout returns a single image with the charts tiled into it.
+        """
+
+        async def build(index: int, chart: dict[str, Any]) -> dict[str, Any]:
+            try:
+                return await asyncio.to_thread(build_spec, chart)
+            except Exception as e:
+                raise ValueError(f'Chart {index + 1}: {e}') from e
+
+        specs = await asyncio.gather(*(build(i, chart) for i, chart in enumerate(batch.charts)))
+        rendered = await asyncio.gather(
+            *(render_cached_async(render_chart_spec, spec) for spec in specs)
+        )
+        logger.info(f'Rendered a batch of {len(rendered)} charts for session: {session_id}')
+
+        if batch.layout == 'grid':
+            key = chart_key(compose_grid.__name__, [image_id for image_id, _ in rendered], batch.columns)
+            image_bytes = await render_cache.get_async(key)
+            if image_bytes is None:
+                image_bytes = await render_pool.run(
+                    compose_grid, [image for _, image in rendered], batch.columns
+                )
+                await render_cache.set_async(key, image_bytes)
+            return [cache_chart_image(session_id, image_bytes, key, name='chart_grid.png').id]
+
+        return [
+            cache_chart_image(session_id, image_bytes, image_id, name=f'chart_{i + 1}.png').id
+            for i, (image_id, image_bytes) in enumerate(rendered)
+        ]
+
+    async def stream(
+        self, query: str, session_id: str, message: Message | None = None
+    ) -> AsyncIterable[dict[str, Any]]:
+        """Render the chart or charts a request asks for, reporting progress.
+
+        Yields ``{'stage': 'parsed' | 'rendering', 'content': ...}`` progress
+        events, then a final ``{'stage': 'rendered', 'image_ids': [...]}``
+        with the IDs of the cached images.
+        """
+        batch = find_batch_request(message, query)
+        if batch is not None:
+            yield {'stage': 'parsed', 'content': f'Received a batch of {len(batch.charts)} charts.'}
+            yield {'stage': 'rendering', 'content': f'Rendering {len(batch.charts)} charts.'}
+            image_ids = await self.render_batch(batch, session_id)
+        else:
+            source = find_data_source(message, query)
+            if source is not None:
+                # Referenced datasets are read directly and never reach the LLM
+                chart = await asyncio.to_thread(load_chart_data, source, query)
+            else:
+                chart = parse_chart_data(query)
+
+            if chart is not None:
+                # Well-formed data needs no LLM to reformat it
+                yield {'stage': 'parsed', 'content': f'Parsed {len(chart.values)} data points.'}
+                yield {'stage': 'rendering', 'content': f'Rendering a {chart.kind} chart.'}
+                image_ids = [await self.render_chart(chart, session_id)]
+            else:
+                # Run the crew (LLM round-trips and chart rendering) off the event loop
+                yield {'stage': 'rendering', 'content': 'Preparing the data and rendering the chart.'}
+                # The crew is checked out here, so waiting for one never holds a worker thread
+                async with self.crews.checkout_async() as crew:
+                    result = await crew_pool.run(self._kickoff, crew, query, session_id)
+                image_ids = [result.raw]
+
+        yield {'stage': 'rendered', 'image_ids': image_ids}
+
+    def get_image_data(self, session_id: str, image_key: str) -> Imagedata:
+        data = cache.get(image_cache_key(session_id, image_key))
 
-        if image_key not in session_data:
+        if data is None:
+            # Never created, or already expired or evicted
             logger.error(
-                f'[get_image_data] Image key {image_key} not found in session data'
+                f'[get_image_data] Image key {image_key} not found for session_id: {session_id}'
             )
             return Imagedata(
                 error=f'Image ID {image_key} not found in session {session_id}'
             )
 
-        return session_data[image_key]
+        return data
     
 if __name__ == '__main__':
     agent = ChartGenerationAgent()
@@ -1,3 +1,5 @@
+import logging
+
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.types import (
@@ -6,21 +8,50 @@ from a2a.types import (
     InvalidParamsError,
     Part,
     Task,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
     TextPart,
     UnsupportedOperationError,
 )
 from a2a.utils import (
-    completed_task,
-    new_artifact,
+    new_agent_text_message,
+    new_task,
 )
 from a2a.utils.errors import ServerError
 from agent import ChartGenerationAgent
+from artifacts import ArtifactStream, file_chunk_parts
+from executors import PoolSaturatedError
+
+
+logger = logging.getLogger(__name__)
 
 
 class ChartGenerationAgentExecutor(AgentExecutor):
     def __init__(self):
         self.agent = ChartGenerationAgent()
 
+    async def _update_status(
+        self,
+        event_queue: EventQueue,
+        task: Task,
+        state: TaskState,
+        text: str | None = None,
+        final: bool = False,
+    ) -> None:
+        await event_queue.enqueue_event(
+            TaskStatusUpdateEvent(
+                status=TaskStatus(
+                    state=state,
+                    message=new_agent_text_message(text, task.context_id, task.id)
+                    if text else None,
+                ),
+                final=final,
+                context_id=task.context_id,
+                task_id=task.id,
+            )
+        )
+
     async def execute(
         self,
         context: RequestContext,
@@ -31,48 +62,76 @@ class ChartGenerationAgentExecutor(AgentExecutor):
             raise ServerError(error=InvalidParamsError())
 
         query = context.get_user_input()
+        task = context.current_task
+        if not task:
+            task = new_task(context.message)
+            await event_queue.enqueue_event(task)
+
+        # The task is already stored, so errors end it with a failed status
+        # carrying the reason rather than leaving it in progress
+        image_keys = []
         try:
-            result = self.agent.invoke(query, context.context_id)
+            async for event in self.agent.stream(query, task.context_id, context.message):
+                if event['stage'] == 'rendered':
+                    image_keys = event['image_ids']
+                else:
+                    await self._update_status(
+                        event_queue, task, TaskState.working, event['content']
+                    )
+            await self._send_images(event_queue, task, image_keys)
+        except PoolSaturatedError as e:
+            logger.warning(f'Task {task.id} not run: {e}')
+            await self._update_status(
+                event_queue, task, TaskState.failed,
+                f'Agent is busy, try again later: {e}', final=True,
+            )
+            return
         except Exception as e:
-            raise ServerError(
-                error=ValueError(f'Error invoking agent: {e}')
-            ) from e
+            logger.exception(f'Task {task.id} failed')
+            await self._update_status(
+                event_queue, task, TaskState.failed,
+                f'Error invoking agent: {e}', final=True,
+            )
+            return
 
-        data = self.agent.get_image_data(
-            session_id=context.context_id, image_key=result.raw
-        )
-        if data and not data.error:
-            parts = [
-                Part(
-                    root=FilePart(
-                        file=FileWithBytes(
-                            bytes=data.bytes,
-                            mime_type=data.mime_type,
-                            name=data.name,
-                        )
-                    )
-                )
-            ]
+        await self._update_status(event_queue, task, TaskState.completed, final=True)
 
-        else:
-            parts = [
-                Part(
-                    root=TextPart(
-                        text=data.error
-                        if data
-                        else 'Failed to generate chart image.'
-                    ),
-                )
-            ]
+    async def _send_images(
+        self, event_queue: EventQueue, task: Task, image_keys: list[str]
+    ) -> None:
+        """Send the images as one artifact, streamed in base64 chunks.
 
-        await event_queue.enqueue_event(
-            completed_task(
-                context.task_id,
-                context.context_id,
-                [new_artifact(parts, f'chart_{context.task_id}')],
-                [context.message],
+        Each image is split into FileParts of at most ARTIFACT_CHUNK_BYTES raw
+        bytes, tagged with ``chunk`` and ``chunks`` metadata; a client rebuilds
+        the image by concatenating the base64 of its parts in order.
+        """
+        stream = ArtifactStream(task, f'chart_{task.id}')
+        for index, image_key in enumerate(image_keys):
+            data = self.agent.get_image_data(
+                session_id=task.context_id, image_key=image_key
             )
-        )
+            if not data or data.error:
+                parts = [
+                    Part(
+                        root=TextPart(
+                            text=data.error
+                            if data
+                            else 'Failed to generate chart image.'
+                        ),
+                    )
+                ]
+            else:
+                parts = file_chunk_parts(data.content, data.mime_type, data.name)
+                await self._update_status(
+                    event_queue,
+                    task,
+                    TaskState.working,
+                    f'Encoded {data.name} ({len(data.content) // 1024 or 1} KB in {len(parts)} chunks).',
+                )
+
+            for event in stream.events(parts, last=index == len(image_keys) - 1):
+                await event_queue.enqueue_event(event)
+        logger.debug(f'Task {task.id}: sent {len(image_keys)} images in {stream.sent} artifact chunks')
 
     async def cancel(
         self, request: RequestContext, event_queue: EventQueue
@@ -0,0 +1,158 @@
+# aggregation.py
+#
+# Reduces chart data of any size to what a readable chart can show, so that
+# render time and PNG size stay bounded: at most MAX_BARS bars and at most
+# MAX_LINE_POINTS points per line.
+
+import os
+
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+
+MAX_BARS = int(os.getenv('ANALYTICS_MAX_BARS', '30'))
+MAX_LINE_POINTS = int(os.getenv('ANALYTICS_MAX_LINE_POINTS', '1000'))
+CSV_CHUNK_ROWS = int(os.getenv('ANALYTICS_CSV_CHUNK_ROWS', '100000'))
+
+
+def read_category_values(text: str, chunksize: int = CSV_CHUNK_ROWS) -> pd.Series:
+    """Read two-column CSV with a header row into values summed per category.
+
+    The CSV is parsed ``chunksize`` rows at a time and each chunk is reduced
+    to per-category sums before the next is read, so memory follows the
+    number of categories rather than the number of rows. Categories keep the
+    order they first appear in.
+    """
+    parts = []
+    for chunk in pd.read_csv(StringIO(text), chunksize=chunksize):
+        if chunk.shape[1] != 2:
+            raise ValueError('Input must have exactly two columns: Category and Value')
+        values = pd.to_numeric(chunk.iloc[:, 1], errors='coerce')
+        if values.isnull().any():
+            raise ValueError('All values must be numeric')
+        parts.append(values.groupby(chunk.iloc[:, 0].astype(str), sort=False).sum())
+    if not parts:
+        raise ValueError('Input has no data rows')
+    return pd.concat(parts).groupby(level=0, sort=False).sum()
+
+
+def _bin(data: pd.Series | pd.DataFrame, positions: pd.Series, max_bars: int) -> pd.Series | pd.DataFrame:
+    """Sum rows with numeric categories into at most ``max_bars`` equal-width ranges.
+
+    Whole-number categories such as years get whole-number ranges like
+    ``1990-1994``; other numbers are cut into ``max_bars`` ranges.
+    """
+    values = positions.to_numpy(dtype=float)
+    if np.all(values == np.round(values)):
+        low, high = int(values.min()), int(values.max())
+        width = -(-(high - low + 1) // max_bars)
+        starts = low + (values.astype(int) - low) // width * width
+        binned = data.groupby(starts).sum().reindex(range(low, high + 1, width), fill_value=0)
+        binned.index = [f'{start}-{start + width - 1}' if width > 1 else str(start) for start in binned.index]
+        return binned
+
+    binned = data.groupby(pd.cut(values, bins=max_bars), observed=False).sum()
+    binned.index = [f'{interval.left:g}-{interval.right:g}' for interval in binned.index]
+    return binned
+
+
+def limit_categories(series: pd.Series, max_bars: int = MAX_BARS) -> pd.Series:
+    """Reduce a category -> value series to at most ``max_bars`` bars.
+
+    Numeric categories (years, ages, sizes) are binned into equal-width
+    ranges. Other categories keep the ``max_bars - 1`` largest by magnitude,
+    in their original order, and sum the rest into a final "Other" bar.
+    """
+    if len(series) <= max_bars:
+        return series
+
+    positions = pd.to_numeric(pd.Series(series.index), errors='coerce')
+    if positions.notna().all():
+        return _bin(series, positions, max_bars)
+
+    top = series.iloc[np.sort(np.argsort(-series.abs().to_numpy(), kind='stable')[:max_bars - 1])]
+    rest = series.drop(top.index)
+    return pd.concat([top, pd.Series({f'Other ({len(rest)} more)': rest.sum()})])
+
+
+def limit_table(table: pd.DataFrame, max_bars: int = MAX_BARS) -> pd.DataFrame:
+    """Reduce a categories x series table to at most ``max_bars`` rows.
+
+    The multi-series form of limit_categories: numeric categories are binned,
+    others keep the rows with the largest total magnitude plus an "Other" row.
+    """
+    if len(table) <= max_bars:
+        return table
+
+    positions = pd.to_numeric(pd.Series(table.index), errors='coerce')
+    if positions.notna().all():
+        return _bin(table, positions, max_bars)
+
+    magnitude = table.abs().sum(axis=1).to_numpy()
+    top = table.iloc[np.sort(np.argsort(-magnitude, kind='stable')[:max_bars - 1])]
+    rest = table.drop(top.index)
+    other = rest.sum().to_frame(f'Other ({len(rest)} more)').T
+    return pd.concat([top, other])
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> tuple[np.ndarray, np.ndarray]:
+    """Downsample a line to ``threshold`` points with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the next bucket's average, which preserves peaks and troughs that plain
+    striding would drop.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket boundaries for the n - 2 points between the first and last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        # Twice the triangle area for every candidate in the bucket at once
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        keep[i + 1] = previous
+    return x[keep], y[keep]
+
+
+def as_line_x(labels: list[str]) -> list[float] | list[str]:
+    """Use labels as numeric x values when they all are numbers."""
+    positions = pd.to_numeric(pd.Series(labels, dtype=object), errors='coerce')
+    return positions.tolist() if positions.notna().all() else labels
+
+
+def limit_points(
+    x: list[float] | list[str], y: list[float], max_points: int = MAX_LINE_POINTS
+) -> tuple[list[float] | list[str], list[float]]:
+    """Downsample a line series to at most ``max_points`` points.
+
+    Numeric x values are sorted first; labels keep their order and are
+    sampled by position.
+    """
+    if len(x) <= max_points:
+        return x, y
+    if isinstance(x[0], str):
+        positions, sampled_y = lttb(np.arange(len(x)), np.asarray(y, dtype=float), max_points)
+        return [x[int(position)] for position in positions], sampled_y.tolist()
+    order = np.argsort(np.asarray(x, dtype=float), kind='stable')
+    sampled_x, sampled_y = lttb(
+        np.asarray(x, dtype=float)[order], np.asarray(y, dtype=float)[order], max_points
+    )
+    return sampled_x.tolist(), sampled_y.tolist()
@@ -1,15 +1,16 @@
 import os
 
 # ...existing code...
-from main import get_agent_card, get_agent_card_with_public_url
+from main import add_stats_route, get_agent_card, get_agent_card_with_public_url
 from agent_executor import ChartGenerationAgentExecutor
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import InMemoryTaskStore
 from a2a.server.apps import A2AStarletteApplication
 
 # Configure handler and build the ASGI app
+agent_executor = ChartGenerationAgentExecutor()
 request_handler = DefaultRequestHandler(
-    agent_executor=ChartGenerationAgentExecutor(),
+    agent_executor=agent_executor,
     task_store=InMemoryTaskStore(),
 )
 
@@ -24,5 +25,7 @@ server = A2AStarletteApplication(
     agent_card=get_agent_card_with_public_url(PUBLIC_URL), http_handler=request_handler
 )
 
+
 # ASGI callable expected by Gunicorn/Uvicorn
-app = server.build()
\ No newline at end of file
+app = server.build()
+add_stats_route(app, agent_executor)
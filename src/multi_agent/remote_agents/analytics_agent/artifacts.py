@@ -0,0 +1,86 @@
+# artifacts.py
+
+import base64
+import os
+
+from uuid import uuid4
+
+from a2a.types import (
+    Artifact,
+    FilePart,
+    FileWithBytes,
+    Part,
+    Task,
+    TaskArtifactUpdateEvent,
+)
+
+
+# Raw image bytes per artifact chunk, kept a multiple of 3 so that the
+# chunks' base64 strings concatenate to the base64 of the whole image
+ARTIFACT_CHUNK_BYTES = int(os.getenv('ANALYTICS_ARTIFACT_CHUNK_BYTES', str(192 * 1024)))
+ARTIFACT_CHUNK_BYTES = max(3, ARTIFACT_CHUNK_BYTES - ARTIFACT_CHUNK_BYTES % 3)
+
+
+def file_chunk_parts(
+    content: bytes,
+    mime_type: str | None,
+    name: str | None,
+    chunk_bytes: int = ARTIFACT_CHUNK_BYTES,
+) -> list[Part]:
+    """Split a file into base64 FileParts of at most ``chunk_bytes`` raw bytes.
+
+    ``chunk_bytes`` must be a multiple of 3, like ARTIFACT_CHUNK_BYTES.
+
+    Each part carries ``chunk`` and ``chunks`` metadata; concatenating the
+    base64 of the parts in order gives the base64 of the whole file.
+    """
+    count = max(1, -(-len(content) // chunk_bytes))
+    return [
+        Part(
+            root=FilePart(
+                file=FileWithBytes(
+                    bytes=base64.b64encode(
+                        content[i * chunk_bytes:(i + 1) * chunk_bytes]
+                    ).decode('utf-8'),
+                    mime_type=mime_type,
+                    name=name,
+                ),
+                metadata={'chunk': i, 'chunks': count},
+            )
+        )
+        for i in range(count)
+    ]
+
+
+class ArtifactStream:
+    """Builds the update events that stream parts into a single artifact.
+
+    The first event creates the artifact and every later one appends to it;
+    the last event of the last file is marked ``last_chunk``.
+    """
+
+    def __init__(self, task: Task, name: str):
+        self.task = task
+        self.name = name
+        self.artifact_id = str(uuid4())
+        self.sent = 0
+
+    def events(self, parts: list[Part], last: bool) -> list[TaskArtifactUpdateEvent]:
+        """Return one event per part; ``last`` marks the final file of the artifact."""
+        events = []
+        for i, part in enumerate(parts):
+            events.append(
+                TaskArtifactUpdateEvent(
+                    append=self.sent > 0,
+                    context_id=self.task.context_id,
+                    task_id=self.task.id,
+                    last_chunk=last and i == len(parts) - 1,
+                    artifact=Artifact(
+                        artifact_id=self.artifact_id,
+                        name=self.name,
+                        parts=[part],
+                    ),
+                )
+            )
+            self.sent += 1
+        return events
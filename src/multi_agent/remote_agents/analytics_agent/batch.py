@@ -0,0 +1,149 @@
+# batch.py
+#
+# Several charts, each with one or more series, in a single request. A batch
+# is a JSON object, sent as an A2A DataPart or as the message text:
+#
+#   {
+#     "layout": "separate" | "grid",
+#     "columns": 2,
+#     "charts": [
+#       {"type": "bar", "title": "Revenue", "data": "Jan,$1000 Feb,$2000"},
+#       {"type": "stacked", "categories": ["Q1", "Q2"],
+#        "series": {"North": [10, 12], "South": [7, 9]}},
+#       {"type": "line", "source": "https://<account>.blob.core.windows.net/data/visits.parquet"},
+#       {"type": "pie", "categories": ["A", "B"], "values": [60, 40]}
+#     ]
+#   }
+#
+# Each chart is turned into a spec, a plain dict that rendering.render_chart_spec
+# draws in the render process pool.
+
+import json
+import os
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import pandas as pd
+
+from a2a.types import DataPart, Message
+from aggregation import as_line_x, limit_points, limit_table
+from chart_parser import parse_chart_data
+from data_sources import DataSource, load_chart_data
+
+
+MAX_BATCH_CHARTS = int(os.getenv('ANALYTICS_MAX_BATCH_CHARTS', '12'))
+
+CHART_KINDS = ('bar', 'line', 'pie', 'stacked')
+LAYOUTS = ('separate', 'grid')
+DEFAULT_TITLES = {'bar': 'Bar Chart', 'line': 'Line Chart', 'pie': 'Pie Chart', 'stacked': 'Stacked Bar Chart'}
+
+
+@dataclass(slots=True)
+class BatchRequest:
+    """The charts of a batch request and how to return them."""
+
+    charts: list[dict[str, Any]] = field(default_factory=list)
+    layout: str = 'separate'
+    columns: int = 2
+
+
+def find_batch_request(message: Message | None, text: str) -> BatchRequest | None:
+    """Return the batch in a DataPart or JSON message text, or None if there is none.
+
+    Raises ValueError for a batch that is present but malformed.
+    """
+    payload = None
+    for part in message.parts if message else []:
+        if isinstance(part.root, DataPart) and 'charts' in part.root.data:
+            payload = part.root.data
+            break
+    if payload is None and text and text.lstrip().startswith('{'):
+        try:
+            decoded = json.loads(text)
+        except ValueError:
+            return None
+        if isinstance(decoded, dict) and 'charts' in decoded:
+            payload = decoded
+    if payload is None:
+        return None
+
+    charts = payload['charts']
+    if not isinstance(charts, list) or not charts or not all(isinstance(c, dict) for c in charts):
+        raise ValueError('"charts" must be a non-empty list of chart objects')
+    if len(charts) > MAX_BATCH_CHARTS:
+        raise ValueError(f'A batch may hold at most {MAX_BATCH_CHARTS} charts, got {len(charts)}')
+    layout = payload.get('layout', 'separate')
+    if layout not in LAYOUTS:
+        raise ValueError(f'Unknown layout {layout!r}; use one of {", ".join(LAYOUTS)}')
+    return BatchRequest(charts=charts, layout=layout, columns=int(payload.get('columns', 2)))
+
+
+def _table(chart: dict[str, Any]) -> tuple[pd.DataFrame, dict[str, str]]:
+    """Load a chart's data as a categories x series table, with the labels it implies."""
+    if 'source' in chart:
+        data = load_chart_data(DataSource(uri=chart['source']), chart.get('prompt', ''))
+        return pd.DataFrame({data.ylabel: data.values}, index=data.categories), {
+            'xlabel': data.xlabel,
+            'ylabel': data.ylabel,
+        }
+    if 'data' in chart:
+        data = parse_chart_data(str(chart['data']))
+        if data is None:
+            raise ValueError('could not parse its "data"; use key:value pairs or two-column CSV')
+        return pd.DataFrame({data.ylabel: data.values}, index=data.categories), {
+            'xlabel': data.xlabel,
+            'ylabel': data.ylabel,
+            'title': data.title if data.title != 'Bar Chart' else None,
+        }
+
+    categories = chart.get('categories')
+    series = chart.get('series', {'Value': chart['values']} if 'values' in chart else None)
+    if not isinstance(categories, list) or series is None:
+        raise ValueError('needs "source", "data", or "categories" with "values" or "series"')
+    if isinstance(series, list):
+        series = {item.get('name', f'Series {i + 1}'): item['values'] for i, item in enumerate(series)}
+    for name, values in series.items():
+        if len(values) != len(categories):
+            raise ValueError(f'series {name!r} has {len(values)} values for {len(categories)} categories')
+    table = pd.DataFrame(series, index=[str(category) for category in categories])
+    return table.apply(pd.to_numeric, errors='raise').groupby(level=0, sort=False).sum(), {}
+
+
+def build_spec(chart: dict[str, Any]) -> dict[str, Any]:
+    """Turn one batch entry into a render spec. May read files; run it off the event loop."""
+    kind = chart.get('type', chart.get('kind', 'bar'))
+    if kind not in CHART_KINDS:
+        raise ValueError(f'unknown chart type {kind!r}; use one of {", ".join(CHART_KINDS)}')
+    table, implied = _table(chart)
+    if table.empty:
+        raise ValueError('has no data')
+
+    spec = {
+        'kind': kind,
+        'title': chart.get('title') or implied.get('title') or DEFAULT_TITLES[kind],
+        'xlabel': chart.get('xlabel') or implied.get('xlabel', 'Category'),
+        'ylabel': chart.get('ylabel') or implied.get('ylabel', 'Value'),
+    }
+
+    if kind == 'line':
+        x = as_line_x(table.index.tolist())
+        if isinstance(x[0], str):
+            spec['tick_labels'] = x
+            x = list(range(len(x)))
+        spec['series'] = []
+        for name in table.columns:
+            sampled_x, sampled_y = limit_points(x, table[name].astype(float).tolist())
+            spec['series'].append({'name': str(name), 'x': sampled_x, 'values': sampled_y})
+        return spec
+
+    if kind == 'pie':
+        table = table.iloc[:, :1]
+        if (table.iloc[:, 0] < 0).any():
+            raise ValueError('pie charts need non-negative values')
+    table = limit_table(table)
+    spec['categories'] = table.index.astype(str).tolist()
+    spec['series'] = [
+        {'name': str(name), 'values': table[name].astype(float).tolist()} for name in table.columns
+    ]
+    return spec
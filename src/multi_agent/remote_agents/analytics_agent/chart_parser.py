@@ -0,0 +1,212 @@
+# chart_parser.py
+
+import logging
+import re
+
+from dataclasses import dataclass, field
+
+
+logger = logging.getLogger(__name__)
+
+# A number with an optional sign, currency symbol, thousands separators,
+# decimals and a k/M multiplier or percent sign: -$1,250.50, 3.5k, 40%
+VALUE_PATTERN = (
+    r'(?P<sign>[-+])?\s?(?P<currency>[$€£¥])?\s?'
+    r'(?P<number>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?|\.\d+)'
+    r'(?P<suffix>%|[kKmM](?![\w]))?'
+)
+
+# A label starts with a letter; in a single line it may span a few words
+LABEL_PATTERN = r"[^\W\d_][\w&'./-]*(?: [^\W\d_\s][\w&'./-]*)*"
+
+# Between a label and its value: a colon, equals sign, comma, tab, pipe or spaces
+PAIR_SEPARATOR = r'\s*[:=,;\t|]\s*|\s+'
+
+_PAIR = re.compile(rf'(?P<label>{LABEL_PATTERN})(?:{PAIR_SEPARATOR})(?P<value>{VALUE_PATTERN})')
+_PAIR_GAP = re.compile(r'[\s,;|]*')
+_VALUE = re.compile(rf'^{VALUE_PATTERN}$')
+_ROW = re.compile(
+    rf'^\s*(?P<label>.+?)(?P<separator>{PAIR_SEPARATOR})'
+    rf'(?P<quote>["\']?)(?P<value>{VALUE_PATTERN})(?P=quote)\s*$'
+)
+_REQUEST_WORDS = re.compile(
+    r'^\s*(?:please\s+)?(?:(?:generate|create|make|plot|draw|show|build|render|chart|graph)\s+)?'
+    r'(?:me\s+)?(?:an?\s+|the\s+)?(?:(?:bar|line)\s+)?(?:(?:chart|graph|plot)\b\s*)?(?:(?:of|for|showing)\b)?\s*',
+    re.IGNORECASE,
+)
+
+# The fast path draws bar and line charts; anything else goes to the crew
+OTHER_CHART_TYPES = ('pie', 'scatter', 'area', 'histogram', 'stacked', 'donut', 'bubble')
+
+MULTIPLIERS = {'k': 1e3, 'K': 1e3, 'm': 1e6, 'M': 1e6}
+
+
+@dataclass(slots=True)
+class ChartData:
+    """Categories and values parsed from a chart request, ready to render."""
+
+    categories: list[str] = field(default_factory=list)
+    values: list[float] = field(default_factory=list)
+    kind: str = 'bar'
+    title: str = 'Bar Chart'
+    xlabel: str = 'Category'
+    ylabel: str = 'Value'
+
+
+def parse_value(text: str) -> tuple[float, str | None] | None:
+    """Parse a number such as ``$1,200``, ``3.5k`` or ``-40%``.
+
+    Returns the value and its currency symbol, or None if ``text`` is not a
+    number.
+    """
+    match = _VALUE.match(text.strip())
+    if not match:
+        return None
+    value = float(match['number'].replace(',', ''))
+    if match['suffix'] in MULTIPLIERS:
+        value *= MULTIPLIERS[match['suffix']]
+    if match['sign'] == '-':
+        value = -value
+    return value, match['currency']
+
+
+def _parse_pairs(text: str) -> list[tuple[str, str]] | None:
+    """Split a single line into label/value pairs, or None if anything is left over."""
+    pairs, position = [], 0
+    separators, grouped = text, False
+    for match in _PAIR.finditer(text):
+        if not _PAIR_GAP.fullmatch(text, position, match.start()):
+            return None
+        pairs.append((match['label'], match['value']))
+        position = match.end()
+        separators = separators.replace(match['value'], ' ', 1)
+        grouped = grouped or (',' in match['number'] and not match['currency'])
+    if not pairs or not _PAIR_GAP.fullmatch(text, position):
+        return None
+
+    # In "a:100,200" the comma may group thousands or separate values
+    if grouped and (',' in separators or len(pairs) == 1):
+        return None
+
+    # "Chart this a:1, b:2" reads as a label "Chart this a"; a first label
+    # longer than every other one is more likely an instruction than data
+    word_counts = [len(label.split()) for label, _ in pairs]
+    if word_counts[0] > max(word_counts[1:], default=1):
+        return None
+    return pairs
+
+
+def _parse_header(line: str) -> tuple[str, str] | None:
+    """Split a two-column header row such as ``Month,Revenue`` or ``Month  Revenue``."""
+    delimiter = next((d for d in ',\t;|' if d in line), None)
+    columns = [column.strip(' "\'') for column in line.split(delimiter)]
+    return (columns[0], columns[1]) if len(columns) == 2 and all(columns) else None
+
+
+def _parse_rows(lines: list[str]) -> tuple[list[tuple[str, str]], tuple[str, str] | None] | None:
+    """Split one label/value pair per line, with an optional header row."""
+    pairs, header = [], None
+    for index, line in enumerate(lines):
+        match = _ROW.match(line)
+        if not match:
+            # Only the first row may be a header
+            header = _parse_header(line) if index == 0 else None
+            if header is None:
+                return None
+            continue
+        # "A,100,200" could be 100200 or a third column; quotes or a currency settle it
+        if (
+            match['separator'].strip() == ','
+            and ',' in match['number']
+            and not (match['quote'] or match['currency'])
+        ):
+            return None
+        pairs.append((match['label'].strip(' "\''), match['value']))
+    return (pairs, header) if pairs else None
+
+
+def _parse_data(text: str) -> ChartData | None:
+    lines = [line for line in text.strip().splitlines() if line.strip()]
+    header = None
+    if len(lines) > 1:
+        parsed = _parse_rows(lines)
+        if parsed is None:
+            return None
+        pairs, header = parsed
+    elif lines:
+        pairs = _parse_pairs(lines[0])
+        if pairs is None:
+            return None
+    else:
+        return None
+
+    chart = ChartData()
+    currencies = set()
+    for label, text_value in pairs:
+        parsed_value = parse_value(text_value)
+        if parsed_value is None:
+            return None
+        value, currency = parsed_value
+        currencies.add(currency)
+        chart.categories.append(label)
+        chart.values.append(value)
+
+    # Repeated categories or mixed currencies need a human (or the LLM) to interpret
+    if len(set(chart.categories)) != len(chart.categories) or len(currencies - {None}) > 1:
+        return None
+
+    if header:
+        chart.xlabel, chart.ylabel = header
+    currency = next(iter(currencies - {None}), None)
+    if currency:
+        chart.ylabel = f'{chart.ylabel} ({currency})'
+    return chart
+
+
+def title_from(instruction: str) -> str | None:
+    """Take the title from "Generate a chart of <title>"."""
+    title = _REQUEST_WORDS.sub('', instruction, count=1).strip()
+    return title[:1].upper() + title[1:] if title else None
+
+
+def requested_kind(instruction: str) -> str | None:
+    """Return 'bar' or 'line' for the chart an instruction asks for, or None for other kinds."""
+    lowered = instruction.lower()
+    if any(re.search(rf'\b{kind}\b', lowered) for kind in OTHER_CHART_TYPES):
+        return None
+    if re.search(r'\b(?:line|trend|time series)\b', lowered):
+        return 'line'
+    return 'bar'
+
+
+def parse_chart_data(prompt: str) -> ChartData | None:
+    """Parse well-formed chart data without calling the LLM.
+
+    Understands key:value pairs (``a:100, b:200``), CSV and whitespace tables
+    with an optional header row, label/value pairs on one line
+    (``Jan,$1000 Feb,$2000``), currency symbols and thousands separators, all
+    optionally preceded by an instruction ending in a colon ("Generate a chart
+    of revenue: ..."). Returns None whenever the input is ambiguous, so the
+    caller can fall back to the crew.
+    """
+    if not prompt or not prompt.strip():
+        return None
+
+    chart = _parse_data(prompt)
+    instruction = ''
+    if chart is None and ':' in prompt:
+        instruction, data = prompt.split(':', 1)
+        if '\n' in instruction.strip():
+            return None
+        chart = _parse_data(data)
+    if chart is None:
+        return None
+
+    kind = requested_kind(instruction)
+    if kind is None:
+        return None
+    if kind == 'line':
+        chart.kind, chart.title = 'line', 'Line Chart'
+    chart.title = title_from(instruction) or chart.title
+    logger.info(f'Parsed {len(chart.values)} data points without the crew')
+    return chart
@@ -0,0 +1,300 @@
+# data_sources.py
+#
+# Loads chart data from files instead of prompt text: an A2A FilePart, a
+# blob or HTTPS URL, or a local file under ANALYTICS_DATA_ROOT, in CSV,
+# Parquet or Arrow IPC format. Only the two charted columns are read, and
+# local Parquet and Arrow files are memory-mapped.
+
+import base64
+import fnmatch
+import logging
+import os
+import posixpath
+import re
+
+from dataclasses import dataclass
+from urllib.parse import unquote, urlsplit
+
+import httpx
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from a2a.types import FilePart, FileWithBytes, FileWithUri, Message
+from chart_parser import ChartData, requested_kind, title_from
+
+
+logger = logging.getLogger(__name__)
+
+# Local files are only read below this directory; unset disables file paths
+DATA_ROOT = os.getenv('ANALYTICS_DATA_ROOT')
+# Blob containers read with the agent's own identity, as comma separated URL
+# prefixes such as https://<account>.blob.core.windows.net/<container>/. Other
+# blob URLs are only downloaded when they carry a SAS token.
+DATA_CONTAINERS = [
+    prefix.strip().rstrip('/') + '/'
+    for prefix in os.getenv('ANALYTICS_DATA_CONTAINERS', '').split(',')
+    if prefix.strip()
+]
+# Other hosts data may be downloaded from, comma separated, with * wildcards
+DATA_HOSTS = [
+    host.strip()
+    for host in os.getenv('ANALYTICS_DATA_HOSTS', '').split(',')
+    if host.strip()
+]
+BLOB_HOST_SUFFIX = '.blob.core.windows.net'
+MAX_DATA_BYTES = int(os.getenv('ANALYTICS_MAX_DATA_BYTES', str(512 * 1024 * 1024)))
+DOWNLOAD_TIMEOUT_SECONDS = float(os.getenv('ANALYTICS_DOWNLOAD_TIMEOUT_SECONDS', '60'))
+
+DATA_MIME_TYPES = {
+    'text/csv': 'csv',
+    'application/vnd.apache.parquet': 'parquet',
+    'application/x-parquet': 'parquet',
+    'application/vnd.apache.arrow.file': 'arrow',
+    'application/vnd.apache.arrow.stream': 'arrow',
+}
+DATA_EXTENSIONS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+}
+
+_URI = re.compile(r'''(?:https?|file)://[^\s'"<>]+''')
+_TRAILING_WORDS = re.compile(r'\s*\b(?:from|in|at|using|with)\s*[:,]?\s*$', re.IGNORECASE)
+
+
+@dataclass(slots=True)
+class DataSource:
+    """A dataset referenced by a request: a URI or the bytes of a FilePart."""
+
+    uri: str | None = None
+    content: bytes | None = None
+    name: str | None = None
+    mime_type: str | None = None
+
+    @property
+    def label(self) -> str:
+        return self.name or _redact(self.uri) or 'attached file'
+
+    @property
+    def format(self) -> str:
+        if self.mime_type in DATA_MIME_TYPES:
+            return DATA_MIME_TYPES[self.mime_type]
+        extension = _extension(self.name or urlsplit(self.uri or '').path)
+        if extension in DATA_EXTENSIONS:
+            return DATA_EXTENSIONS[extension]
+        if self.content is not None:
+            if self.content[:4] == b'PAR1':
+                return 'parquet'
+            if self.content[:6] == b'ARROW1':
+                return 'arrow'
+        return 'csv'
+
+
+def _extension(path: str) -> str:
+    return os.path.splitext(unquote(path))[1].lower()
+
+
+def _redact(uri: str | None) -> str | None:
+    """Drop the query string, which may hold a SAS token, from log messages."""
+    return uri.split('?', 1)[0] if uri else uri
+
+
+def _is_data_file(name: str | None, mime_type: str | None) -> bool:
+    return mime_type in DATA_MIME_TYPES or _extension(name or '') in DATA_EXTENSIONS
+
+
+def find_data_source(message: Message | None, text: str) -> DataSource | None:
+    """Find a dataset in the request's file parts or a data file URI in its text."""
+    for part in message.parts if message else []:
+        if not isinstance(part.root, FilePart):
+            continue
+        file = part.root.file
+        if not _is_data_file(file.name, file.mime_type):
+            continue
+        if isinstance(file, FileWithBytes):
+            # Four base64 characters per three bytes; check before decoding
+            if len(file.bytes) // 4 * 3 > MAX_DATA_BYTES:
+                raise ValueError(f'{file.name or "Attached file"} is larger than {MAX_DATA_BYTES} bytes')
+            return DataSource(
+                content=base64.b64decode(file.bytes), name=file.name, mime_type=file.mime_type
+            )
+        if isinstance(file, FileWithUri):
+            return DataSource(uri=file.uri, name=file.name, mime_type=file.mime_type)
+
+    for match in _URI.finditer(text or ''):
+        uri = match.group(0).rstrip('.,;)')
+        if uri.startswith('file://') or _extension(urlsplit(uri).path) in DATA_EXTENSIONS:
+            return DataSource(uri=uri)
+    return None
+
+
+def _local_path(uri: str) -> str:
+    """Resolve a file URI, refusing anything outside ANALYTICS_DATA_ROOT."""
+    if not DATA_ROOT:
+        raise ValueError('Local data files are disabled; set ANALYTICS_DATA_ROOT to enable them')
+    root = os.path.realpath(DATA_ROOT)
+    path = os.path.realpath(os.path.join(root, unquote(urlsplit(uri).path).lstrip('/')))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f'{uri} is outside the data directory')
+    return path
+
+
+def _in_data_container(uri: str) -> bool:
+    """Whether ``uri`` names a blob under one of DATA_CONTAINERS."""
+    parts = urlsplit(uri)
+    path = unquote(parts.path)
+    # Refuse dot segments that could step out of the container
+    if posixpath.normpath(path) != path.rstrip('/') or '//' in path:
+        return False
+    location = f'{parts.scheme}://{(parts.hostname or "").lower()}{path}'
+    return any(location.startswith(prefix.lower()) for prefix in DATA_CONTAINERS)
+
+
+def _download(uri: str) -> bytes:
+    """Download ``uri``, up to MAX_DATA_BYTES, if the request may read it.
+
+    Blob URLs without a SAS token are read with the agent's identity, and so
+    only from the containers in DATA_CONTAINERS; blob URLs with a SAS token
+    are read anonymously. Other URLs must be on a host in DATA_HOSTS.
+    """
+    parts = urlsplit(uri)
+    host = (parts.hostname or '').lower()
+    is_blob = host.endswith(BLOB_HOST_SUFFIX) and parts.scheme == 'https'
+    if is_blob and not parts.query:
+        if not _in_data_container(uri):
+            raise ValueError(
+                f'{_redact(uri)} is not in an allowed data container; '
+                'add a SAS token or list the container in ANALYTICS_DATA_CONTAINERS'
+            )
+        # No SAS token in the URL; authenticate as the agent's identity
+        from azure.identity import DefaultAzureCredential
+        from azure.storage.blob import BlobClient
+
+        blob = BlobClient.from_blob_url(uri, credential=DefaultAzureCredential())
+        if blob.get_blob_properties().size > MAX_DATA_BYTES:
+            raise ValueError(f'{_redact(uri)} is larger than {MAX_DATA_BYTES} bytes')
+        return blob.download_blob().readall()
+
+    if not is_blob and not any(fnmatch.fnmatch(host, pattern) for pattern in DATA_HOSTS):
+        raise ValueError(f'Downloading data from {host} is not allowed')
+
+    chunks, size = [], 0
+    with httpx.stream('GET', uri, timeout=DOWNLOAD_TIMEOUT_SECONDS, follow_redirects=False) as response:
+        response.raise_for_status()
+        for chunk in response.iter_bytes():
+            size += len(chunk)
+            if size > MAX_DATA_BYTES:
+                raise ValueError(f'{_redact(uri)} is larger than {MAX_DATA_BYTES} bytes')
+            chunks.append(chunk)
+    return b''.join(chunks)
+
+
+class _Dataset:
+    """An opened data source that can report its schema and read selected columns."""
+
+    def __init__(self, source: DataSource):
+        self.format = source.format
+        self.path = None
+        self.buffer = None
+        if source.content is not None:
+            self.buffer = pa.py_buffer(source.content)
+        elif source.uri.startswith('file://'):
+            self.path = _local_path(source.uri)
+            if self.format == 'csv' and os.path.getsize(self.path) > MAX_DATA_BYTES:
+                raise ValueError(f'{source.label} is larger than {MAX_DATA_BYTES} bytes')
+        else:
+            self.buffer = pa.py_buffer(_download(source.uri))
+
+    def _input(self):
+        if self.path is not None:
+            return pa.memory_map(self.path) if self.format != 'csv' else self.path
+        return pa.BufferReader(self.buffer)
+
+    def _arrow_reader(self, input_file):
+        try:
+            return pa.ipc.open_file(input_file)
+        except pa.ArrowInvalid:
+            input_file.seek(0)
+            return pa.ipc.open_stream(input_file)
+
+    def schema(self) -> pa.Schema:
+        if self.format == 'parquet':
+            return pq.read_schema(self._input())
+        if self.format == 'arrow':
+            return self._arrow_reader(self._input()).schema
+        return pa_csv.open_csv(self._input()).schema
+
+    def read(self, columns: list[str]) -> pa.Table:
+        if self.format == 'parquet':
+            return pq.read_table(self._input(), columns=columns, memory_map=self.path is not None)
+        if self.format == 'arrow':
+            # Select per record batch so other columns are never materialized;
+            # batches of a memory-mapped file are read without copying
+            reader = self._arrow_reader(self._input())
+            if isinstance(reader, pa.ipc.RecordBatchFileReader):
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            else:
+                batches = reader
+            schema = pa.schema([reader.schema.field(name) for name in columns])
+            return pa.Table.from_batches([batch.select(columns) for batch in batches], schema=schema)
+        return pa_csv.read_csv(
+            self._input(), convert_options=pa_csv.ConvertOptions(include_columns=columns)
+        )
+
+
+def _is_numeric(field: pa.Field) -> bool:
+    return (
+        pa.types.is_integer(field.type)
+        or pa.types.is_floating(field.type)
+        or pa.types.is_decimal(field.type)
+    )
+
+
+def pick_columns(schema: pa.Schema, prompt: str) -> tuple[str, str]:
+    """Choose the category and value columns, preferring columns the prompt names."""
+
+    def mentioned(names: list[str]) -> list[str]:
+        return [name for name in names if re.search(rf'\b{re.escape(name)}\b', prompt, re.IGNORECASE)]
+
+    numeric = [field.name for field in schema if _is_numeric(field)]
+    if not numeric:
+        raise ValueError('The data has no numeric column to chart')
+    value = (mentioned(numeric) or numeric)[0]
+
+    others = [field.name for field in schema if not _is_numeric(field)]
+    candidates = [name for name in schema.names if name != value]
+    choices = mentioned(others) or mentioned(candidates) or others or candidates
+    if not choices:
+        raise ValueError('The data needs a second column to use as categories')
+    return choices[0], value
+
+
+def load_chart_data(source: DataSource, prompt: str) -> ChartData:
+    """Read a dataset and reduce it to values per category. Blocks; run it off the event loop."""
+    instruction = _URI.sub('', prompt or '')
+    kind = requested_kind(instruction)
+    if kind is None:
+        raise ValueError('Only bar and line charts can be drawn from data files')
+
+    dataset = _Dataset(source)
+    category, value = pick_columns(dataset.schema(), instruction)
+    frame = dataset.read([category, value]).to_pandas()
+    series = frame[value].groupby(frame[category].astype(str), sort=False).sum()
+    logger.info(
+        f'Loaded {len(frame)} rows ({len(series)} categories) of {category}/{value} from {source.label}'
+    )
+
+    chart = ChartData(
+        categories=series.index.tolist(),
+        values=series.astype(float).tolist(),
+        kind=kind,
+        title='Line Chart' if kind == 'line' else 'Bar Chart',
+        xlabel=category,
+        ylabel=value,
+    )
+    chart.title = title_from(_TRAILING_WORDS.sub('', instruction)) or chart.title
+    return chart
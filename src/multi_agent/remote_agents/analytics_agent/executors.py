@@ -0,0 +1,362 @@
+# executors.py
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import (
+    CancelledError,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Generic, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+CREW_CHECKOUT_TIMEOUT_SECONDS = float(os.getenv('ANALYTICS_CREW_CHECKOUT_TIMEOUT_SECONDS', '30'))
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when a pool's queue is full and the work is rejected."""
+
+
+def _timed_call(fn: Callable[..., Any], args: tuple, kwargs: dict) -> tuple[float, Any]:
+    """Run ``fn`` and report when it started. Top level so it pickles to worker processes."""
+    started = time.time()
+    return started, fn(*args, **kwargs)
+
+
+class MeteredExecutor:
+    """A bounded thread or process pool with queue and timing metrics.
+
+    At most ``max_workers`` calls run at once and at most ``max_queue`` more
+    wait for a worker; further submissions raise PoolSaturatedError instead
+    of queueing without limit. Process pools use the ``spawn`` start method,
+    so workers never inherit the server's threads or locks.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, processes: bool = False):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.processes = processes
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.processes:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Submit ``fn`` to the pool and return a future for its result."""
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PoolSaturatedError(
+                    f'{self.name} pool is saturated ({self.pending} calls pending)'
+                )
+            self.pending += 1
+            self.submitted += 1
+            executor = self._get_executor()
+
+        submitted_at = time.time()
+        result: Future = Future()
+        try:
+            inner = executor.submit(_timed_call, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+                self.failed += 1
+                if self._executor is executor:
+                    self._executor = None
+            raise
+
+        def on_done(inner: Future) -> None:
+            finished = time.time()
+            with self._lock:
+                self.pending -= 1
+                error = CancelledError() if inner.cancelled() else inner.exception()
+                if error is None:
+                    started, value = inner.result()
+                    waited = max(0.0, started - submitted_at)
+                    self.completed += 1
+                    self.total_wait_seconds += waited
+                    self.max_wait_seconds = max(self.max_wait_seconds, waited)
+                    self.total_run_seconds += finished - started
+                else:
+                    self.failed += 1
+                    if isinstance(error, BrokenProcessPool) and self._executor is executor:
+                        # A worker died; start a fresh pool for the next submission
+                        logger.error(f'{self.name} pool broke: {error}')
+                        self._executor = None
+            if error is None:
+                result.set_result(value)
+            else:
+                result.set_exception(error)
+
+        inner.add_done_callback(on_done)
+        return result
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn`` in the pool and block until it finishes."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn`` in the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> dict[str, Any]:
+        """Return pool size, queue depth and timing metrics."""
+        with self._lock:
+            finished = self.completed or 1
+            return {
+                'kind': 'process' if self.processes else 'thread',
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'pending': self.pending,
+                'running': min(self.pending, self.max_workers),
+                'queue_depth': max(0, self.pending - self.max_workers),
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'avg_wait_ms': round(1000 * self.total_wait_seconds / finished, 1),
+                'max_wait_ms': round(1000 * self.max_wait_seconds, 1),
+                'avg_run_ms': round(1000 * self.total_run_seconds / finished, 1),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Runs CrewAI crews, which spend most of their time waiting on the LLM
+crew_pool = MeteredExecutor(
+    'crew',
+    max_workers=int(os.getenv('ANALYTICS_CREW_WORKERS', '8')),
+    max_queue=int(os.getenv('ANALYTICS_CREW_QUEUE', '32')),
+)
+
+# Renders charts; matplotlib is CPU bound and not thread safe
+render_pool = MeteredExecutor(
+    'render',
+    max_workers=int(os.getenv('ANALYTICS_RENDER_WORKERS', str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv('ANALYTICS_RENDER_QUEUE', '64')),
+    processes=True,
+)
+
+
+class CrewPool(Generic[T]):
+    """Pre-built crews that in-flight requests check out one at a time.
+
+    Holds up to ``size`` crews. ``warm_up`` builds them ahead of the first
+    request; afterwards a missing crew is built on demand. A crew whose
+    kickoff raised is dropped rather than reused, since its state is
+    unknown.
+
+    Coroutines check a crew out with ``checkout_async`` before handing work
+    to a pool thread. When every crew is busy they wait on the event loop, not
+    in a worker thread, for up to ``timeout`` seconds and then raise
+    PoolSaturatedError. The blocking ``checkout`` never waits; it raises
+    PoolSaturatedError at once when every crew is busy.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], T],
+        size: int,
+        timeout: float = CREW_CHECKOUT_TIMEOUT_SECONDS,
+    ):
+        self._factory = factory
+        self.size = size
+        self.timeout = timeout
+        self._idle: list[T] = []
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+        self._created = 0
+
+        # Metrics
+        self.checkouts = 0
+        self.waits = 0
+        self.discarded = 0
+        self.rejected = 0
+
+    def warm_up(self) -> None:
+        """Build crews until the pool is full."""
+        started = time.monotonic()
+        while self._reserve():
+            self._release(self._build())
+        logger.info(f'Built {self._created} crews in {time.monotonic() - started:.2f}s')
+
+    def _reserve(self) -> bool:
+        """Claim a slot for a new crew if the pool is not full."""
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def _build(self) -> T:
+        try:
+            return self._factory()
+        except Exception:
+            self._discard()
+            raise
+
+    def _take_idle(self) -> T | None:
+        with self._lock:
+            return self._idle.pop() if self._idle else None
+
+    def _release(self, crew: T) -> None:
+        """Hand ``crew`` to the longest waiting coroutine, or return it to the pool."""
+        with self._lock:
+            if not self._waiters:
+                self._idle.append(crew)
+                return
+            loop, waiter = self._waiters.popleft()
+        loop.call_soon_threadsafe(self._hand_over, waiter, crew)
+
+    def _discard(self) -> None:
+        """Free the slot of a crew that is not coming back, waking a waiter to rebuild it."""
+        with self._lock:
+            self._created -= 1
+            if not self._waiters:
+                return
+            loop, waiter = self._waiters.popleft()
+        loop.call_soon_threadsafe(self._hand_over, waiter, None)
+
+    def _hand_over(self, waiter: asyncio.Future, crew: T | None) -> None:
+        # Runs on the waiter's loop; a waiter that timed out passes the crew on
+        if not waiter.done():
+            waiter.set_result(crew)
+        elif crew is not None:
+            self._release(crew)
+        else:
+            # Pass the freed slot on to the next waiter
+            with self._lock:
+                self._created += 1
+            self._discard()
+
+    def _saturated(self) -> PoolSaturatedError:
+        with self._lock:
+            self.rejected += 1
+        return PoolSaturatedError(f'No crew is free ({self.size} crews busy)')
+
+    async def _acquire_async(self) -> T:
+        deadline = time.monotonic() + self.timeout
+        loop = asyncio.get_running_loop()
+        waited = False
+        while True:
+            with self._lock:
+                if self._idle:
+                    return self._idle.pop()
+                build = self._created < self.size
+                if build:
+                    self._created += 1
+                else:
+                    waiter = loop.create_future()
+                    self._waiters.append((loop, waiter))
+                    if not waited:
+                        self.waits += 1
+                        waited = True
+            if build:
+                return await asyncio.to_thread(self._build)
+
+            try:
+                crew = await asyncio.wait_for(waiter, max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                with self._lock:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+                raise self._saturated() from None
+            if crew is not None:
+                return crew
+            # A crew was discarded, freeing a slot to build its replacement
+            with self._lock:
+                self._created += 1
+            return await asyncio.to_thread(self._build)
+
+    @asynccontextmanager
+    async def checkout_async(self) -> AsyncIterator[T]:
+        """Check out a crew, waiting on the event loop while every crew is busy."""
+        crew = await self._acquire_async()
+        with self._lock:
+            self.checkouts += 1
+        try:
+            yield crew
+        except BaseException:
+            with self._lock:
+                self.discarded += 1
+            self._discard()
+            raise
+        self._release(crew)
+
+    @contextmanager
+    def checkout(self) -> Iterator[T]:
+        """Check out a crew without waiting. Raises PoolSaturatedError if none is free."""
+        crew = self._take_idle()
+        if crew is None:
+            if not self._reserve():
+                raise self._saturated()
+            crew = self._build()
+        with self._lock:
+            self.checkouts += 1
+        try:
+            yield crew
+        except BaseException:
+            with self._lock:
+                self.discarded += 1
+            self._discard()
+            raise
+        self._release(crew)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'size': self.size,
+                'created': self._created,
+                'idle': len(self._idle),
+                'waiting': len(self._waiters),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'discarded': self.discarded,
+                'rejected': self.rejected,
+            }
+
+
+def pool_stats() -> dict[str, Any]:
+    """Return the metrics of both pools."""
+    return {'crew': crew_pool.stats(), 'render': render_pool.stats()}
@@ -20,6 +20,13 @@ from a2a.types import (
 from agent import ChartGenerationAgent
 from agent_executor import ChartGenerationAgentExecutor
 from dotenv import load_dotenv
+from executors import pool_stats
+from render_cache import render_cache
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from utils import cache
 
 
 load_dotenv()
@@ -30,14 +37,15 @@ logger = logging.getLogger(__name__)
 
 def get_agent_card(host: str, port: int):
     """Returns the Agent Card for the Chart Generation Agent."""
-    capabilities = AgentCapabilities(streaming=False)
+    capabilities = AgentCapabilities(streaming=True)
     skill = AgentSkill(
         id='chart_generator',
         name='Chart Generator',
-        description='Generate a chart based on CSV-like data passed in',
+        description='Generate a chart based on CSV-like data passed in, or on a CSV, Parquet or Arrow file attached or referenced by URL',
         tags=['generate image', 'edit image'],
         examples=[
-            'Generate a chart of revenue: Jan,$1000 Feb,$2000 Mar,$1500'
+            'Generate a chart of revenue: Jan,$1000 Feb,$2000 Mar,$1500',
+            'Chart revenue by region from https://<account>.blob.core.windows.net/data/sales.parquet',
         ],
     )
 
@@ -46,7 +54,7 @@ def get_agent_card(host: str, port: int):
         description='Generate charts from structured CSV-like data input.',
         url=f'http://{host}:{port}/',
         version='1.0.0',
-        default_input_modes=ChartGenerationAgent.SUPPORTED_CONTENT_TYPES,
+        default_input_modes=ChartGenerationAgent.SUPPORTED_INPUT_TYPES,
         default_output_modes=ChartGenerationAgent.SUPPORTED_CONTENT_TYPES,
         capabilities=capabilities,
         skills=[skill],
@@ -56,14 +64,15 @@ def get_agent_card(host: str, port: int):
 
 def get_agent_card_with_public_url(public_url: str):
     """Returns the Agent Card for the Chart Generation Agent."""
-    capabilities = AgentCapabilities(streaming=False)
+    capabilities = AgentCapabilities(streaming=True)
     skill = AgentSkill(
         id='chart_generator',
         name='Chart Generator',
-        description='Generate a chart based on CSV-like data passed in',
+        description='Generate a chart based on CSV-like data passed in, or on a CSV, Parquet or Arrow file attached or referenced by URL',
         tags=['generate image', 'edit image'],
         examples=[
-            'Generate a chart of revenue: Jan,$1000 Feb,$2000 Mar,$1500'
+            'Generate a chart of revenue: Jan,$1000 Feb,$2000 Mar,$1500',
+            'Chart revenue by region from https://<account>.blob.core.windows.net/data/sales.parquet',
         ],
     )
 
@@ -72,10 +81,26 @@ def get_agent_card_with_public_url(public_url: str):
         description='Generate charts from structured CSV-like data input.',
         url=public_url if public_url.endswith('/') else f'{public_url}/',
         version='1.0.0',
-        default_input_modes=ChartGenerationAgent.SUPPORTED_CONTENT_TYPES,
+        default_input_modes=ChartGenerationAgent.SUPPORTED_INPUT_TYPES,
         default_output_modes=ChartGenerationAgent.SUPPORTED_CONTENT_TYPES,
         capabilities=capabilities,
         skills=[skill],
     )
 
     return agent_card
+
+
+async def stats(request: Request) -> JSONResponse:
+    """Report pool queue depth and timings, crew usage and image and render cache usage."""
+    return JSONResponse({
+        **pool_stats(),
+        'crews': request.app.state.agent_executor.agent.crews.stats(),
+        'cache': cache.stats(),
+        'render_cache': render_cache.stats(),
+    })
+
+
+def add_stats_route(app: Starlette, agent_executor: ChartGenerationAgentExecutor) -> None:
+    """Serve ``stats`` at /stats for the app built around ``agent_executor``."""
+    app.state.agent_executor = agent_executor
+    app.routes.append(Route('/stats', stats, methods=['GET']))
@@ -0,0 +1,211 @@
+# render_cache.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from collections.abc import Callable
+from typing import Any
+
+import matplotlib
+
+from executors import render_pool
+from rendering import RENDER_VERSION
+from utils import InMemoryCache
+
+
+logger = logging.getLogger(__name__)
+
+# Memory tier: 64 MB of PNGs for a day. The disk tier is off unless a directory is set.
+RENDER_CACHE_MAX_BYTES = int(os.getenv('ANALYTICS_RENDER_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+RENDER_CACHE_TTL_SECONDS = float(os.getenv('ANALYTICS_RENDER_CACHE_TTL_SECONDS', '86400'))
+RENDER_CACHE_DIR = os.getenv('ANALYTICS_RENDER_CACHE_DIR')
+RENDER_CACHE_DISK_MAX_BYTES = int(
+    os.getenv('ANALYTICS_RENDER_CACHE_DISK_MAX_BYTES', str(1024 * 1024 * 1024))
+)
+
+
+def chart_key(renderer: str, *args: Any, **kwargs: Any) -> str:
+    """Hash a renderer and its normalized arguments into a chart ID.
+
+    Numbers are normalized to floats, so ``100`` and ``100.0`` hit the same
+    entry; the ID is 32 hex digits, like the uuid4 IDs it replaces. The
+    renderer version and matplotlib version are part of the key, so charts
+    cached on disk by older rendering code are never served.
+    """
+
+    def normalize(value: Any) -> Any:
+        if isinstance(value, bool) or value is None or isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, dict):
+            return {str(k): normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        return str(value)
+
+    payload = json.dumps(
+        [RENDER_VERSION, matplotlib.__version__, renderer, normalize(list(args)), normalize(kwargs)],
+        sort_keys=True,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+class RenderCache:
+    """Rendered PNGs keyed by chart_key, shared across sessions.
+
+    A bounded in-memory tier sits in front of an optional directory of PNG
+    files, which survives restarts and can be shared by replicas on the same
+    volume. The disk tier deletes its least recently used files when it
+    grows past ``disk_max_bytes``; a hit refreshes the file's mtime.
+
+    ``get`` and ``set`` may touch the disk and block; coroutines use
+    ``get_async`` and ``set_async``, which do the disk I/O in a thread.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = RENDER_CACHE_MAX_BYTES,
+        ttl: float = RENDER_CACHE_TTL_SECONDS,
+        directory: str | None = RENDER_CACHE_DIR,
+        disk_max_bytes: int = RENDER_CACHE_DISK_MAX_BYTES,
+    ):
+        self.memory = InMemoryCache(max_bytes=max_bytes, ttl=ttl, max_per_session=0)
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+
+        # Metrics
+        self.disk_hits = 0
+        self.renders = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    def get(self, key: str) -> bytes | None:
+        image_bytes = self.memory.get(key)
+        if image_bytes is not None or not self.directory:
+            return image_bytes
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                image_bytes = f.read()
+            # Pruning goes by mtime, so mark the file as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f'Failed to read cached chart {key}: {e}')
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        self.memory.set(key, image_bytes)
+        return image_bytes
+
+    def set(self, key: str, image_bytes: bytes) -> None:
+        """Cache a freshly rendered chart."""
+        with self._lock:
+            self.renders += 1
+        self.memory.set(key, image_bytes)
+        if self.directory:
+            self._write(key, image_bytes)
+
+    async def get_async(self, key: str) -> bytes | None:
+        image_bytes = self.memory.get(key)
+        if image_bytes is not None or not self.directory:
+            return image_bytes
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key: str, image_bytes: bytes) -> None:
+        """Cache a freshly rendered chart, writing the disk tier in a thread."""
+        if not self.directory:
+            self.set(key, image_bytes)
+            return
+        await asyncio.to_thread(self.set, key, image_bytes)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'memory': self.memory.stats(),
+                'disk': {
+                    'enabled': bool(self.directory),
+                    'bytes': self._disk_bytes,
+                    'max_bytes': self.disk_max_bytes,
+                    'hits': self.disk_hits,
+                },
+                'renders': self.renders,
+            }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.png')
+
+    def _disk_files(self) -> list[tuple[str, int, float]]:
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.png') and entry.is_file():
+                    stat = entry.stat()
+                    files.append((entry.path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _write(self, key: str, image_bytes: bytes) -> None:
+        """Write atomically, then prune the least recently used files if over budget."""
+        path = self._path(key)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(image_bytes)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f'Failed to write cached chart {key}: {e}')
+            return
+
+        with self._lock:
+            self._disk_bytes += len(image_bytes)
+            if self._disk_bytes <= self.disk_max_bytes:
+                return
+            # Prune to 90% of the budget so every write does not rescan the directory
+            files = sorted(self._disk_files(), key=lambda file: file[2])
+            total = sum(size for _, size, _ in files)
+            for file_path, size, _ in files:
+                if total <= 0.9 * self.disk_max_bytes:
+                    break
+                try:
+                    os.remove(file_path)
+                    total -= size
+                except OSError:
+                    pass
+            self._disk_bytes = total
+
+
+render_cache = RenderCache()
+
+
+def render_cached(renderer: Callable[..., bytes], *args: Any, **kwargs: Any) -> tuple[str, bytes]:
+    """Return the chart ID and PNG, rendering in the render pool on a cache miss. Blocks."""
+    key = chart_key(renderer.__name__, *args, **kwargs)
+    image_bytes = render_cache.get(key)
+    if image_bytes is None:
+        image_bytes = render_pool.call(renderer, *args, **kwargs)
+        render_cache.set(key, image_bytes)
+    return key, image_bytes
+
+
+async def render_cached_async(
+    renderer: Callable[..., bytes], *args: Any, **kwargs: Any
+) -> tuple[str, bytes]:
+    """Return the chart ID and PNG, rendering in the render pool on a cache miss."""
+    key = chart_key(renderer.__name__, *args, **kwargs)
+    image_bytes = await render_cache.get_async(key)
+    if image_bytes is None:
+        image_bytes = await render_pool.run(renderer, *args, **kwargs)
+        await render_cache.set_async(key, image_bytes)
+    return key, image_bytes
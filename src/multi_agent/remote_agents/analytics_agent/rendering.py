@@ -0,0 +1,169 @@
+# rendering.py
+#
+# Chart rendering functions run in the render process pool. They are top-level
+# functions that take and return plain data so they pickle to worker processes.
+
+from io import BytesIO
+
+import matplotlib
+
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+
+# Part of every render cache key: bump it whenever a change in this module
+# alters the images drawn, so PNGs cached by older code are not served
+RENDER_VERSION = 1
+
+# Charts are drawn at a fixed resolution and at most MAX_FIGURE_WIDTH inches
+# wide, so the PNG size does not grow with the data
+DPI = 100
+FIGURE_HEIGHT = 4.8
+MIN_FIGURE_WIDTH = 6.4
+MAX_FIGURE_WIDTH = 16
+MAX_LABEL_LENGTH = 20
+
+
+def _short_label(label: str) -> str:
+    return label if len(label) <= MAX_LABEL_LENGTH else label[:MAX_LABEL_LENGTH - 1] + '…'
+
+
+def _to_png(fig) -> bytes:
+    buf = BytesIO()
+    fig.tight_layout()
+    fig.savefig(buf, format='png', dpi=DPI)
+    return buf.getvalue()
+
+
+def render_bar_chart(
+    categories: list[str],
+    values: list[float],
+    title: str = 'Bar Chart',
+    xlabel: str = 'Category',
+    ylabel: str = 'Value',
+) -> bytes:
+    """Render a bar chart and return it as PNG bytes."""
+    width = min(MAX_FIGURE_WIDTH, max(MIN_FIGURE_WIDTH, 0.4 * len(categories)))
+    fig, ax = plt.subplots(figsize=(width, FIGURE_HEIGHT))
+    try:
+        ax.bar([_short_label(str(category)) for category in categories], values)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        if len(categories) > 8:
+            ax.tick_params(axis='x', labelrotation=60)
+        return _to_png(fig)
+    finally:
+        plt.close(fig)
+
+
+def render_line_chart(
+    x: list[float] | list[str],
+    y: list[float],
+    title: str = 'Line Chart',
+    xlabel: str = 'Category',
+    ylabel: str = 'Value',
+) -> bytes:
+    """Render a line chart and return it as PNG bytes.
+
+    ``x`` may be numbers or labels; with many labels only some are shown.
+    """
+    fig, ax = plt.subplots(figsize=(MAX_FIGURE_WIDTH * 0.6, FIGURE_HEIGHT))
+    try:
+        if x and isinstance(x[0], str):
+            positions = list(range(len(x)))
+            ax.plot(positions, y)
+            step = max(1, len(x) // 12)
+            ax.set_xticks(positions[::step])
+            ax.set_xticklabels([_short_label(label) for label in x[::step]], rotation=45)
+        else:
+            ax.plot(x, y)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        return _to_png(fig)
+    finally:
+        plt.close(fig)
+
+
+def _draw_spec(ax, spec: dict) -> None:
+    """Draw a chart spec (see batch.py) with one or more series on ``ax``."""
+    kind = spec.get('kind', 'bar')
+    categories = [_short_label(str(category)) for category in spec.get('categories', [])]
+    series = spec['series']
+
+    if kind == 'pie':
+        # A pie shows the first series only
+        ax.pie(series[0]['values'], labels=categories, autopct='%1.0f%%', startangle=90)
+        ax.axis('equal')
+    elif kind == 'line':
+        # Lines carry their own numeric x, downsampled separately; labelled
+        # x axes use positions, with some of the labels as ticks
+        for line in series:
+            ax.plot(line['x'], line['values'], label=line.get('name'))
+        tick_labels = spec.get('tick_labels')
+        if tick_labels:
+            step = max(1, len(tick_labels) // 12)
+            ax.set_xticks(list(range(len(tick_labels)))[::step])
+            ax.set_xticklabels([_short_label(str(label)) for label in tick_labels[::step]], rotation=45)
+    else:
+        positions = list(range(len(categories)))
+        width = 0.8 if kind == 'stacked' else 0.8 / len(series)
+        bottoms = [0.0] * len(categories)
+        for index, bars in enumerate(series):
+            if kind == 'stacked':
+                ax.bar(positions, bars['values'], width, bottom=bottoms, label=bars.get('name'))
+                bottoms = [bottom + value for bottom, value in zip(bottoms, bars['values'])]
+            else:
+                offset = (index - (len(series) - 1) / 2) * width
+                ax.bar([p + offset for p in positions], bars['values'], width, label=bars.get('name'))
+        ax.set_xticks(positions)
+        ax.set_xticklabels(categories, rotation=60 if len(categories) > 8 else 0)
+
+    if kind != 'pie':
+        ax.set_xlabel(spec.get('xlabel', 'Category'))
+        ax.set_ylabel(spec.get('ylabel', 'Value'))
+    ax.set_title(spec.get('title', ''))
+    if len(series) > 1 and kind != 'pie':
+        ax.legend()
+
+
+def render_chart_spec(spec: dict) -> bytes:
+    """Render a bar, line, pie or stacked bar chart spec and return it as PNG bytes."""
+    count = len(spec.get('categories', []))
+    width = min(MAX_FIGURE_WIDTH, max(MIN_FIGURE_WIDTH, 0.4 * count * len(spec['series'])))
+    if spec.get('kind') in ('pie', 'line'):
+        width = MIN_FIGURE_WIDTH if spec.get('kind') == 'pie' else MAX_FIGURE_WIDTH * 0.6
+    fig, ax = plt.subplots(figsize=(width, FIGURE_HEIGHT))
+    try:
+        _draw_spec(ax, spec)
+        return _to_png(fig)
+    finally:
+        plt.close(fig)
+
+
+def compose_grid(images: list[bytes], columns: int = 2) -> bytes:
+    """Tile rendered PNGs into one image, ``columns`` per row, without re-rendering them."""
+    from PIL import Image
+
+    tiles = [Image.open(BytesIO(image)).convert('RGB') for image in images]
+    cell_width = max(tile.width for tile in tiles)
+    cell_height = max(tile.height for tile in tiles)
+    columns = max(1, min(columns, len(tiles)))
+    rows = -(-len(tiles) // columns)
+
+    grid = Image.new('RGB', (cell_width * columns, cell_height * rows), 'white')
+    for index, tile in enumerate(tiles):
+        row, column = divmod(index, columns)
+        grid.paste(
+            tile,
+            (
+                column * cell_width + (cell_width - tile.width) // 2,
+                row * cell_height + (cell_height - tile.height) // 2,
+            ),
+        )
+    buf = BytesIO()
+    grid.save(buf, format='PNG', optimize=True)
+    return buf.getvalue()
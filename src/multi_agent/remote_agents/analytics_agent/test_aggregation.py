@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script for chart data reduction.
+
+Checks that bar charts are limited to MAX_BARS in category order, that
+numeric categories are binned into readable ranges, and that long lines are
+downsampled without losing their extremes.
+"""
+import numpy as np
+import pandas as pd
+
+from aggregation import limit_categories, limit_points, limit_table, lttb, read_category_values
+
+
+def test_aggregation():
+    """Test category limits, binning, LTTB and chunked CSV reading."""
+    months = pd.Series({f'M{i}': float(i) for i in range(100)})
+    limited = limit_categories(months, 5)
+    assert limited.index.tolist() == ['M96', 'M97', 'M98', 'M99', 'Other (96 more)'], limited.index.tolist()
+    assert limited.sum() == months.sum(), 'Other bar must hold the remaining total'
+    print(f"✅ Top categories keep their order: {limited.index.tolist()}")
+
+    years = pd.Series({str(1990 + i): 1.0 for i in range(31)})
+    binned = limit_categories(years, 30)
+    assert len(binned) <= 30 and binned.sum() == 31, binned
+    assert binned.index[0] == '1990-1991', binned.index.tolist()
+    print(f"✅ Years are binned into whole-year ranges: {binned.index.tolist()[:3]}...")
+
+    table = pd.DataFrame(
+        {'North': range(100), 'South': range(100)}, index=[f'M{i}' for i in range(100)]
+    )
+    limited = limit_table(table, 4)
+    assert limited.index.tolist() == ['M97', 'M98', 'M99', 'Other (97 more)'], limited.index.tolist()
+    assert (limited.sum() == table.sum()).all(), limited
+    print(f"✅ Tables are limited per row: {limited.index.tolist()}")
+
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 500)
+    y[4321] = 50.0
+    sampled_x, sampled_y = lttb(x, y, 200)
+    assert len(sampled_x) == 200, len(sampled_x)
+    assert sampled_x[0] == 0 and sampled_x[-1] == 9_999, 'LTTB must keep the endpoints'
+    assert 50.0 in sampled_y, 'LTTB must keep the spike'
+    print("✅ LTTB keeps the endpoints and the spike")
+
+    shuffled = np.random.default_rng(0).permutation(5_000).astype(float)
+    sampled_x, sampled_y = limit_points(shuffled.tolist(), (shuffled * 2).tolist(), 100)
+    assert len(sampled_x) == 100 and sampled_x == sorted(sampled_x), 'x values must be sorted'
+    assert all(value == 2 * position for position, value in zip(sampled_x, sampled_y)), 'points must stay paired'
+    print("✅ Numeric x values are sorted before sampling")
+
+    labels = [f'day {i}' for i in range(2_000)]
+    sampled_x, _ = limit_points(labels, list(range(2_000)), 50)
+    assert len(sampled_x) == 50 and (sampled_x[0], sampled_x[-1]) == ('day 0', 'day 1999'), sampled_x
+    print("✅ Label x values are sampled by position")
+
+    csv = 'Category,Value\n' + '\n'.join(f'{"AB"[i % 2]},{i}' for i in range(1_000))
+    series = read_category_values(csv, chunksize=64)
+    assert series.to_dict() == {'A': sum(range(0, 1_000, 2)), 'B': sum(range(1, 1_000, 2))}, series
+    print("✅ CSV is summed per category across chunks")
+
+
+if __name__ == "__main__":
+    test_aggregation()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming chart images as artifact chunks.
+
+Splits images into chunks the way the executor sends them, applies the
+update events to a task the way the host receives them, and checks that the
+host's join_file_chunks rebuilds every image byte for byte.
+"""
+import base64
+import os
+import sys
+
+from a2a.types import Part, Task, TaskState, TaskStatus, TextPart
+from a2a.utils import append_artifact_to_task
+
+from artifacts import ArtifactStream, file_chunk_parts
+
+# join_file_chunks lives with the host agent, which reassembles the chunks
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'host_agent'))
+from routing_agent import join_file_chunks  # noqa: E402
+
+
+IMAGES = [
+    (b'\x89PNG' + bytes(range(256)) * 40, 'chart_1.png'),  # 10244 bytes, several chunks
+    (b'\x89PNG' + b'\x00', 'chart_2.png'),  # smaller than one chunk
+    (b'\x89PNG' + bytes(range(251)) * 7, 'chart_3.png'),  # ends mid chunk
+]
+
+
+def stream_to_task(files: list[list[Part]]) -> tuple[Task, list]:
+    """Send ``files`` as one artifact and apply each event to a fresh task."""
+    task = Task(id='task', context_id='context', status=TaskStatus(state=TaskState.working))
+    stream = ArtifactStream(task, 'charts')
+    events = []
+    for index, parts in enumerate(files):
+        for event in stream.events(parts, last=index == len(files) - 1):
+            events.append(event)
+            append_artifact_to_task(task, event)
+    return task, events
+
+
+def test_chunk_parts():
+    """Chunks are at most chunk_bytes and carry their position."""
+    content, name = IMAGES[0]
+    parts = file_chunk_parts(content, 'image/png', name, chunk_bytes=3_000)
+    assert [part.root.metadata for part in parts] == [
+        {'chunk': i, 'chunks': 4} for i in range(4)
+    ], [part.root.metadata for part in parts]
+    assert all(len(base64.b64decode(part.root.file.bytes)) <= 3_000 for part in parts)
+    assert ''.join(part.root.file.bytes for part in parts) == base64.b64encode(content).decode()
+    print(f"✅ Split a {len(content)} byte image into {len(parts)} chunks")
+
+
+def test_round_trip():
+    """Several images streamed as chunks are rebuilt in order by the host."""
+    files = [
+        file_chunk_parts(content, 'image/png', name, chunk_bytes=999)
+        for content, name in IMAGES
+    ]
+    task, events = stream_to_task(files)
+
+    assert [event.append for event in events] == [False] + [True] * (len(events) - 1)
+    assert [event.last_chunk for event in events] == [False] * (len(events) - 1) + [True]
+    assert len({event.artifact.artifact_id for event in events}) == 1
+    assert len(task.artifacts) == 1 and len(task.artifacts[0].parts) == len(events)
+
+    joined = join_file_chunks(task.artifacts[0].parts)
+    assert [part.root.file.name for part in joined] == [name for _, name in IMAGES]
+    for part, (content, _) in zip(joined, IMAGES):
+        assert base64.b64decode(part.root.file.bytes) == content, part.root.file.name
+        assert part.root.file.mime_type == 'image/png'
+    print(f"✅ Rebuilt {len(joined)} images from {len(events)} artifact chunks")
+
+
+def test_error_between_images():
+    """A text part for a missing image does not merge neighbouring files."""
+    first, second = IMAGES[0], IMAGES[2]
+    files = [
+        file_chunk_parts(first[0], 'image/png', first[1], chunk_bytes=999),
+        [Part(root=TextPart(text='Image ID x not found in session context'))],
+        file_chunk_parts(second[0], 'image/png', second[1], chunk_bytes=999),
+    ]
+    task, _ = stream_to_task(files)
+
+    joined = join_file_chunks(task.artifacts[0].parts)
+    assert [part.root.kind for part in joined] == ['file', 'text', 'file'], joined
+    assert base64.b64decode(joined[0].root.file.bytes) == first[0]
+    assert base64.b64decode(joined[2].root.file.bytes) == second[0]
+    print("✅ Error text between images keeps the images apart")
+
+
+if __name__ == "__main__":
+    test_chunk_parts()
+    test_round_trip()
+    test_error_between_images()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for batch chart requests.
+
+Parses a batch from message text, builds specs for bar, stacked, pie and
+line charts, renders them, composes them into a grid, and checks that
+malformed batches are rejected.
+"""
+import io
+import json
+
+from PIL import Image
+
+from batch import build_spec, find_batch_request
+from rendering import compose_grid, render_chart_spec
+
+
+BATCH = {
+    'layout': 'grid',
+    'columns': 2,
+    'charts': [
+        {'type': 'bar', 'title': 'Revenue', 'data': 'Jan,$1000 Feb,$2000 Mar,$1500'},
+        {
+            'type': 'stacked',
+            'categories': ['Q1', 'Q2', 'Q3'],
+            'series': {'North': [10, 12, 9], 'South': [7, 9, 11]},
+        },
+        {'type': 'pie', 'categories': ['A', 'B', 'C'], 'values': [60, 30, 10]},
+        {
+            'type': 'line',
+            'categories': [str(day) for day in range(1, 2001)],
+            'series': [{'name': 'Visits', 'values': [day % 97 for day in range(1, 2001)]}],
+        },
+    ],
+}
+
+MALFORMED = [
+    {'charts': []},
+    {'charts': [{'type': 'bar', 'values': [1]}], 'layout': 'mosaic'},
+    {'charts': [{'type': 'bar'}] * 100},
+]
+
+
+def rejected(call, *args) -> str:
+    """Return the ValueError raised by ``call``; fail if it accepts the input."""
+    try:
+        call(*args)
+    except ValueError as e:
+        return str(e)
+    raise AssertionError(f"{call.__name__} accepted {args}")
+
+
+def test_batch():
+    """Test batch parsing, spec building, rendering and grid composition."""
+    batch = find_batch_request(None, json.dumps(BATCH))
+    assert batch is not None and batch.layout == 'grid', f"Batch not recognized: {batch}"
+    assert len(batch.charts) == 4, batch.charts
+    print("✅ Batch parsed from message text")
+
+    specs = [build_spec(chart) for chart in batch.charts]
+    kinds = [spec['kind'] for spec in specs]
+    assert kinds == ['bar', 'stacked', 'pie', 'line'], kinds
+    assert specs[0]['title'] == 'Revenue', specs[0]['title']
+    assert [series['name'] for series in specs[1]['series']] == ['North', 'South'], specs[1]['series']
+    assert len(specs[3]['series'][0]['x']) <= 1000, 'Line chart was not downsampled'
+    assert 'tick_labels' not in specs[3], 'Numeric line labels were drawn as text'
+    print(f"✅ Built specs: {kinds}")
+
+    images = [render_chart_spec(spec) for spec in specs]
+    assert all(image.startswith(b'\x89PNG') for image in images), 'Rendered charts are not PNGs'
+    print(f"✅ Rendered {len(images)} charts")
+
+    grid = Image.open(io.BytesIO(compose_grid(images, batch.columns)))
+    first = Image.open(io.BytesIO(images[0]))
+    assert grid.width >= 2 * first.width and grid.height >= 2 * first.height, (
+        f"Grid is {grid.size}, expected 2x2 tiles of {first.size}"
+    )
+    print(f"✅ Composed a {grid.width}x{grid.height} grid")
+
+    for payload in MALFORMED:
+        print(f"✅ Rejected malformed batch: {rejected(find_batch_request, None, json.dumps(payload))}")
+
+    rejected(build_spec, {'type': 'pie', 'categories': ['A', 'B'], 'values': [1, -1]})
+    print("✅ Rejected pie chart with a negative value")
+
+
+if __name__ == "__main__":
+    test_batch()
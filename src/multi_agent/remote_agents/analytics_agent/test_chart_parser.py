@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for the chart data fast path.
+
+Checks that well-formed inputs parse without the crew and that ambiguous
+ones are left for it.
+"""
+
+from chart_parser import parse_chart_data
+
+
+PARSED = {
+    'Generate a chart of revenue: Jan,$1000 Feb,$2000 Mar,$1500': (['Jan', 'Feb', 'Mar'], [1000, 2000, 1500]),
+    'a:100, b:200': (['a', 'b'], [100, 200]),
+    'Category,Value\nA,100\nB,200': (['A', 'B'], [100, 200]),
+    'City  Sales\nNew York 1,200\nBoston 900': (['New York', 'Boston'], [1200, 900]),
+    'A,"1,000"\nB,"2,500"': (['A', 'B'], [1000, 2500]),
+    'Quarterly spend: Q1 3.5k, Q2 -1.5k': (['Q1', 'Q2'], [3500, -1500]),
+}
+
+AMBIGUOUS = [
+    'a:100,200',
+    'A,100,200\nB,1,000',
+    'Month,Sales,Cost\nJan,1,2',
+    'Chart this data a:100, b:200',
+    'Make a pie chart of sales: a:1, b:2',
+    'Jan,$1,000 Feb,€2,000',
+    'x:1 x:2',
+    'What were our top vendors last quarter?',
+]
+
+
+def test_chart_parser():
+    """Test the parsed values and the fallbacks to the crew."""
+    for prompt, (categories, values) in PARSED.items():
+        chart = parse_chart_data(prompt)
+        assert chart is not None, f"{prompt!r} was not parsed"
+        assert (chart.categories, chart.values) == (categories, values), f"{prompt!r} parsed as {chart}"
+        print(f"✅ {prompt!r} -> {chart.title}: {list(zip(chart.categories, chart.values))}")
+
+    for prompt in AMBIGUOUS:
+        chart = parse_chart_data(prompt)
+        assert chart is None, f"{prompt!r} should fall back to the crew, parsed as {chart}"
+        print(f"✅ {prompt!r} falls back to the crew")
+
+    chart = parse_chart_data('Generate a chart of revenue: Jan,$1000 Feb,$2000')
+    assert (chart.title, chart.ylabel) == ('Revenue', 'Value ($)'), f"Unexpected labels: {chart}"
+
+    chart = parse_chart_data('Plot a line chart of visits:\n' + '\n'.join(f'{day},{day * 10}' for day in range(1, 31)))
+    assert chart is not None and chart.kind == 'line', f"Line chart not recognized: {chart}"
+    assert chart.title == 'Visits' and len(chart.values) == 30, f"Unexpected line chart: {chart}"
+
+
+if __name__ == "__main__":
+    test_chart_parser()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for the crew pool.
+
+Checks that crews are reused, that a crew whose kickoff failed is discarded
+and rebuilt, that a busy pool hands crews to waiting coroutines, and that
+checkouts fail with PoolSaturatedError instead of blocking a worker thread.
+"""
+import asyncio
+import itertools
+import time
+
+from executors import CrewPool, PoolSaturatedError
+
+
+def make_pool(size: int, timeout: float = 1.0) -> CrewPool:
+    counter = itertools.count(1)
+    return CrewPool(lambda: f'crew-{next(counter)}', size, timeout)
+
+
+def test_reuse():
+    """Crews built by warm_up are checked out again instead of rebuilt."""
+    pool = make_pool(2)
+    pool.warm_up()
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as second:
+        assert second == first, 'Most recently used crew was not reused'
+    stats = pool.stats()
+    assert stats['created'] == 2 and stats['idle'] == 2 and stats['checkouts'] == 2, stats
+    print("✅ Crews are reused")
+
+
+def test_discard_on_error():
+    """A crew whose body raised is dropped and its slot rebuilt on demand."""
+    pool = make_pool(1)
+    try:
+        with pool.checkout() as crew:
+            raise RuntimeError('kickoff failed')
+    except RuntimeError:
+        pass
+    stats = pool.stats()
+    assert stats['created'] == 0 and stats['idle'] == 0 and stats['discarded'] == 1, stats
+
+    with pool.checkout() as rebuilt:
+        assert rebuilt != crew, 'Failed crew was handed out again'
+    print("✅ Failed crews are discarded and rebuilt")
+
+
+def test_sync_fails_fast():
+    """The blocking checkout raises at once when every crew is busy."""
+    pool = make_pool(1, timeout=5)
+    with pool.checkout():
+        started = time.monotonic()
+        try:
+            with pool.checkout():
+                raise AssertionError('Checked out more crews than the pool holds')
+        except PoolSaturatedError:
+            pass
+        assert time.monotonic() - started < 0.5, 'Blocking checkout waited for a crew'
+    assert pool.stats()['rejected'] == 1, pool.stats()
+    print("✅ Blocking checkout fails fast when saturated")
+
+
+def test_async_handover():
+    """Waiting coroutines receive released crews, and a discard lets one rebuild."""
+    pool = make_pool(1)
+
+    async def use(delay: float, fail: bool = False) -> str:
+        async with pool.checkout_async() as crew:
+            await asyncio.sleep(delay)
+            if fail:
+                raise RuntimeError('kickoff failed')
+            return crew
+
+    async def run() -> list:
+        return await asyncio.gather(
+            use(0.05), use(0.05, fail=True), use(0), return_exceptions=True
+        )
+
+    first, failed, last = asyncio.run(run())
+    assert first == 'crew-1' and isinstance(failed, RuntimeError), (first, failed)
+    assert last == 'crew-2', 'Waiter did not rebuild the discarded crew'
+    stats = pool.stats()
+    assert stats['waits'] == 2 and stats['waiting'] == 0 and stats['discarded'] == 1, stats
+    print("✅ Waiting coroutines receive released and rebuilt crews")
+
+
+def test_async_timeout():
+    """A coroutine waiting longer than the timeout gets PoolSaturatedError."""
+    pool = make_pool(1, timeout=0.05)
+
+    async def run() -> None:
+        async with pool.checkout_async() as crew:
+            try:
+                async with pool.checkout_async():
+                    raise AssertionError('Checked out more crews than the pool holds')
+            except PoolSaturatedError:
+                pass
+        # The crew goes back to the pool, not to the waiter that gave up
+        async with pool.checkout_async() as again:
+            assert again == crew
+
+    asyncio.run(run())
+    stats = pool.stats()
+    assert stats['rejected'] == 1 and stats['waiting'] == 0 and stats['idle'] == 1, stats
+    print("✅ Async checkout times out with PoolSaturatedError")
+
+
+if __name__ == "__main__":
+    test_reuse()
+    test_discard_on_error()
+    test_sync_fails_fast()
+    test_async_handover()
+    test_async_timeout()
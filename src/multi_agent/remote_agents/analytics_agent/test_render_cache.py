@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the render cache.
+
+Checks chart keys, the memory and disk tiers, the async accessors, and that
+the disk tier prunes its least recently used files.
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+import render_cache
+
+from render_cache import RenderCache, chart_key
+
+
+def test_chart_key():
+    """Keys ignore int/float spelling but change with the data and renderer version."""
+    key = chart_key('render_bar_chart', ['a', 'b'], [1, 2], title='T')
+    assert key == chart_key('render_bar_chart', ['a', 'b'], [1.0, 2.0], title='T')
+    assert key != chart_key('render_bar_chart', ['a', 'b'], [1, 3], title='T')
+    assert key != chart_key('render_line_chart', ['a', 'b'], [1, 2], title='T')
+    assert len(key) == 32
+
+    version = render_cache.RENDER_VERSION
+    try:
+        render_cache.RENDER_VERSION = version + 1
+        assert key != chart_key('render_bar_chart', ['a', 'b'], [1, 2], title='T'), (
+            'Renderer version is not part of the key'
+        )
+    finally:
+        render_cache.RENDER_VERSION = version
+    print("✅ Chart keys normalize numbers and include the renderer version")
+
+
+def test_tiers():
+    """Charts are served from memory, then from disk after the memory tier is lost."""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = RenderCache(directory=directory)
+        assert cache.get('missing') is None
+        cache.set('chart', b'png')
+        assert cache.get('chart') == b'png'
+        assert os.path.exists(os.path.join(directory, 'chart.png'))
+
+        restarted = RenderCache(directory=directory)
+        assert restarted.get('chart') == b'png', 'Disk tier did not survive a restart'
+        assert restarted.get('chart') == b'png'
+        stats = restarted.stats()
+        assert stats['disk']['hits'] == 1 and stats['memory']['hits'] == 1, stats
+
+    memory_only = RenderCache(directory=None)
+    memory_only.set('chart', b'png')
+    assert memory_only.get('chart') == b'png' and memory_only.stats()['renders'] == 1
+    print("✅ Memory and disk tiers")
+
+
+def test_async_access():
+    """get_async and set_async behave like get and set."""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = RenderCache(directory=directory)
+
+        async def run() -> None:
+            await cache.set_async('chart', b'png')
+            cache.memory.clear()
+            assert await cache.get_async('chart') == b'png'
+            assert await cache.get_async('missing') is None
+
+        asyncio.run(run())
+    print("✅ Async accessors")
+
+
+def test_disk_pruning():
+    """Pruning removes the least recently used files, not the oldest written."""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = RenderCache(directory=directory, disk_max_bytes=2_500)
+        cache.set('a', b'x' * 1_000)
+        cache.set('b', b'x' * 1_000)
+        old = time.time() - 100
+        for key in 'ab':
+            os.utime(os.path.join(directory, f'{key}.png'), (old, old))
+
+        cache.memory.clear()
+        assert cache.get('a') is not None  # a disk hit marks a as recently used
+        cache.set('c', b'x' * 1_000)
+
+        assert sorted(os.listdir(directory)) == ['a.png', 'c.png'], os.listdir(directory)
+        assert cache.stats()['disk']['bytes'] == 2_000, cache.stats()
+    print("✅ Disk tier prunes least recently used files")
+
+
+if __name__ == "__main__":
+    test_chart_key()
+    test_tiers()
+    test_async_access()
+    test_disk_pruning()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the analytics agent's in-memory cache.
+
+Checks TTL expiry, least-recently-used eviction under the byte budget, the
+per-session cap, and byte accounting under concurrent writers.
+"""
+import threading
+import time
+
+from utils import InMemoryCache
+
+
+def test_expiry():
+    """Entries expire after the default or per-entry TTL."""
+    cache = InMemoryCache(max_bytes=0, ttl=0.05, max_per_session=0)
+    cache.set('short', b'x')
+    cache.set('long', b'x', ttl=60)
+    cache.set('forever', b'x', ttl=0)
+    assert cache.get('short') == b'x'
+    time.sleep(0.1)
+    assert cache.get('short') is None, 'Entry outlived its TTL'
+    assert cache.get('long') == b'x' and cache.get('forever') == b'x'
+    assert cache.stats()['expirations'] == 1, cache.stats()
+    print("✅ Entries expire after their TTL")
+
+
+def test_byte_budget():
+    """The least recently used entries are evicted once the budget is exceeded."""
+    cache = InMemoryCache(max_bytes=300, ttl=0, max_per_session=0)
+    for key in 'abc':
+        cache.set(key, b'x' * 100)
+    assert cache.get('a') is not None  # a is now the most recently used
+    cache.set('d', b'x' * 100)
+    assert cache.get('b') is None, 'Least recently used entry was kept'
+    assert all(cache.get(key) is not None for key in 'acd')
+    assert cache.stats()['bytes'] == 300, cache.stats()
+
+    cache.set('huge', b'x' * 301)
+    assert cache.get('huge') is None and cache.stats()['rejected'] == 1, cache.stats()
+    assert cache.stats()['entries'] == 3, 'An oversized entry evicted others'
+    print("✅ Byte budget evicts least recently used entries")
+
+
+def test_session_cap():
+    """A session over its cap loses its oldest entries; other sessions are untouched."""
+    cache = InMemoryCache(max_bytes=0, ttl=0, max_per_session=2)
+    cache.set('other', b'x', session='s2')
+    for key in ('one', 'two', 'three'):
+        cache.set(key, b'x', session='s1')
+    assert cache.get('one') is None, 'Oldest session entry was kept'
+    assert cache.get('two') and cache.get('three') and cache.get('other')
+    assert cache.stats()['session_evictions'] == 1, cache.stats()
+
+    cache.delete_session('s1')
+    assert cache.get('two') is None and cache.get('other') == b'x'
+    assert cache.stats()['sessions'] == 1, cache.stats()
+    print("✅ Per-session cap and session deletion")
+
+
+def test_concurrent_writers():
+    """Byte accounting stays exact with many threads writing and deleting."""
+    cache = InMemoryCache(max_bytes=5_000, ttl=0, max_per_session=5)
+
+    def worker(n: int) -> None:
+        for i in range(500):
+            cache.set(f'{n}-{i % 20}', b'x' * (i % 50 + 1), session=f's{n % 3}')
+            if i % 7 == 0:
+                cache.delete(f'{n}-{(i + 3) % 20}')
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats['bytes'] == sum(entry.size for entry in cache._store.values()), stats
+    assert stats['bytes'] <= 5_000, stats
+    assert all(len(keys) <= 5 for keys in cache._sessions.values())
+    print(f"✅ Concurrent writers keep accounting exact: {stats['entries']} entries, {stats['bytes']} bytes")
+
+
+if __name__ == "__main__":
+    test_expiry()
+    test_byte_budget()
+    test_session_cap()
+    test_concurrent_writers()
@@ -1,34 +1,197 @@
 # utils.py
 
+import logging
+import os
+import sys
 import threading
+import time
 
+from collections import OrderedDict
 from typing import Any
 
 
+logger = logging.getLogger(__name__)
+
+# Defaults for the shared cache: 256 MB, one hour, 20 charts per session
+CACHE_MAX_BYTES = int(os.getenv('ANALYTICS_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.getenv('ANALYTICS_CACHE_TTL_SECONDS', '3600'))
+CACHE_MAX_PER_SESSION = int(os.getenv('ANALYTICS_CACHE_MAX_PER_SESSION', '20'))
+
+# How often set() sweeps out expired entries that nobody reads any more
+PURGE_INTERVAL_SECONDS = 60
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the bytes held by ``value``, counting strings and bytes by length."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(estimate_size(item) for item in value)
+    if hasattr(value, '__dict__'):
+        return estimate_size(vars(value))
+    if hasattr(value, '__slots__'):
+        return sum(estimate_size(getattr(value, slot, None)) for slot in value.__slots__)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'expires_at', 'session')
+
+    def __init__(self, value: Any, size: int, expires_at: float | None, session: str | None):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.session = session
+
+
 class InMemoryCache:
-    """Simple thread-safe in-memory cache with no expiration."""
+    """Thread-safe in-memory cache with TTLs, a byte budget and per-session caps.
 
-    def __init__(self):
+    Entries expire ``ttl`` seconds after they are set. When the cache holds
+    more than ``max_bytes``, the least recently used entries are evicted, and
+    a session holding more than ``max_per_session`` entries loses its oldest
+    ones. A budget, TTL or cap of 0 disables it.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = CACHE_MAX_BYTES,
+        ttl: float = CACHE_TTL_SECONDS,
+        max_per_session: int = CACHE_MAX_PER_SESSION,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_per_session = max_per_session
         self._lock = threading.Lock()
-        self._store: dict[str, Any] = {}
+        self._store: OrderedDict[str, _Entry] = OrderedDict()
+        self._sessions: dict[str, OrderedDict[str, None]] = {}
+        self._bytes = 0
+        self._next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.session_evictions = 0
+        self.rejected = 0
 
     def get(self, key: str) -> Any | None:
         with self._lock:
-            return self._store.get(key)
+            entry = self._store.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._store.move_to_end(key)
+            self.hits += 1
+            return entry.value
 
-    def set(self, key: str, value: Any) -> None:
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float | None = None,
+        session: str | None = None,
+        size: int | None = None,
+    ) -> None:
+        """Cache ``value`` under ``key``.
+
+        ``ttl`` overrides the cache's default lifetime, ``session`` counts the
+        entry against that session's cap, and ``size`` overrides the
+        estimated size in bytes.
+        """
+        size = estimate_size(value) if size is None else size
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
         with self._lock:
-            self._store[key] = value
+            if key in self._store:
+                self._remove(key)
+            if self.max_bytes and size > self.max_bytes:
+                self.rejected += 1
+                logger.warning(f'Not caching {key}: {size} bytes exceeds the cache budget')
+                return
+
+            self._store[key] = _Entry(value, size, now + ttl if ttl else None, session)
+            self._bytes += size
+            if session is not None:
+                keys = self._sessions.setdefault(session, OrderedDict())
+                keys[key] = None
+                while self.max_per_session and len(keys) > self.max_per_session:
+                    self._remove(next(iter(keys)))
+                    self.session_evictions += 1
+
+            if now >= self._next_purge:
+                self._purge_expired(now)
+            while self.max_bytes and self._bytes > self.max_bytes:
+                self._remove(next(iter(self._store)))
+                self.evictions += 1
 
     def delete(self, key: str) -> None:
         with self._lock:
             if key in self._store:
-                del self._store[key]
+                self._remove(key)
+
+    def delete_session(self, session: str) -> None:
+        """Drop every entry cached for ``session``."""
+        with self._lock:
+            for key in list(self._sessions.get(session, ())):
+                self._remove(key)
 
     def clear(self) -> None:
         with self._lock:
             self._store.clear()
+            self._sessions.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return size, hit and eviction metrics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._store),
+                'sessions': len(self._sessions),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'session_evictions': self.session_evictions,
+                'rejected': self.rejected,
+            }
+
+    def _remove(self, key: str) -> None:
+        """Remove ``key`` and its byte and session accounting. Caller holds the lock."""
+        entry = self._store.pop(key)
+        self._bytes -= entry.size
+        if entry.session is not None:
+            keys = self._sessions.get(entry.session)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self._sessions[entry.session]
+
+    def _purge_expired(self, now: float) -> None:
+        """Remove every expired entry. Caller holds the lock."""
+        expired = [
+            key for key, entry in self._store.items()
+            if entry.expires_at is not None and entry.expires_at <= now
+        ]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        self._next_purge = now + PURGE_INTERVAL_SECONDS
 
 
 # Singleton cache instance for use across modules
-cache = InMemoryCache()
\ No newline at end of file
+cache = InMemoryCache()
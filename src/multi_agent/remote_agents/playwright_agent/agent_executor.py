@@ -3,7 +3,6 @@ import logging
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events.event_queue import EventQueue
 from a2a.types import (
-    TaskArtifactUpdateEvent,
     TaskState,
     TaskStatus,
     TaskStatusUpdateEvent,
@@ -11,9 +10,9 @@ from a2a.types import (
 from a2a.utils import (
     new_agent_text_message,
     new_task,
-    new_text_artifact,
 )
 from agent import SemanticKernelMCPAgent
+from event_coalescer import EventCoalescer
 
 
 logging.basicConfig(level=logging.INFO)
@@ -45,66 +44,57 @@ class SemanticKernelMCPAgentExecutor(AgentExecutor):
             await event_queue.enqueue_event(task)
             print("Task :", task)
 
-        async for partial in self.agent.stream(query, task.context_id):
-            print(f"Executing agent with query: {query}")
-            require_input = partial['require_user_input']
-            is_done = partial['is_task_complete']
-            text_content = partial['content']
+        # Each partial response is a whole agent message; they are batched into
+        # deltas of one artifact instead of a status event per message
+        coalescer = EventCoalescer(event_queue, task, separator='\n\n')
+        try:
+            async for partial in self.agent.stream(query, task.context_id):
+                print(f"Executing agent with query: {query}")
+                require_input = partial['require_user_input']
+                is_done = partial['is_task_complete']
+                text_content = partial['content']
 
-            if require_input:
-                await event_queue.enqueue_event(
-                    TaskStatusUpdateEvent(
-                        status=TaskStatus(
-                            state=TaskState.input_required,
-                            message=new_agent_text_message(
-                                text_content,
-                                task.context_id,
-                                task.id,
+                if require_input:
+                    await coalescer.close()
+                    await event_queue.enqueue_event(
+                        TaskStatusUpdateEvent(
+                            status=TaskStatus(
+                                state=TaskState.input_required,
+                                message=new_agent_text_message(
+                                    text_content,
+                                    task.context_id,
+                                    task.id,
+                                ),
                             ),
-                        ),
-                        final=True,
-                        context_id=task.context_id,
-                        task_id=task.id,
+                            final=True,
+                            context_id=task.context_id,
+                            task_id=task.id,
+                        )
                     )
-                )
-            elif is_done:
-                await event_queue.enqueue_event(
-                    TaskArtifactUpdateEvent(
-                        append=False,
-                        context_id=task.context_id,
-                        task_id=task.id,
-                        last_chunk=True,
-                        artifact=new_text_artifact(
-                            name='current_result',
-                            description='Result of request to agent.',
-                            text=text_content,
-                        ),
-                    )
-                )
-                await event_queue.enqueue_event(
-                    TaskStatusUpdateEvent(
-                        status=TaskStatus(state=TaskState.completed),
-                        final=True,
-                        context_id=task.context_id,
-                        task_id=task.id,
-                    )
-                )
-            else:
-                await event_queue.enqueue_event(
-                    TaskStatusUpdateEvent(
-                        status=TaskStatus(
-                            state=TaskState.working,
-                            message=new_agent_text_message(
-                                text_content,
-                                task.context_id,
-                                task.id,
+                elif is_done:
+                    # The final message is a fixed completion notice, not part
+                    # of the agent's output; keep it out of the streamed result
+                    # unless nothing was streamed
+                    await coalescer.finish('' if coalescer.updates_received else text_content)
+                    await event_queue.enqueue_event(
+                        TaskStatusUpdateEvent(
+                            status=TaskStatus(
+                                state=TaskState.completed,
+                                message=new_agent_text_message(
+                                    text_content,
+                                    task.context_id,
+                                    task.id,
+                                ),
                             ),
-                        ),
-                        final=False,
-                        context_id=task.context_id,
-                        task_id=task.id,
+                            final=True,
+                            context_id=task.context_id,
+                            task_id=task.id,
+                        )
                     )
-                )
+                else:
+                    await coalescer.add(text_content)
+        finally:
+            await coalescer.close()
 
     async def cancel(
         self, context: RequestContext, event_queue: EventQueue
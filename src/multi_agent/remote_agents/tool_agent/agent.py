@@ -8,7 +8,12 @@ from azure.identity.aio import DefaultAzureCredential, ManagedIdentityCredential
 from dotenv import load_dotenv
 from pydantic import BaseModel
 from semantic_kernel.agents import AzureAIAgent, AzureAIAgentSettings, AzureAIAgentThread
-from semantic_kernel.connectors.mcp import MCPSsePlugin
+
+from context_threads import ContextThreadMap
+from mcp_sessions import MCPSessionPool, redact_url
+from mcp_tools import CachingMCPSsePlugin
+from report_extraction import ReportExtractionPlugin
+from tool_manifest import get_skill_tools
 # from semantic_kernel.contents import ChatMessageContent
 
 logging.basicConfig(level=logging.INFO)
@@ -28,6 +33,33 @@ class ResponseFormat(BaseModel):
 
 # endregion
 
+# Function App used when no MCP endpoint is configured
+DEFAULT_MCP_URL = 'https://func-api-zsqp7uodjlobu.azurewebsites.net/runtime/webhooks/mcp/sse'
+
+
+def get_mcp_endpoints(mcp_url: str | None = None) -> list[str]:
+    """Return the MCP SSE endpoints to use, in failover order.
+
+    ``mcp_url`` if given, otherwise ``MCP_SERVER_URLS`` (comma separated),
+    otherwise the default Function App. The Function App key
+    (``azure_function_key``) is added as ``code`` to endpoints without one.
+    """
+    urls = mcp_url or os.getenv('MCP_SERVER_URLS') or DEFAULT_MCP_URL
+    function_key = os.getenv('azure_function_key')
+    endpoints = []
+    for url in urls.split(','):
+        url = url.strip()
+        if not url:
+            continue
+        if function_key and 'code=' not in url:
+            url += f"{'&' if '?' in url else '?'}code={function_key}"
+        endpoints.append(url)
+    return endpoints
+
+
+# Context key used when a caller does not supply a session ID
+DEFAULT_SESSION_ID = 'default'
+
 # region Azure AI Agent with MCP
 
 
@@ -36,13 +68,19 @@ class SemanticKernelMCPAgent:
 
     def __init__(self):
         self.agent = None
-        self.thread = None
+        # One Azure AI thread per A2A context, with per-context locks
+        self.threads = ContextThreadMap()
         self.client = None
         self.credential = None
         self.plugin = None
 
-    async def initialize(self, mcp_url: str = "http://localhost:7071/runtime/webhooks/mcp/sse"):
-        """Initialize the agent with Azure credentials and MCP plugin."""
+    async def initialize(self, mcp_url: str | None = None):
+        """Initialize the agent with Azure credentials and MCP plugin.
+
+        Args:
+            mcp_url (str): MCP SSE endpoint (optional). Defaults to the
+                endpoints configured in ``MCP_SERVER_URLS``.
+        """
         try:
             # Create Azure credential
             client_id = os.getenv("AZURE_CLIENT_ID")
@@ -56,22 +94,8 @@ class SemanticKernelMCPAgent:
             # Create Azure AI client
             self.client = await AzureAIAgent.create_client(credential=self.credential, endpoint=os.getenv("AZURE_AI_PROJECT_ENDPOINT")).__aenter__()
             
-            # Create the MCP plugin
-            self.plugin = MCPSsePlugin(
-            name="receipts_field_extraction",
-            description="Receipts and invoices field extraction tool",
-            url=f"https://func-api-zsqp7uodjlobu.azurewebsites.net/runtime/webhooks/mcp/sse?code={os.getenv('azure_function_key')}",
-            # headers={"Authorization": "Bearer <token>"}
-            headers={"SuperSecret": "123456",
-                     "Accept":"text/event-stream"},
-                     load_tools=True,
-                     timeout=100,
-                     sse_read_timeout=10000
-        )
-
-            
-            # Initialize the plugin
-            await self.plugin.__aenter__()
+            # Connect the MCP plugin to the first reachable endpoint
+            self.plugin = await self._connect_mcp_plugin(get_mcp_endpoints(mcp_url))
             
             # Create agent definition
             agent_definition = await self.client.agents.create_agent(
@@ -80,8 +104,8 @@ class SemanticKernelMCPAgent:
                 instructions='''You are an expense processing assistant. Your task is to utilize the MCP tool to extract information from receipts and invoices, assisting users with their expense-related queries. Please make sure to cite your sources. Follow these steps:
 
             Begin by asking the user for the name of the expense report.
-            Note that the expense report name corresponds to a storage location in Azure Blob Storage. Use the MCP tool to retrieve invoice links from the specified expense report.
-            Use the MCP tool again to extract item details from the provided receipts or invoices. If there are multiple receipts or invoices uploaded against a receipt, process each one sequentially.
+            Note that the expense report name corresponds to a storage location in Azure Blob Storage. Use the extract_report tool with the report name to extract item details from all receipts and invoices in the report in a single call.
+            Only use the MCP tools directly to look up or extract an individual receipt or invoice. If extract_report lists failures, mention the affected files.
             Present the extracted information to the user in a clear, concise format as shown below:
 
         FORMAT:
@@ -98,7 +122,7 @@ class SemanticKernelMCPAgent:
             self.agent = AzureAIAgent(
                 client=self.client,
                 definition=agent_definition,
-                plugins=[self.plugin],
+                plugins=[self.plugin, ReportExtractionPlugin(self.plugin)],
             )
             
             logger.info("MCP Agent initialized successfully")
@@ -108,12 +132,51 @@ class SemanticKernelMCPAgent:
             await self.cleanup()
             raise
 
+    async def _connect_mcp_plugin(self, endpoints: list[str]) -> CachingMCPSsePlugin:
+        """Connect the MCP plugin to the first endpoint that accepts a connection.
+
+        Tool calls run on a pool of sessions that reconnect on failure and
+        fail over through the remaining endpoints.
+        """
+        # headers={"Authorization": "Bearer <token>"}
+        mcp_headers = {"SuperSecret": "123456",
+                       "Accept":"text/event-stream"}
+        last_error = None
+        for index, endpoint in enumerate(endpoints):
+            plugin = CachingMCPSsePlugin(
+                name="receipts_field_extraction",
+                description="Receipts and invoices field extraction tool",
+                url=endpoint,
+                headers=mcp_headers,
+                load_tools=True,
+                timeout=100,
+                sse_read_timeout=10000,
+                session_pool=MCPSessionPool(
+                    endpoints[index:] + endpoints[:index],
+                    mcp_headers,
+                    timeout=100,
+                    sse_read_timeout=10000,
+                ),
+                # Only expose the tools the invoice extraction skill uses
+                allowed_tools=get_skill_tools('invoice_extraction'),
+            )
+            try:
+                await plugin.__aenter__()
+            except Exception as e:
+                logger.warning(f"MCP endpoint {redact_url(endpoint)} unavailable: {e}")
+                last_error = e
+                continue
+            logger.info(f"Connected to MCP endpoint {redact_url(endpoint)}")
+            return plugin
+        raise ConnectionError(f"No MCP endpoint reachable: {last_error}")
+
     async def invoke(self, user_input: str, session_id: str = None) -> dict[str, Any]:
         """Handle tasks with the Azure AI Agent and MCP plugins.
 
         Args:
             user_input (str): User input message.
-            session_id (str): Unique identifier for the session (optional).
+            session_id (str): Unique identifier for the session (optional). Each
+                session (A2A context) gets its own Azure AI thread.
 
         Returns:
             dict: A dictionary containing the content and task completion status.
@@ -127,12 +190,13 @@ class SemanticKernelMCPAgent:
 
         try:
             responses = []
-            async for response in self.agent.invoke(
-                messages=user_input,
-                thread=self.thread,
-            ):
-                responses.append(str(response))
-                self.thread = response.thread
+            async with self.threads.checkout(session_id or DEFAULT_SESSION_ID) as context:
+                async for response in self.agent.invoke(
+                    messages=user_input,
+                    thread=context.thread,
+                ):
+                    responses.append(str(response))
+                    context.thread = response.thread
 
             content = "\n".join(responses) if responses else "No response received."
             
@@ -155,9 +219,14 @@ class SemanticKernelMCPAgent:
     ) -> AsyncIterable[dict[str, Any]]:
         """Stream responses from the Azure AI Agent with MCP plugins.
 
+        Text is streamed token by token from the agent and yielded as deltas;
+        the final item carries the complete response. Batching deltas into
+        updates is left to the executor's EventCoalescer.
+
         Args:
             user_input (str): User input message.
-            session_id (str): Unique identifier for the session (optional).
+            session_id (str): Unique identifier for the session (optional). Each
+                session (A2A context) gets its own Azure AI thread.
 
         Yields:
             dict: A dictionary containing the content and task completion status.
@@ -171,24 +240,29 @@ class SemanticKernelMCPAgent:
             return
 
         try:
-            final_response = ''
-            async for response in self.agent.invoke(
-                messages=user_input,
-                thread=self.thread,
-            ):
-                self.thread = response.thread
-                yield {
-                    'is_task_complete': False,
-                    'require_user_input': False,
-                    'content': str(response),
-                }
-                final_response += "\n" + str(response)
+            chunks: list[str] = []
+            async with self.threads.checkout(session_id or DEFAULT_SESSION_ID) as context:
+                async for response in self.agent.invoke_stream(
+                    messages=user_input,
+                    thread=context.thread,
+                ):
+                    context.thread = response.thread
+                    delta = str(response)
+                    if not delta:
+                        # Function call and other non-text updates
+                        continue
+                    chunks.append(delta)
+                    yield {
+                        'is_task_complete': False,
+                        'require_user_input': False,
+                        'content': delta,
+                    }
 
             # Final completion message
             yield {
                 'is_task_complete': True,
                 'require_user_input': False,
-                'content': final_response,
+                'content': ''.join(chunks) or 'No response received.',
             }
         except Exception as e:
             yield {
@@ -197,15 +271,22 @@ class SemanticKernelMCPAgent:
                 'content': f'Error processing request: {str(e)}',
             }
 
+    def mcp_stats(self) -> dict[str, Any]:
+        """Return MCP session pool and tool cache metrics."""
+        if not self.plugin:
+            return {}
+        stats = {'tool_cache': self.plugin.cache.stats()}
+        if self.plugin.session_pool:
+            stats['sessions'] = self.plugin.session_pool.stats()
+        return stats
+
     async def cleanup(self):
         """Cleanup resources."""
         try:
-            if self.thread:
-                await self.thread.delete()
-                self.thread = None
-                logger.info("Thread deleted successfully")
+            await self.threads.clear()
+            logger.info("Threads deleted successfully")
         except Exception as e:
-            logger.error(f"Error deleting thread: {e}")
+            logger.error(f"Error deleting threads: {e}")
         
         try:
             if self.agent and self.client:
@@ -1,9 +1,13 @@
+import asyncio
+import contextlib
 import logging
+import os
+import time
+from typing import Any
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events.event_queue import EventQueue
 from a2a.types import (
-    TaskArtifactUpdateEvent,
     TaskState,
     TaskStatus,
     TaskStatusUpdateEvent,
@@ -11,98 +15,220 @@ from a2a.types import (
 from a2a.utils import (
     new_agent_text_message,
     new_task,
-    new_text_artifact,
 )
 from agent import SemanticKernelMCPAgent
+from event_coalescer import EventCoalescer
+from mcp_tools import bypass_tool_cache
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Requests served at once per replica, and how many may wait behind them
+MAX_CONCURRENT_REQUESTS = int(os.getenv('TOOL_AGENT_MAX_CONCURRENCY', '4'))
+MAX_QUEUED_REQUESTS = int(os.getenv('TOOL_AGENT_MAX_QUEUE', '32'))
+
+# Request or message metadata key that sends this request's tool calls to
+# the MCP server instead of the tool result cache
+BYPASS_TOOL_CACHE_KEY = 'bypass_tool_cache'
+
+
+def wants_fresh_tool_results(context: RequestContext) -> bool:
+    """Whether the caller asked for tool results that skip the cache."""
+    message_metadata = (context.message.metadata if context.message else None) or {}
+    value = context.metadata.get(BYPASS_TOOL_CACHE_KEY, message_metadata.get(BYPASS_TOOL_CACHE_KEY))
+    return value is True or str(value).lower() in ('true', '1')
+
 
 class SemanticKernelMCPAgentExecutor(AgentExecutor):
-    """SemanticKernelMCPAgent Executor"""
+    """SemanticKernelMCPAgent Executor
+
+    At most ``max_concurrency`` requests run against the shared agent at once,
+    which keeps each replica inside its model quota. Up to ``max_queue`` more
+    wait in ``submitted`` state; beyond that, requests are rejected.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        max_queue: int = MAX_QUEUED_REQUESTS,
+    ):
         self.agent = SemanticKernelMCPAgent()
         self._initialized = False
+        self._init_lock = asyncio.Lock()
+        self.init_error: str | None = None
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+        # Metrics
+        self.running = 0
+        self.waiting = 0
+        self.total_requests = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the agent has finished initializing and can serve requests."""
+        return self._initialized
+
+    async def initialize(self) -> None:
+        """Initialize the agent once.
+
+        Called from the app lifespan at startup. Concurrent callers wait on the
+        same lock, so the agent is never initialized twice.
+        """
+        async with self._init_lock:
+            if self._initialized:
+                return
+            try:
+                await self.agent.initialize()
+            except Exception as e:
+                self.init_error = str(e)
+                raise
+            self._initialized = True
+            self.init_error = None
+            logger.info('MCP Agent initialized successfully')
+
+    async def cleanup(self) -> None:
+        """Release the agent's resources."""
+        async with self._init_lock:
+            if self._initialized:
+                await self.agent.cleanup()
+                self._initialized = False
+
+    def stats(self) -> dict[str, Any]:
+        """Return worker pool metrics, including the depth of the request queue."""
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'running': self.running,
+            'queue_depth': self.waiting,
+            'total_requests': self.total_requests,
+            'rejected': self.rejected,
+            'avg_wait_ms': round(
+                1000 * self.total_wait_seconds / self.total_requests, 1
+            ) if self.total_requests else 0.0,
+            'max_wait_ms': round(1000 * self.max_wait_seconds, 1),
+        }
+
+    async def _update_status(
+        self,
+        event_queue: EventQueue,
+        task,
+        state: TaskState,
+        text: str | None = None,
+        final: bool = False,
+    ) -> None:
+        await event_queue.enqueue_event(
+            TaskStatusUpdateEvent(
+                status=TaskStatus(
+                    state=state,
+                    message=new_agent_text_message(text, task.context_id, task.id)
+                    if text else None,
+                ),
+                final=final,
+                context_id=task.context_id,
+                task_id=task.id,
+            )
+        )
 
     async def execute(
         self,
         context: RequestContext,
         event_queue: EventQueue,
     ) -> None:
-        # Initialize the agent if not already done
-        if not self._initialized:
-            await self.agent.initialize()
-            self._initialized = True
-            logger.info('MCP Agent initialized successfully')
-
         query = context.get_user_input()
         task = context.current_task
         if not task:
             task = new_task(context.message)
             await event_queue.enqueue_event(task)
 
-        async for partial in self.agent.stream(query, task.context_id):
-            require_input = partial['require_user_input']
-            is_done = partial['is_task_complete']
-            text_content = partial['content']
-
-            if require_input:
-                await event_queue.enqueue_event(
-                    TaskStatusUpdateEvent(
-                        status=TaskStatus(
-                            state=TaskState.input_required,
-                            message=new_agent_text_message(
-                                text_content,
-                                task.context_id,
-                                task.id,
-                            ),
-                        ),
-                        final=True,
-                        context_id=task.context_id,
-                        task_id=task.id,
-                    )
-                )
-            elif is_done:
-                await event_queue.enqueue_event(
-                    TaskArtifactUpdateEvent(
-                        append=False,
-                        context_id=task.context_id,
-                        task_id=task.id,
-                        last_chunk=True,
-                        artifact=new_text_artifact(
-                            name='current_result',
-                            description='Result of request to agent.',
-                            text=text_content,
-                        ),
-                    )
-                )
-                await event_queue.enqueue_event(
-                    TaskStatusUpdateEvent(
-                        status=TaskStatus(state=TaskState.completed),
-                        final=True,
-                        context_id=task.context_id,
-                        task_id=task.id,
-                    )
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                logger.warning(f'Rejecting task {task.id}: {self.waiting} requests already queued')
+                await self._update_status(
+                    event_queue, task, TaskState.rejected,
+                    'The agent is at capacity. Please retry shortly.', final=True,
                 )
-            else:
-                await event_queue.enqueue_event(
-                    TaskStatusUpdateEvent(
-                        status=TaskStatus(
-                            state=TaskState.working,
-                            message=new_agent_text_message(
-                                text_content,
-                                task.context_id,
-                                task.id,
+                return
+            await self._update_status(
+                event_queue, task, TaskState.submitted,
+                f'Queued behind {self.running + self.waiting} requests.',
+            )
+
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.total_requests += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+        self.running += 1
+        try:
+            # No message: working text is treated as partial output by clients
+            await self._update_status(event_queue, task, TaskState.working)
+            fresh = wants_fresh_tool_results(context)
+            with bypass_tool_cache() if fresh else contextlib.nullcontext():
+                await self._run(query, task, event_queue)
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    async def _run(self, query: str, task, event_queue: EventQueue) -> None:
+        # Normally done at startup; covers requests that arrive before it finished
+        if not self._initialized:
+            await self.initialize()
+
+        # Partial text goes out as batched deltas of one artifact instead of a
+        # status message per update followed by a full copy in the result
+        coalescer = EventCoalescer(event_queue, task)
+        try:
+            async for partial in self.agent.stream(query, task.context_id):
+                require_input = partial['require_user_input']
+                is_done = partial['is_task_complete']
+                text_content = partial['content']
+
+                if require_input:
+                    await coalescer.close()
+                    await event_queue.enqueue_event(
+                        TaskStatusUpdateEvent(
+                            status=TaskStatus(
+                                state=TaskState.input_required,
+                                message=new_agent_text_message(
+                                    text_content,
+                                    task.context_id,
+                                    task.id,
+                                ),
                             ),
-                        ),
-                        final=False,
-                        context_id=task.context_id,
-                        task_id=task.id,
+                            final=True,
+                            context_id=task.context_id,
+                            task_id=task.id,
+                        )
                     )
-                )
+                elif is_done:
+                    await coalescer.finish(text_content)
+                    await event_queue.enqueue_event(
+                        TaskStatusUpdateEvent(
+                            status=TaskStatus(state=TaskState.completed),
+                            final=True,
+                            context_id=task.context_id,
+                            task_id=task.id,
+                        )
+                    )
+                else:
+                    await coalescer.add(text_content)
+        finally:
+            await coalescer.close()
 
     async def cancel(
         self, context: RequestContext, event_queue: EventQueue
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from semantic_kernel.agents import AzureAIAgentThread
+
+
+logger = logging.getLogger(__name__)
+
+
+class _ContextEntry:
+    """A conversation thread and the lock serializing turns on it."""
+
+    __slots__ = ('thread', 'lock', 'last_used', 'users')
+
+    def __init__(self):
+        self.thread: AzureAIAgentThread | None = None
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        # Requests holding or waiting for the entry; such entries are never evicted
+        self.users = 0
+
+
+class ContextThreadMap:
+    """Maps A2A context IDs to Azure AI agent threads.
+
+    Each context gets its own thread and lock, so concurrent requests for
+    different contexts run in parallel while turns within a context are
+    serialized. Threads idle for longer than ``idle_ttl`` seconds, or beyond
+    ``max_contexts`` least recently used, are evicted and deleted remotely.
+    """
+
+    def __init__(self, max_contexts: int | None = None, idle_ttl: float | None = None):
+        self.max_contexts = max_contexts or int(os.getenv('TOOL_AGENT_MAX_CONTEXTS', '256'))
+        self.idle_ttl = idle_ttl or float(os.getenv('TOOL_AGENT_CONTEXT_TTL_SECONDS', '1800'))
+        self._entries: OrderedDict[str, _ContextEntry] = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def checkout(self, context_id: str) -> AsyncIterator[_ContextEntry]:
+        """Hold the context's lock and yield its entry.
+
+        The caller reads ``entry.thread`` (None for a new context) and stores
+        the thread returned by the agent back on ``entry.thread``.
+        """
+        async with self._lock:
+            entry = self._entries.get(context_id)
+            if entry is None:
+                entry = self._entries[context_id] = _ContextEntry()
+            self._entries.move_to_end(context_id)
+            entry.users += 1
+            evicted = self._collect_evictions()
+
+        try:
+            await self._delete_threads(evicted)
+            async with entry.lock:
+                try:
+                    yield entry
+                finally:
+                    entry.last_used = time.monotonic()
+        finally:
+            entry.users -= 1
+
+    def _collect_evictions(self) -> list[AzureAIAgentThread]:
+        """Remove idle-expired and over-capacity entries that are not in use."""
+        now = time.monotonic()
+        evicted = []
+        for context_id, entry in list(self._entries.items()):
+            if entry.users:
+                continue
+            expired = now - entry.last_used > self.idle_ttl
+            over_capacity = len(self._entries) > self.max_contexts
+            if not (expired or over_capacity):
+                # Entries are in LRU order, so nothing newer can be expired either
+                break
+            del self._entries[context_id]
+            if entry.thread is not None:
+                evicted.append(entry.thread)
+        return evicted
+
+    async def _delete_threads(self, threads: list[AzureAIAgentThread]) -> None:
+        for thread in threads:
+            try:
+                await thread.delete()
+                logger.info(f'Deleted idle thread {thread.id}')
+            except Exception as e:
+                logger.error(f'Error deleting thread: {e}')
+
+    async def evict_idle(self) -> None:
+        """Evict and delete threads that have been idle longer than the TTL."""
+        async with self._lock:
+            evicted = self._collect_evictions()
+        await self._delete_threads(evicted)
+
+    async def clear(self) -> None:
+        """Delete every tracked thread."""
+        async with self._lock:
+            threads = [entry.thread for entry in self._entries.values() if entry.thread]
+            self._entries.clear()
+        await self._delete_threads(threads)
+
+    def __len__(self) -> int:
+        return len(self._entries)
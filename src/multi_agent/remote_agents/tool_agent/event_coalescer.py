@@ -0,0 +1,145 @@
+# Each remote agent is built and deployed from its own directory with flat
+# imports, so this module is kept as identical copies in tool_agent/ and
+# playwright_agent/. Change both together.
+
+import asyncio
+import logging
+import os
+import time
+from uuid import uuid4
+
+from a2a.server.events.event_queue import EventQueue
+from a2a.types import Artifact, Part, Task, TaskArtifactUpdateEvent, TextPart
+
+
+logger = logging.getLogger(__name__)
+
+# Partial text is sent once this much time has passed or this many characters
+# are pending, whichever comes first
+COALESCE_SECONDS = float(os.getenv('A2A_EVENT_COALESCE_MS', '250')) / 1000
+COALESCE_MAX_CHARS = int(os.getenv('A2A_EVENT_COALESCE_MAX_CHARS', '2048'))
+
+
+class EventCoalescer:
+    """Batches streamed text into appended chunks of a single result artifact.
+
+    Partial responses are buffered and sent as deltas when the buffer is
+    older than ``max_delay`` seconds or larger than ``max_chars``. ``finish``
+    closes the artifact with only the text not sent yet, so the final event
+    does not repeat the whole response.
+    """
+
+    def __init__(
+        self,
+        event_queue: EventQueue,
+        task: Task,
+        separator: str = '',
+        max_delay: float = COALESCE_SECONDS,
+        max_chars: int = COALESCE_MAX_CHARS,
+    ):
+        self.event_queue = event_queue
+        self.task = task
+        self.separator = separator
+        self.max_delay = max_delay
+        self.max_chars = max_chars
+
+        self.artifact_id = str(uuid4())
+        self._pending: list[str] = []
+        self._pending_chars = 0
+        self._streamed: list[str] = []
+        # Partial responses as received, without separators
+        self._raw: list[str] = []
+        self._chunks_sent = 0
+        self._last_flush = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+
+        # Metrics
+        self.updates_received = 0
+        self.chars_sent = 0
+
+    async def add(self, text: str) -> None:
+        """Buffer a partial response, sending the buffer if it is due."""
+        if not text:
+            return
+        self.updates_received += 1
+        self._raw.append(text)
+        if self._streamed:
+            text = self.separator + text if self.separator else text
+        self._pending.append(text)
+        self._pending_chars += len(text)
+        self._streamed.append(text)
+
+        if (
+            self._pending_chars >= self.max_chars
+            or time.monotonic() - self._last_flush >= self.max_delay
+        ):
+            await self.flush()
+        elif self._timer is None:
+            # Do not hold text back if the stream stalls, e.g. during a tool call
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.max_delay)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self, last_chunk: bool = False) -> None:
+        """Send pending text as the next chunk of the result artifact."""
+        async with self._lock:
+            if not self._pending and not last_chunk:
+                return
+            text = ''.join(self._pending)
+            self._pending.clear()
+            self._pending_chars = 0
+            self._last_flush = time.monotonic()
+
+            await self.event_queue.enqueue_event(
+                TaskArtifactUpdateEvent(
+                    append=self._chunks_sent > 0,
+                    context_id=self.task.context_id,
+                    task_id=self.task.id,
+                    last_chunk=last_chunk,
+                    artifact=Artifact(
+                        artifact_id=self.artifact_id,
+                        name='current_result',
+                        description='Result of request to agent.',
+                        parts=[Part(root=TextPart(text=text))],
+                    ),
+                )
+            )
+            self._chunks_sent += 1
+            self.chars_sent += len(text)
+
+    async def finish(self, final_text: str = '') -> None:
+        """Close the artifact, sending only what the stream has not sent yet.
+
+        ``final_text`` is the agent's complete response. If it only repeats the
+        streamed text, nothing more is added; if it extends it, only the rest
+        is sent; otherwise it is appended as new content.
+        """
+        self._cancel_timer()
+        streamed = ''.join(self._streamed)
+        if final_text and final_text not in (streamed, ''.join(self._raw)):
+            if streamed and final_text.startswith(streamed):
+                remainder = final_text[len(streamed):]
+                self._pending.append(remainder)
+                self._streamed.append(remainder)
+            else:
+                await self.add(final_text)
+                self._cancel_timer()
+        await self.flush(last_chunk=True)
+        logger.debug(
+            f'Task {self.task.id}: {self.updates_received} partial updates sent as '
+            f'{self._chunks_sent} artifact chunks ({self.chars_sent} chars)'
+        )
+
+    async def close(self) -> None:
+        """Send buffered text without closing the artifact, e.g. before an error status."""
+        self._cancel_timer()
+        await self.flush()
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
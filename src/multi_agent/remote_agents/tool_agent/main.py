@@ -1,7 +1,11 @@
+import asyncio
 import logging
+import os
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 
 import click
-import httpx
 
 from a2a.server.apps import A2AStarletteApplication
 from a2a.server.request_handlers import DefaultRequestHandler
@@ -9,6 +13,10 @@ from a2a.server.tasks import InMemoryTaskStore
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill
 from agent_executor import SemanticKernelMCPAgentExecutor
 from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
 
 
 logging.basicConfig(level=logging.INFO)
@@ -16,25 +24,96 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# How often threads idle past TOOL_AGENT_CONTEXT_TTL_SECONDS are deleted
+CONTEXT_SWEEP_SECONDS = float(os.getenv('TOOL_AGENT_CONTEXT_SWEEP_SECONDS', '60'))
+
 
 @click.command()
 @click.option('--host', default='localhost')
 @click.option('--port', default=10002)
 def main(host, port):
     """Starts the Semantic Kernel MCP Agent server using A2A."""
-    httpx_client = httpx.AsyncClient()
+    import uvicorn
+
+    uvicorn.run(build_app(get_agent_card(host, port)), host=host, port=port)
+
+
+async def health_check(request: Request) -> JSONResponse:
+    """Liveness probe: the process is up and serving HTTP."""
+    return JSONResponse(
+        {'status': 'healthy', 'timestamp': datetime.now(timezone.utc).isoformat()}
+    )
+
+
+def build_app(agent_card: AgentCard) -> Starlette:
+    """Builds the A2A Starlette app for the Semantic Kernel MCP Agent.
+
+    The agent is initialized in the app lifespan, in the background, so the
+    first user request does not pay for credential acquisition, MCP connect
+    and agent creation. ``/ready`` reports 503 until initialization finishes;
+    ``/health`` only reports that the process is alive. ``/stats`` reports
+    request queue depth and wait times. Conversation threads idle past their
+    TTL are deleted every CONTEXT_SWEEP_SECONDS.
+    """
+    agent_executor = SemanticKernelMCPAgentExecutor()
     request_handler = DefaultRequestHandler(
-        agent_executor=SemanticKernelMCPAgentExecutor(),
+        agent_executor=agent_executor,
         task_store=InMemoryTaskStore(),
-        # push_notifier=InMemoryPushNotifier(httpx_client),
     )
-
     server = A2AStarletteApplication(
-        agent_card=get_agent_card(host, port), http_handler=request_handler
+        agent_card=agent_card, http_handler=request_handler
     )
-    import uvicorn
 
-    uvicorn.run(server.build(), host=host, port=port)
+    async def initialize_agent() -> None:
+        try:
+            await agent_executor.initialize()
+        except Exception as e:
+            logger.error(f'Agent initialization failed: {e}')
+
+    async def evict_idle_threads() -> None:
+        # Without this, expired threads are only deleted by a later request
+        while True:
+            await asyncio.sleep(CONTEXT_SWEEP_SECONDS)
+            try:
+                await agent_executor.agent.threads.evict_idle()
+            except Exception as e:
+                logger.error(f'Error evicting idle threads: {e}')
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        init_task = asyncio.create_task(initialize_agent())
+        sweep_task = asyncio.create_task(evict_idle_threads())
+        try:
+            yield
+        finally:
+            sweep_task.cancel()
+            if not init_task.done():
+                init_task.cancel()
+            await agent_executor.cleanup()
+
+    async def readiness_check(request: Request) -> JSONResponse:
+        """Readiness probe: the agent is initialized and can serve requests."""
+        if agent_executor.is_ready:
+            return JSONResponse({'status': 'ready', 'mcp': agent_executor.agent.mcp_stats()})
+        body = {'status': 'initializing'}
+        if agent_executor.init_error:
+            body = {'status': 'error', 'error': agent_executor.init_error}
+        return JSONResponse(body, status_code=503)
+
+    async def stats(request: Request) -> JSONResponse:
+        """Worker pool and MCP metrics for capacity monitoring."""
+        return JSONResponse({
+            'executor': agent_executor.stats(),
+            'mcp': agent_executor.agent.mcp_stats(),
+        })
+
+    app = server.build(lifespan=lifespan)
+    app.routes.extend([
+        Route('/health', health_check, methods=['GET']),
+        Route('/ready', readiness_check, methods=['GET']),
+        Route('/stats', stats, methods=['GET']),
+    ])
+    return app
 
 
 def get_agent_card(host: str, port: int):
@@ -53,6 +132,17 @@ def get_agent_card(host: str, port: int):
                   'Find vendor name in receipt_456.jpg'
         ],
     )
+    skill_report_extraction = AgentSkill(
+        id='expense_report_extraction',
+        name='Expense Report Extraction',
+        description=(
+            'Extracts every receipt and invoice of an expense report concurrently and returns the aggregated items and totals.'
+        ),
+        tags=['expense report', 'receipts', 'batch'],
+        examples=['Extract all receipts in expense report XYZ',
+                  'What is the total of my expense report XYZ?'
+        ],
+    )
 
     agent_card = AgentCard(
         name='FoundryInvoiceExtractionAgent',
@@ -64,7 +154,7 @@ def get_agent_card(host: str, port: int):
         default_input_modes=['text'],
         default_output_modes=['text'],
         capabilities=capabilities,
-        skills=[skill_mcp_tools],
+        skills=[skill_mcp_tools, skill_report_extraction],
     )
 
     return agent_card
@@ -86,6 +176,17 @@ def get_agent_card_with_public_url(public_url: str):
                   'Find vendor name in receipt_456.jpg'
         ],
     )
+    skill_report_extraction = AgentSkill(
+        id='expense_report_extraction',
+        name='Expense Report Extraction',
+        description=(
+            'Extracts every receipt and invoice of an expense report concurrently and returns the aggregated items and totals.'
+        ),
+        tags=['expense report', 'receipts', 'batch'],
+        examples=['Extract all receipts in expense report XYZ',
+                  'What is the total of my expense report XYZ?'
+        ],
+    )
 
     agent_card = AgentCard(
         name='FoundryInvoiceExtractionAgent',
@@ -97,7 +198,7 @@ def get_agent_card_with_public_url(public_url: str):
         default_input_modes=['text'],
         default_output_modes=['text'],
         capabilities=capabilities,
-        skills=[skill_mcp_tools],
+        skills=[skill_mcp_tools, skill_report_extraction],
     )
 
     return agent_card
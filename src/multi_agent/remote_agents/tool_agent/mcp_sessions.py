@@ -0,0 +1,321 @@
+import asyncio
+import logging
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+from urllib.parse import urlsplit
+
+from semantic_kernel.connectors.mcp import MCPSsePlugin
+
+
+logger = logging.getLogger(__name__)
+
+DISCONNECTED = 'disconnected'
+CONNECTING = 'connecting'
+CONNECTED = 'connected'
+
+
+class _PooledSession(MCPSsePlugin):
+    """A bare MCP SSE connection used only to call tools.
+
+    Tools are registered with the kernel by the front plugin, so pooled
+    sessions skip listing them; ``load_tools`` stays enabled because
+    ``call_tool`` requires it.
+    """
+
+    async def load_tools(self) -> None:
+        pass
+
+    async def load_prompts(self) -> None:
+        pass
+
+
+class _SessionSlot:
+    """A pooled session and its connection state."""
+
+    __slots__ = ('plugin', 'state', 'connected_at', 'failures', 'task', 'stop')
+
+    def __init__(self, plugin: _PooledSession):
+        self.plugin = plugin
+        self.state = DISCONNECTED
+        self.connected_at = 0.0
+        # Consecutive failed connection attempts, used for backoff
+        self.failures = 0
+        # The SSE transport must be opened and closed in the same task, so
+        # each connection lives in its own task until ``stop`` is set
+        self.task: asyncio.Task | None = None
+        self.stop: asyncio.Event | None = None
+
+
+def redact_url(url: str) -> str:
+    """Drop the query string, which may carry a function key, for logs and metrics."""
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}{parts.path}'
+
+
+class MCPSessionPool:
+    """A small pool of MCP SSE sessions with reconnect and keepalive.
+
+    Tool calls check out a session so parallel calls do not serialize on a
+    single stream. A session that fails a call or a keepalive ping is closed
+    and reconnected with exponential backoff, and the call is retried, so a
+    recycled Function App does not break the agent until restart. When
+    several endpoints are given, a session that cannot reach the current one
+    fails over to the next, and the rest of the pool follows.
+    """
+
+    def __init__(
+        self,
+        urls: str | list[str],
+        headers: dict[str, str] | None = None,
+        size: int | None = None,
+        keepalive_interval: float | None = None,
+        max_retries: int | None = None,
+        timeout: float | None = None,
+        sse_read_timeout: float | None = None,
+    ):
+        self.urls = [urls] if isinstance(urls, str) else list(urls)
+        self._endpoint = 0
+        self.headers = headers
+        self.size = size or int(os.getenv('MCP_SESSION_POOL_SIZE', '3'))
+        self.keepalive_interval = keepalive_interval or float(
+            os.getenv('MCP_KEEPALIVE_SECONDS', '30')
+        )
+        self.max_retries = max_retries if max_retries is not None else int(
+            os.getenv('MCP_CALL_RETRIES', '2')
+        )
+        self.max_backoff = float(os.getenv('MCP_RECONNECT_MAX_BACKOFF_SECONDS', '30'))
+        self.timeout = timeout
+        self.sse_read_timeout = sse_read_timeout
+
+        self._slots = [
+            _SessionSlot(self._create_plugin(index)) for index in range(self.size)
+        ]
+        self._idle: asyncio.Queue[_SessionSlot] = asyncio.Queue()
+        self._keepalive_task: asyncio.Task | None = None
+
+        # Metrics
+        self.waiting = 0
+        self.calls = 0
+        self.retries = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.connect_failures = 0
+        self.ping_failures = 0
+        self.failovers = 0
+
+    def _create_plugin(self, index: int) -> _PooledSession:
+        return _PooledSession(
+            name=f'mcp_session_{index}',
+            url=self.urls[self._endpoint],
+            headers=self.headers,
+            load_tools=True,
+            load_prompts=False,
+            timeout=self.timeout,
+            sse_read_timeout=self.sse_read_timeout,
+        )
+
+    async def start(self) -> None:
+        """Connect all sessions and start the keepalive loop.
+
+        Sessions that fail to connect are left disconnected and retried when
+        they are next checked out.
+        """
+        await asyncio.gather(*(self._connect(slot) for slot in self._slots))
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
+        self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+        connected = sum(slot.state == CONNECTED for slot in self._slots)
+        logger.info(f'MCP session pool started with {connected}/{self.size} sessions connected')
+
+    async def _run_connection(self, slot: _SessionSlot, ready: asyncio.Future) -> None:
+        """Hold a slot's connection open until it is asked to stop."""
+        try:
+            await slot.plugin.connect()
+            if slot.plugin.session is None:
+                # connect() can return without raising when the transport fails
+                raise ConnectionError(f'Could not connect to {redact_url(slot.plugin.url)}')
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        except BaseException:
+            ready.cancel()
+            raise
+        ready.set_result(None)
+        try:
+            await slot.stop.wait()
+        finally:
+            # Also reached when the transport fails underneath the session
+            slot.state = DISCONNECTED
+            try:
+                await slot.plugin.close()
+            except Exception as e:
+                logger.debug(f'Error closing MCP session {slot.plugin.name}: {e}')
+
+    @property
+    def url(self) -> str:
+        """The endpoint sessions currently connect to."""
+        return self.urls[self._endpoint]
+
+    async def _connect(self, slot: _SessionSlot) -> bool:
+        """Connect a slot's session, failing over through the other endpoints."""
+        for offset in range(len(self.urls)):
+            index = (self._endpoint + offset) % len(self.urls)
+            slot.plugin.url = self.urls[index]
+            if await self._connect_to_endpoint(slot):
+                if index != self._endpoint:
+                    logger.warning(
+                        f'MCP sessions failing over from {redact_url(self.url)} '
+                        f'to {redact_url(self.urls[index])}'
+                    )
+                    self._endpoint = index
+                    self.failovers += 1
+                return True
+        return False
+
+    async def _connect_to_endpoint(self, slot: _SessionSlot) -> bool:
+        """Connect a slot's session, recording failures instead of raising."""
+        slot.state = CONNECTING
+        ready = asyncio.get_running_loop().create_future()
+        slot.stop = asyncio.Event()
+        slot.task = asyncio.create_task(self._run_connection(slot, ready))
+        try:
+            await ready
+        except Exception as e:
+            slot.task = None
+            slot.state = DISCONNECTED
+            slot.failures += 1
+            self.connect_failures += 1
+            logger.warning(f'MCP session {slot.plugin.name} failed to connect: {e}')
+            return False
+        slot.state = CONNECTED
+        slot.connected_at = time.monotonic()
+        slot.failures = 0
+        self.connects += 1
+        return True
+
+    async def _disconnect(self, slot: _SessionSlot) -> None:
+        """Close a slot's connection and wait for its task to finish."""
+        if slot.task is not None:
+            slot.stop.set()
+            await asyncio.gather(slot.task, return_exceptions=True)
+            slot.task = None
+        slot.state = DISCONNECTED
+
+    async def _reconnect(self, slot: _SessionSlot) -> None:
+        """Close a broken session and connect it again, backing off on failure."""
+        self.reconnects += 1
+        await self._disconnect(slot)
+
+        if slot.failures:
+            await asyncio.sleep(min(0.5 * 2 ** (slot.failures - 1), self.max_backoff))
+        if not await self._connect(slot):
+            raise ConnectionError(f'No MCP server reachable at {[redact_url(url) for url in self.urls]}')
+        logger.info(f'MCP session {slot.plugin.name} reconnected')
+
+    async def _is_alive(self, slot: _SessionSlot) -> bool:
+        session = slot.plugin.session
+        if session is None:
+            return False
+        try:
+            await asyncio.wait_for(session.send_ping(), timeout=10)
+            return True
+        except Exception:
+            return False
+
+    @asynccontextmanager
+    async def checkout(self) -> AsyncIterator[_SessionSlot]:
+        """Wait for an idle session, reconnecting it if needed, and yield it."""
+        self.waiting += 1
+        try:
+            slot = await self._idle.get()
+        finally:
+            self.waiting -= 1
+
+        try:
+            if slot.state != CONNECTED:
+                await self._reconnect(slot)
+            yield slot
+        finally:
+            self._idle.put_nowait(slot)
+
+    async def call_tool(self, tool_name: str, **kwargs: Any) -> Any:
+        """Call a tool on a pooled session, retrying on a fresh connection.
+
+        A failed call is only retried when the session no longer answers a
+        ping; errors reported by a healthy server are raised immediately.
+        """
+        self.calls += 1
+        async with self.checkout() as slot:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    return await slot.plugin.call_tool(tool_name, **kwargs)
+                except Exception as e:
+                    if attempt == self.max_retries or await self._is_alive(slot):
+                        raise
+                    logger.warning(
+                        f'MCP session {slot.plugin.name} lost during {tool_name}, retrying: {e}'
+                    )
+                    self.retries += 1
+                    await self._reconnect(slot)
+
+    async def _keepalive_loop(self) -> None:
+        """Ping idle sessions periodically and reconnect those that fail."""
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            # Only check sessions that are idle right now; busy ones prove themselves
+            for _ in range(self._idle.qsize()):
+                try:
+                    slot = self._idle.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                try:
+                    if slot.state == CONNECTED and not await self._is_alive(slot):
+                        self.ping_failures += 1
+                        slot.state = DISCONNECTED
+                    if slot.state != CONNECTED:
+                        await self._reconnect(slot)
+                except Exception as e:
+                    logger.warning(f'MCP keepalive could not restore {slot.plugin.name}: {e}')
+                finally:
+                    self._idle.put_nowait(slot)
+
+    def stats(self) -> dict[str, Any]:
+        """Return connection-state and call metrics."""
+        now = time.monotonic()
+        return {
+            'size': self.size,
+            'endpoint': redact_url(self.url),
+            'idle': self._idle.qsize(),
+            'queue_depth': self.waiting,
+            'sessions': [
+                {
+                    'name': slot.plugin.name,
+                    'state': slot.state,
+                    'uptime_seconds': round(now - slot.connected_at, 1)
+                    if slot.state == CONNECTED else 0.0,
+                }
+                for slot in self._slots
+            ],
+            'calls': self.calls,
+            'retries': self.retries,
+            'connects': self.connects,
+            'reconnects': self.reconnects,
+            'connect_failures': self.connect_failures,
+            'ping_failures': self.ping_failures,
+            'failovers': self.failovers,
+        }
+
+    async def close(self) -> None:
+        """Stop the keepalive loop and close every session."""
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            try:
+                await self._keepalive_task
+            except asyncio.CancelledError:
+                pass
+            self._keepalive_task = None
+
+        await asyncio.gather(*(self._disconnect(slot) for slot in self._slots))
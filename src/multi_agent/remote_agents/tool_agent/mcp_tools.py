@@ -0,0 +1,373 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from functools import partial
+from typing import Any
+
+from mcp import types
+from semantic_kernel.connectors.mcp import MCPSsePlugin
+from semantic_kernel.functions import kernel_function
+
+from mcp_sessions import MCPSessionPool
+from tool_manifest import ToolManifestCache
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds a tool result stays fresh. Tools not listed (e.g. save_snippet,
+# save_image) have side effects and are never cached.
+DEFAULT_TOOL_TTLS = {
+    'get_blob_urls_from_container': 300.0,
+    'extract_content_from_file': 3600.0,
+    'get_snippet': 60.0,
+    'hello_mcp': 3600.0,
+}
+
+# A successful call to a tool on the left evicts the cached results of the
+# tool on the right that have the same value for the given argument.
+DEFAULT_TOOL_INVALIDATIONS = {
+    'save_snippet': ('get_snippet', 'snippetname'),
+}
+
+_bypass_cache: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    'bypass_tool_cache', default=False
+)
+
+
+@contextmanager
+def bypass_tool_cache() -> Iterator[None]:
+    """Force tool calls made in this context to go to the MCP server."""
+    token = _bypass_cache.set(True)
+    try:
+        yield
+    finally:
+        _bypass_cache.reset(token)
+
+
+def _parse_ttls(value: str) -> dict[str, float]:
+    """Parse 'tool=seconds,tool=seconds' into a TTL mapping."""
+    ttls = {}
+    for item in value.split(','):
+        if '=' in item:
+            name, seconds = item.split('=', 1)
+            ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+def _tool_function_name(name: str) -> str:
+    """Map an MCP tool name to a valid kernel function and attribute name."""
+    return re.sub(r'[^A-Za-z0-9_]', '_', name)
+
+
+def _tool_parameters(tool: types.Tool) -> list[dict[str, Any]]:
+    """Describe an MCP tool's input schema as kernel function parameters."""
+    properties = tool.inputSchema.get('properties') or {}
+    required = tool.inputSchema.get('required', [])
+    params = []
+    for name, details in properties.items():
+        details = json.loads(details) if isinstance(details, str) else details
+        params.append({
+            'name': name,
+            'is_required': name in required,
+            'type': details.get('type'),
+            'default_value': details.get('default'),
+            'schema_data': details,
+        })
+    return params
+
+
+def _is_error_result(result: list[Any]) -> bool:
+    """Whether a tool result is one of the MCP server's JSON error payloads."""
+    for item in result:
+        text = getattr(item, 'text', None)
+        if not text or not text.lstrip().startswith('{'):
+            continue
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            continue
+        if isinstance(payload, dict) and 'error' in payload:
+            return True
+    return False
+
+
+class ToolResultCache:
+    """Caches MCP tool results by tool name and canonicalized arguments.
+
+    Entries expire after a per-tool TTL, and the least recently used entries
+    are evicted once the approximate size of all cached results exceeds
+    ``max_bytes``. Concurrent identical calls share a single in-flight request.
+    Writes listed in ``invalidations`` evict the cached reads they make stale.
+    """
+
+    def __init__(
+        self,
+        ttls: dict[str, float] | None = None,
+        max_bytes: int | None = None,
+        enabled: bool | None = None,
+        invalidations: dict[str, tuple[str, str]] | None = None,
+    ):
+        self.ttls = dict(DEFAULT_TOOL_TTLS)
+        self.ttls.update(ttls or _parse_ttls(os.getenv('MCP_TOOL_CACHE_TTLS', '')))
+        self.invalidations = dict(DEFAULT_TOOL_INVALIDATIONS)
+        self.invalidations.update(invalidations or {})
+        self.max_bytes = max_bytes or int(
+            float(os.getenv('MCP_TOOL_CACHE_MAX_MB', '64')) * 1024 * 1024
+        )
+        self.enabled = (
+            enabled if enabled is not None
+            else os.getenv('MCP_TOOL_CACHE_DISABLED', 'false').lower() != 'true'
+        )
+        # key -> (expires_at, size, result)
+        self._entries: OrderedDict[str, tuple[float, int, list[Any]]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        # Calls invalidated while in flight; their results are not stored
+        self._stale: set[asyncio.Future] = set()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: dict[str, Any]) -> str:
+        """Build a cache key that ignores argument order and surrounding whitespace."""
+        canonical = {
+            name: value.strip() if isinstance(value, str) else value
+            for name, value in arguments.items()
+            if value is not None
+        }
+        encoded = json.dumps(canonical, sort_keys=True, separators=(',', ':'), default=str)
+        return f'{tool_name}:{hashlib.sha256(encoded.encode("utf-8")).hexdigest()}'
+
+    async def get_or_call(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any],
+        call: Callable[[], Awaitable[list[Any]]],
+    ) -> list[Any]:
+        """Return a cached result for the call, or make the call and cache it."""
+        ttl = self.ttls.get(tool_name, 0)
+        if not self.enabled or ttl <= 0 or _bypass_cache.get():
+            result = await call()
+            if tool_name in self.invalidations and not _is_error_result(result):
+                read_tool, argument = self.invalidations[tool_name]
+                self.invalidate(read_tool, {argument: arguments.get(argument)})
+            return result
+
+        key = self.make_key(tool_name, arguments)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self._remove(key)
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.hits += 1
+            return await asyncio.shield(in_flight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            self._stale.discard(future)
+            future.cancel()
+            raise
+        except Exception as e:
+            self._stale.discard(future)
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure is not logged as lost
+            future.exception()
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+        future.set_result(result)
+        if future in self._stale:
+            self._stale.discard(future)
+        elif not _is_error_result(result):
+            self._store(key, ttl, result)
+        return result
+
+    def invalidate(self, tool_name: str, arguments: dict[str, Any]) -> None:
+        """Evict the cached result of a call, and keep an in-flight one from being stored."""
+        key = self.make_key(tool_name, arguments)
+        self._remove(key)
+        in_flight = self._in_flight.pop(key, None)
+        if in_flight is not None:
+            self._stale.add(in_flight)
+
+    def _store(self, key: str, ttl: float, result: list[Any]) -> None:
+        size = sum(len(str(item)) for item in result)
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, size, result)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class CachingMCPSsePlugin(MCPSsePlugin):
+    """MCPSsePlugin whose tool calls are served from a ToolResultCache when possible.
+
+    When a ``session_pool`` is given, the plugin's own connection is only used
+    to discover tools; calls that miss the cache go through the pool, which is
+    started and closed together with the plugin.
+
+    Only tools named in ``allowed_tools`` (all tools if None) are registered
+    with the kernel. Tool schemas come from a local manifest cache when it is
+    fresh; the server's manifest version is then checked in the background.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        cache: ToolResultCache | None = None,
+        session_pool: MCPSessionPool | None = None,
+        allowed_tools: list[str] | None = None,
+        manifest_cache: ToolManifestCache | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.cache = cache or ToolResultCache()
+        self.session_pool = session_pool
+        self.allowed_tools = set(allowed_tools) if allowed_tools is not None else None
+        self.manifest_cache = manifest_cache or ToolManifestCache()
+        self.tool_version: str | None = None
+        self.registered_tools: list[str] = []
+        self._refresh_task: asyncio.Task | None = None
+        # Tools must not replace the plugin's own methods and attributes
+        self._reserved_names = set(dir(self))
+
+    async def connect(self) -> None:
+        await super().connect()
+        if self.session is None:
+            # connect() can return without raising when the transport fails
+            raise ConnectionError('Could not connect to the MCP server')
+        if self.session_pool:
+            await self.session_pool.start()
+
+    async def close(self) -> None:
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        if self.session_pool:
+            await self.session_pool.close()
+        await super().close()
+
+    async def load_tools(self) -> None:
+        """Register the allowed tools, from the local manifest cache when possible.
+
+        Only the first load may use the cache; later loads, e.g. on a
+        tools/list_changed notification, always fetch from the server.
+        """
+        cached = None if self.tool_version else self.manifest_cache.load(self.url)
+        if cached is None:
+            await self._refresh_manifest()
+            return
+
+        self.tool_version, tools = cached
+        self._register_tools(tools)
+        logger.info(
+            f'Registered {len(self.registered_tools)} MCP tools from cached manifest '
+            f'{self.tool_version}: {self.registered_tools}'
+        )
+        self._refresh_task = asyncio.create_task(self._refresh_manifest())
+
+    async def _refresh_manifest(self) -> None:
+        """Fetch the server's tools and re-register them if the version changed."""
+        try:
+            tool_list = await self.session.list_tools()
+        except Exception as e:
+            logger.warning(f'Could not list MCP tools: {e}')
+            return
+
+        version = self.manifest_cache.save(self.url, tool_list.tools)
+        if version == self.tool_version:
+            return
+        if self.tool_version:
+            # Agents already built from this plugin keep the old tools until reinitialized
+            logger.warning(f'MCP tool manifest changed from {self.tool_version} to {version}')
+        self.tool_version = version
+        self._register_tools(tool_list.tools)
+        logger.info(
+            f'Registered {len(self.registered_tools)} of {len(tool_list.tools)} MCP tools '
+            f'(manifest {version}): {self.registered_tools}'
+        )
+
+    def _register_tools(self, tools: list[types.Tool]) -> None:
+        """Expose the allowed tools as kernel functions.
+
+        Names are normalized to valid function names. Tools whose name would
+        replace a plugin attribute, or collide with a tool already
+        registered, are skipped.
+        """
+        for name in self.registered_tools:
+            if hasattr(self, name):
+                delattr(self, name)
+        self.registered_tools = []
+        owners: dict[str, str] = {}
+        for tool in tools:
+            if self.allowed_tools is not None and tool.name not in self.allowed_tools:
+                continue
+            local_name = _tool_function_name(tool.name)
+            if local_name in self._reserved_names:
+                logger.warning(
+                    f"Skipping MCP tool '{tool.name}': '{local_name}' is a plugin attribute"
+                )
+                continue
+            if local_name in owners:
+                logger.warning(
+                    f"Skipping MCP tool '{tool.name}': '{local_name}' is already "
+                    f"registered for '{owners[local_name]}'"
+                )
+                continue
+            owners[local_name] = tool.name
+            func = kernel_function(name=local_name, description=tool.description)(
+                partial(self.call_tool, tool.name)
+            )
+            func.__kernel_function_parameters__ = _tool_parameters(tool)
+            setattr(self, local_name, func)
+            self.registered_tools.append(local_name)
+
+    async def call_tool(self, tool_name: str, **kwargs: Any) -> list[Any]:
+        if self.session_pool:
+            call = partial(self.session_pool.call_tool, tool_name, **kwargs)
+        else:
+            call = partial(super().call_tool, tool_name, **kwargs)
+        return await self.cache.get_or_call(tool_name, kwargs, call)
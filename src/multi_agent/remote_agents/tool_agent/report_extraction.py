@@ -0,0 +1,133 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Annotated, Any
+from urllib.parse import unquote, urlsplit
+
+from semantic_kernel.functions import kernel_function
+
+from mcp_tools import CachingMCPSsePlugin
+
+
+logger = logging.getLogger(__name__)
+
+# Receipts of one report analyzed at once, and the analyzer they are sent to
+REPORT_EXTRACTION_CONCURRENCY = int(os.getenv('REPORT_EXTRACTION_CONCURRENCY', '4'))
+REPORT_ANALYZER_ID = os.getenv('REPORT_ANALYZER_ID', 'invoice-extraction-demo')
+
+# Blob container the Function App reads receipts from
+IMAGES_CONTAINER = 'images'
+
+
+def _result_text(result: list[Any]) -> str:
+    """Join the text items of an MCP tool result."""
+    return ''.join(getattr(item, 'text', None) or '' for item in result)
+
+
+def _image_name(blob_url: str) -> str:
+    """Turn a blob URL into the image name the extraction tool expects."""
+    path = unquote(urlsplit(blob_url).path).lstrip('/')
+    prefix = f'{IMAGES_CONTAINER}/'
+    return path[len(prefix):] if path.startswith(prefix) else path
+
+
+def _normalize_receipt(image_name: str, extracted: dict[str, Any]) -> dict[str, Any]:
+    """Reduce an extraction result to the fields the agent reports."""
+    items = [
+        {
+            'description': item.get('item_description', ''),
+            'amount': item.get('amount'),
+        }
+        for item in extracted.get('extracted_items', [])
+    ]
+    return {
+        'file': image_name,
+        'source': extracted.get('file_location', ''),
+        'vendor': extracted.get('vendor_name', ''),
+        'items': items,
+        'total': round(sum(item['amount'] or 0 for item in items), 2),
+    }
+
+
+class ReportExtractionPlugin:
+    """Extracts every receipt of an expense report in a single tool call.
+
+    Lists the report's receipts and runs the extractions concurrently, at
+    most ``max_concurrency`` at a time, through the MCP plugin (and so its
+    result cache and session pool). The model gets one aggregated result
+    instead of making a tool call per receipt.
+    """
+
+    name = 'expense_reports'
+
+    def __init__(
+        self,
+        mcp_plugin: CachingMCPSsePlugin,
+        max_concurrency: int = REPORT_EXTRACTION_CONCURRENCY,
+        analyzer_id: str = REPORT_ANALYZER_ID,
+    ):
+        self.mcp_plugin = mcp_plugin
+        self.max_concurrency = max_concurrency
+        self.analyzer_id = analyzer_id
+
+    @kernel_function(
+        name='extract_report',
+        description=(
+            'Extract the vendor, items and amounts of every receipt or invoice in an '
+            'expense report in one call. Use this instead of listing and extracting '
+            'receipts one by one.'
+        ),
+    )
+    async def extract_report(
+        self,
+        report_name: Annotated[str, 'The name of the expense report.'],
+    ) -> str:
+        started = time.monotonic()
+        listing = await self._call_json('get_blob_urls_from_container', ReportName=report_name)
+        if 'error' in listing:
+            return json.dumps({'report_name': report_name, 'error': listing['error']})
+
+        image_names = [_image_name(url) for url in listing.get('blob_urls', [])]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def extract(image_name: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self._call_json(
+                    'extract_content_from_file', imagename=image_name, analyzerid=self.analyzer_id
+                )
+
+        results = await asyncio.gather(*(extract(name) for name in image_names))
+
+        receipts, failures = [], []
+        for image_name, extracted in zip(image_names, results):
+            if 'error' in extracted:
+                failures.append({'file': image_name, 'error': extracted['error']})
+            else:
+                receipts.append(_normalize_receipt(image_name, extracted))
+
+        logger.info(
+            f'Extracted {len(receipts)}/{len(image_names)} receipts of report {report_name} '
+            f'in {time.monotonic() - started:.1f}s'
+        )
+        return json.dumps({
+            'report_name': report_name,
+            'receipt_count': len(image_names),
+            'receipts': receipts,
+            'failures': failures,
+            'report_total': round(sum(receipt['total'] for receipt in receipts), 2),
+        })
+
+    async def _call_json(self, tool_name: str, **arguments: Any) -> dict[str, Any]:
+        """Call an MCP tool and parse its JSON result, reporting failures as errors."""
+        try:
+            text = _result_text(await self.mcp_plugin.call_tool(tool_name, **arguments))
+        except Exception as e:
+            logger.warning(f'{tool_name} failed for {arguments}: {e}')
+            return {'error': f'{tool_name} failed: {e}'}
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            return {'error': text or f'{tool_name} returned no content'}
+        return payload if isinstance(payload, dict) else {'error': f'Unexpected {tool_name} result'}
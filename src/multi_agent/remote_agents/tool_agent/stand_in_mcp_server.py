@@ -0,0 +1,168 @@
+"""
+Local stand-in for the MCP Function App.
+
+Serves the Function App's tool names and arguments over MCP SSE, at the same
+path, with canned responses and configurable latency, so the tool agent can be
+benchmarked and soak-tested without a live Function App:
+
+    python stand_in_mcp_server.py --port 7072 --profile typical
+    MCP_SERVER_URLS=http://localhost:7072/runtime/webhooks/mcp/sse python main.py
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import random
+
+import click
+
+from mcp.server.fastmcp import FastMCP
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SSE_PATH = '/runtime/webhooks/mcp/sse'
+MESSAGE_PATH = '/runtime/webhooks/mcp/message/'
+BLOB_BASE_URL = 'https://standin.blob.core.windows.net/images'
+
+# Per-tool (mean, jitter) latency in seconds; 'default' covers unlisted tools.
+# 'typical' approximates the Function App with Content Understanding behind it.
+LATENCY_PROFILES = {
+    'instant': {'default': (0.0, 0.0)},
+    'fast': {
+        'default': (0.02, 0.01),
+        'extract_content_from_file': (0.3, 0.1),
+    },
+    'typical': {
+        'default': (0.1, 0.05),
+        'get_blob_urls_from_container': (0.3, 0.1),
+        'extract_content_from_file': (4.0, 1.5),
+    },
+    'slow': {
+        'default': (0.5, 0.2),
+        'get_blob_urls_from_container': (1.0, 0.3),
+        'extract_content_from_file': (12.0, 4.0),
+    },
+}
+
+VENDORS = ['Contoso Cafe', 'Fabrikam Travel', 'Northwind Traders', 'Tailspin Toys', 'Woodgrove Hotel']
+ITEMS = ['Lunch', 'Taxi fare', 'Office supplies', 'Hotel night', 'Conference ticket', 'Coffee']
+
+
+def create_server(
+    host: str = '127.0.0.1',
+    port: int = 7072,
+    profile: str = 'typical',
+    error_rate: float = 0.0,
+    receipts: int = 3,
+    seed: int | None = None,
+) -> FastMCP:
+    """Build a FastMCP server exposing the Function App's tools."""
+    latencies = LATENCY_PROFILES[profile]
+    rng = random.Random(seed)
+    snippets: dict[str, str] = {}
+    images: dict[str, bytes] = {}
+    mcp = FastMCP(
+        'stand-in-function-app',
+        host=host,
+        port=port,
+        sse_path=SSE_PATH,
+        message_path=MESSAGE_PATH,
+    )
+
+    async def simulate(tool_name: str) -> bool:
+        """Sleep for the tool's latency; return True if the call should fail."""
+        mean, jitter = latencies.get(tool_name, latencies['default'])
+        delay = max(0.0, rng.uniform(mean - jitter, mean + jitter))
+        if delay:
+            await asyncio.sleep(delay)
+        return rng.random() < error_rate
+
+    @mcp.tool(description='Hello world.')
+    async def hello_mcp() -> str:
+        await simulate('hello_mcp')
+        return 'Hello I am MCPTool!'
+
+    @mcp.tool(description='Retrieve a snippet by name.')
+    async def get_snippet(snippetname: str) -> str:
+        await simulate('get_snippet')
+        return snippets.get(snippetname, '')
+
+    @mcp.tool(description='Save a snippet with a name.')
+    async def save_snippet(snippetname: str, snippet: str) -> str:
+        await simulate('save_snippet')
+        if not snippetname:
+            return 'No snippet name provided'
+        snippets[snippetname] = snippet
+        return f"Snippet '{snippet}' saved successfully"
+
+    @mcp.tool(description='Save an image with a name.')
+    async def save_image(imagename: str, imagedata: str) -> str:
+        await simulate('save_image')
+        try:
+            images[imagename] = base64.b64decode(imagedata)
+        except Exception as e:
+            return f'Failed to decode image data: {e}'
+        return f"Image '{imagename}' saved successfully"
+
+    @mcp.tool(description='Retrieve an image by name as base64 encoded data.')
+    async def get_image(imagename: str) -> str:
+        await simulate('get_image')
+        if imagename not in images:
+            return f'Error retrieving image: {imagename} not found'
+        encoded = base64.b64encode(images[imagename]).decode('utf-8')
+        return f"data:image/{imagename.split('.')[-1]};base64,{encoded}"
+
+    @mcp.tool(description='Extract structured content from an image file using Azure Content Understanding.')
+    async def extract_content_from_file(imagename: str, analyzerid: str = 'invoice-extraction-demo') -> str:
+        if await simulate('extract_content_from_file'):
+            return json.dumps({'error': 'Error extracting content: simulated failure'})
+        # Derive the receipt from its name so repeated calls agree
+        digest = int(hashlib.sha256(imagename.encode('utf-8')).hexdigest(), 16)
+        vendor_name = VENDORS[digest % len(VENDORS)]
+        items = [
+            {
+                'vendorName': vendor_name,
+                'item_description': ITEMS[(digest >> (8 * i)) % len(ITEMS)],
+                'amount': round(((digest >> (16 * i)) % 20000) / 100, 2),
+            }
+            for i in range(1 + digest % 3)
+        ]
+        return json.dumps({
+            'analyzer_id': analyzerid,
+            'file_location': f'{BLOB_BASE_URL}/{imagename}',
+            'vendor_name': vendor_name,
+            'extracted_items': items,
+        }, indent=2)
+
+    @mcp.tool(description='Get all blob URLs from a specific container in Azure Blob Storage with optional prefix filter.')
+    async def get_blob_urls_from_container(ReportName: str) -> str:
+        if await simulate('get_blob_urls_from_container'):
+            return json.dumps({'error': 'Failed to list blobs: simulated failure'})
+        return json.dumps({
+            'blob_urls': [
+                f'{BLOB_BASE_URL}/{ReportName}/receipt_{i + 1}.png' for i in range(receipts)
+            ]
+        })
+
+    return mcp
+
+
+@click.command()
+@click.option('--host', default='127.0.0.1')
+@click.option('--port', default=7072)
+@click.option('--profile', type=click.Choice(sorted(LATENCY_PROFILES)), default='typical')
+@click.option('--error-rate', default=0.0, help='Fraction of extraction calls that return an error payload.')
+@click.option('--receipts', default=3, help='Receipts listed for every report.')
+@click.option('--seed', type=int, default=None, help='Seed for reproducible latencies and errors.')
+def main(host, port, profile, error_rate, receipts, seed):
+    """Starts the stand-in MCP server."""
+    logger.info(f'Stand-in MCP server on http://{host}:{port}{SSE_PATH} (profile: {profile})')
+    create_server(host, port, profile, error_rate, receipts, seed).run(transport='sse')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the MCP session pool against a local stand-in MCP SSE server.
+
+Starts the bundled stand-in server in a subprocess, runs concurrent tool
+calls through the pool, restarts the server to simulate a Function App
+recycle and checks that the pool reconnects and keeps serving calls, then
+stops it for good and checks that the pool fails over to a second server.
+"""
+import asyncio
+import subprocess
+import sys
+import time
+
+PORT = 8765
+FAILOVER_PORT = 8766
+
+
+def server_url(port: int) -> str:
+    from stand_in_mcp_server import SSE_PATH
+    return f'http://127.0.0.1:{port}{SSE_PATH}'
+
+
+def start_server(port: int = PORT) -> subprocess.Popen:
+    """Start the bundled stand-in MCP server with 0.3-0.7 s tool latencies."""
+    process = subprocess.Popen(
+        [sys.executable, 'stand_in_mcp_server.py', '--port', str(port), '--profile', 'slow'],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    time.sleep(2)
+    return process
+
+
+async def test_mcp_session_pool():
+    """Test concurrent calls, reconnect after a server restart and failover."""
+    from mcp_sessions import CONNECTED, MCPSessionPool
+
+    server = start_server()
+    backup = start_server(FAILOVER_PORT)
+    pool = MCPSessionPool(
+        [server_url(PORT), server_url(FAILOVER_PORT)], size=3, keepalive_interval=1, max_retries=3
+    )
+    try:
+        await pool.start()
+        stats = pool.stats()
+        assert all(s['state'] == CONNECTED for s in stats['sessions']), stats
+        print(f"✅ Pool connected {stats['size']} sessions")
+
+        # Three calls of at least 0.3 s on three sessions should not run one after another
+        started = time.monotonic()
+        results = await asyncio.gather(*(pool.call_tool('hello_mcp') for _ in range(3)))
+        elapsed = time.monotonic() - started
+        assert all('Hello' in str(result[0]) for result in results), results
+        assert elapsed < 0.9, f'calls serialized ({elapsed:.2f}s)'
+        print(f"✅ 3 concurrent calls finished in {elapsed:.2f}s")
+
+        # Simulate a Function App recycle
+        server.terminate()
+        server.wait()
+        server = start_server()
+
+        result = await pool.call_tool('hello_mcp')
+        assert 'Hello' in str(result[0]), result
+        # Give the keepalive loop time to restore the remaining sessions
+        await asyncio.sleep(3)
+        stats = pool.stats()
+        assert stats['reconnects'] >= 1, stats
+        print(f"✅ Pool recovered after server restart: {stats}")
+
+        # Take the primary endpoint down for good
+        server.terminate()
+        server.wait()
+
+        result = await pool.call_tool('hello_mcp')
+        assert 'Hello' in str(result[0]), result
+        stats = pool.stats()
+        assert stats['failovers'] >= 1 and stats['endpoint'].startswith(f'http://127.0.0.1:{FAILOVER_PORT}'), stats
+        print(f"✅ Pool failed over to {stats['endpoint']}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error testing MCP session pool: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        await pool.close()
+        for process in (server, backup):
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    success = asyncio.run(test_mcp_session_pool())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+from mcp import types
+
+
+logger = logging.getLogger(__name__)
+
+# Tools each skill needs. Only these are registered with the kernel, so the
+# model is not sent schemas for unrelated tools on every run.
+SKILL_TOOLSETS = {
+    'invoice_extraction': [
+        'get_blob_urls_from_container',
+        'extract_content_from_file',
+    ],
+}
+
+
+def get_skill_tools(skill: str) -> list[str] | None:
+    """Return the tool allowlist for a skill, or None to expose every tool.
+
+    ``MCP_TOOL_ALLOWLIST`` (comma separated) overrides the skill's toolset;
+    ``MCP_TOOL_ALLOWLIST=*`` exposes every tool.
+    """
+    override = os.getenv('MCP_TOOL_ALLOWLIST')
+    if override:
+        if override.strip() == '*':
+            return None
+        return [name.strip() for name in override.split(',') if name.strip()]
+    return SKILL_TOOLSETS.get(skill)
+
+
+def manifest_version(tools: list[types.Tool]) -> str:
+    """Content hash of a tool list, independent of the order tools are listed in."""
+    encoded = json.dumps(
+        sorted((tool.model_dump(mode='json', exclude_none=True) for tool in tools), key=lambda t: t['name']),
+        sort_keys=True,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+class ToolManifestCache:
+    """Local cache of MCP tool manifests, keyed by server.
+
+    Lets the agent register its tools at startup without a ``list_tools``
+    round trip. Each manifest is stored with a content-hash version, so a
+    background refresh can tell whether the server's tools have changed.
+    Manifests older than ``max_age`` seconds are not used.
+    """
+
+    def __init__(self, path: str | None = None, max_age: float | None = None):
+        self.path = path or os.getenv(
+            'MCP_TOOL_MANIFEST_PATH',
+            os.path.join(tempfile.gettempdir(), 'tool_agent_mcp_manifest.json'),
+        )
+        self.max_age = max_age or float(os.getenv('MCP_TOOL_MANIFEST_TTL_SECONDS', '86400'))
+
+    @staticmethod
+    def server_key(url: str) -> str:
+        # Drop the query string, which carries the function key
+        parts = urlsplit(url)
+        return f'{parts.scheme}://{parts.netloc}{parts.path}'
+
+    def _read_all(self) -> dict[str, Any]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f'Ignoring unreadable tool manifest cache {self.path}: {e}')
+            return {}
+
+    def load(self, url: str) -> tuple[str, list[types.Tool]] | None:
+        """Return the cached (version, tools) for a server, if present and fresh."""
+        entry = self._read_all().get(self.server_key(url))
+        if not entry or time.time() - entry.get('fetched_at', 0) > self.max_age:
+            return None
+        try:
+            tools = [types.Tool.model_validate(tool) for tool in entry['tools']]
+        except Exception as e:
+            logger.warning(f'Ignoring invalid cached tool manifest: {e}')
+            return None
+        return entry['version'], tools
+
+    def save(self, url: str, tools: list[types.Tool]) -> str:
+        """Store a server's tool manifest and return its version."""
+        version = manifest_version(tools)
+        manifests = self._read_all()
+        manifests[self.server_key(url)] = {
+            'version': version,
+            'fetched_at': time.time(),
+            'tools': [tool.model_dump(mode='json', exclude_none=True) for tool in tools],
+        }
+        try:
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.manifest-')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(manifests, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f'Could not write tool manifest cache {self.path}: {e}')
+        return version